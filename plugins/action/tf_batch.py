@@ -0,0 +1,119 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+##
+# runs sub-tasks of the resource modules in the process of the ansible controller node (documentation: modules/tf_batch.py)
+#
+# each sub-task is validated by the argument spec of its module (bulk_argument_spec), and run by run_items of module_utils/bulk.py
+# with a module-like object, as a bulk item is, so keystone token, webui session, object cache and fqname-to-id lookups
+# are shared by all the sub-tasks, without module packaging, python start and login per task.
+##
+
+import re
+import time
+import importlib
+from ansible.plugins.action import ActionBase
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import ItemModule, ItemExit, bulk_argument_spec, connection_args, run_items
+from ansible_collections.tungstenfabric.networking.plugins.plugin_utils.controller import PluginModule
+
+collection_prefix = 'tungstenfabric.networking.'
+
+
+def load_module(name):
+  ## python module of a resource module, which has module_args and run_item
+  if name.startswith(collection_prefix):
+    name = name[len(collection_prefix):]
+  if not re.match(r'^[a-z_]+$', name):
+    return None
+  try:
+    module = importlib.import_module('ansible_collections.tungstenfabric.networking.plugins.modules.' + name)
+  except ImportError:
+    return None
+  if not hasattr(module, 'run_item') or not hasattr(module, 'module_args'):
+    return None
+  return module
+
+
+def run_subtask(name, args, connection, check_mode):
+  ## result dict of one sub-task, with changed and failed
+  module = load_module(name)
+  if module is None:
+    return {"changed": False, "failed": True, "msg": "{} cannot be run by tf_batch. modules with items (bulk) support can be used".format(name)}
+  ## ansible-core 2.11 or later: only tf_batch needs it, so other modules work with older ones
+  try:
+    from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+    from ansible.module_utils.errors import UnsupportedError
+  except ImportError:
+    return {"changed": False, "failed": True, "msg": "tf_batch requires ansible-core 2.11 or later"}
+  params = dict(connection)
+  params.update(args or {})
+  validation = ArgumentSpecValidator(bulk_argument_spec(module.module_args)).validate(params)
+  if validation.error_messages:
+    ## as AnsibleModule reports them
+    messages = ["Unsupported parameters for ({}) module: {}".format(name, error.msg) if isinstance(error, UnsupportedError) else error.msg for error in validation.errors]
+    return {"changed": False, "failed": True, "msg": ' '.join(messages)}
+  base = PluginModule(validation.validated_parameters)
+  base.check_mode = check_mode
+  item_module = ItemModule(base, base.params)
+  try:
+    run_items(item_module, module.run_item, module.module_args, required_if=getattr(module, 'required_if_args', None), max_workers=getattr(module, 'max_workers', None))
+  except ItemExit as e:
+    result = dict(e.result)
+    result["changed"] = bool(result.get("changed"))
+    result["failed"] = e.failed
+    return result
+  except Exception as e:
+    ## such as a connection error, which is a failure of this sub-task, not of the whole batch
+    return {"changed": False, "failed": True, "msg": "{}: {}".format(type(e).__name__, e)}
+  return {"changed": False, "failed": False}
+
+
+class ActionModule(ActionBase):
+
+  TRANSFERS_FILES = False
+  _VALID_ARGS = frozenset(['tasks', 'stop_on_error'] + connection_args)
+
+  def run(self, tmp=None, task_vars=None):
+    self._supports_check_mode = True
+    result = super(ActionModule, self).run(tmp, task_vars)
+
+    tasks = self._task.args.get('tasks') or []
+    stop_on_error = self._task.args.get('stop_on_error', True)
+    connection = dict((k, self._task.args[k]) for k in connection_args if self._task.args.get(k) is not None)
+    if not 'controller_ip' in connection:
+      result.update(failed=True, msg="controller_ip is required")
+      return result
+    if not isinstance(tasks, list):
+      result.update(failed=True, msg="tasks should be a list")
+      return result
+
+    results = []
+    summary = dict(total=len(tasks), changed=0, failed=0, skipped=0)
+    for index, task in enumerate(tasks):
+      if not isinstance(task, dict) or not len(task) == 1:
+        task_result = {"changed": False, "failed": True, "msg": "each task should be a dict of one module name and its args: {}".format(task)}
+        name = None
+      elif summary["failed"] and stop_on_error:
+        name = list(task)[0]
+        task_result = {"changed": False, "failed": False, "skipped": True}
+      else:
+        name = list(task)[0]
+        start = time.time()
+        task_result = run_subtask(name, task[name], connection, self._play_context.check_mode)
+        task_result["elapsed"] = round(time.time() - start, 4)
+      task_result.update(index=index, module=name)
+      results.append(task_result)
+      if task_result.get("skipped"):
+        summary["skipped"] += 1
+      elif task_result["failed"]:
+        summary["failed"] += 1
+      elif task_result["changed"]:
+        summary["changed"] += 1
+
+    result.update(changed=summary["changed"] > 0, results=results, summary=summary)
+    if summary["failed"]:
+      result.update(failed=True, msg="{} of {} tasks failed".format(summary["failed"], summary["total"]))
+    return result
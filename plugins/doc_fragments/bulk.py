@@ -0,0 +1,44 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+  ## options of bulk execution (module_utils/bulk.py), common to the resource modules
+  DOCUMENTATION = r'''
+options:
+    items:
+        description:
+            - list of objects to be handled in this task. each item is a dict which takes the same options as this module (except controller_ip, username, password), and the options given outside of items are used as default values
+        required: false
+    bulk_workers:
+        description:
+            - "number of items processed concurrently (Default: 8)"
+        required: false
+    src:
+        description:
+            - csv (with header line) or json lines file (optionally gzipped, .gz) to read items from, instead of items. rows are read and processed bulk_batch_size rows at a time
+        required: false
+    dest:
+        description:
+            - json lines file (optionally gzipped, .gz) to write per-item results to, instead of returning them as items
+        required: false
+    bulk_batch_size:
+        description:
+            - "number of rows read from src and processed at a time (Default: 1000)"
+        required: false
+    journal:
+        description:
+            - file to append completed items to (uuid, fq_name, operation). items already recorded in it are skipped without accessing the controller, so a failed bulk run can be resumed. items or src is required, except for journal_rollback
+        required: false
+    journal_rollback:
+        description:
+            - "when it is set to true, objects recorded as created in journal are deleted (newest first), instead of processing items (Default: false)"
+        required: false
+    progress_file:
+        description:
+            - file to write progress of this task to (done / total, rate, eta, failed). when async is used, progress is also written to the async job file, and visible from async_status
+        required: false
+'''
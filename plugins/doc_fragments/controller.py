@@ -0,0 +1,16 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+  ## connection to the controller, common to the modules
+  DOCUMENTATION = r'''
+options:
+    controller_ip:
+        description:
+            - tungstenfabric controller ip. for a cluster, a list (or comma separated string) of controller nodes can be given, and requests are spread / failed over among them
+        required: true
+'''
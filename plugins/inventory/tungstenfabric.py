@@ -0,0 +1,182 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+name: tungstenfabric
+
+short_description: tungstenfabric inventory of physical routers, virtual routers and bms nodes
+
+version_added: "2.9"
+
+description:
+    - "hosts are read from physical-router, virtual-router and node objects, by list api with field projection (one paginated list per type)"
+    - "hosts are grouped by type, fabric, physical role, routing-bridging role and tags"
+    - "host name is the last element of fq_name. when a former type in obj_types has a host of the same name, the type is prefixed (such as virtual_router_node1), with a warning"
+    - "with cache enabled, the inventory is read from the inventory cache plugin until cache_timeout expires"
+    - "the inventory file name should end with tungstenfabric.yml or tungstenfabric.yaml"
+
+options:
+    plugin:
+        description:
+            - token that ensures this is a source file for this plugin
+        required: true
+        choices: ['tungstenfabric.networking.tungstenfabric']
+    controller_ip:
+        description:
+            - tungstenfabric controller ip. for a cluster, a list (or comma separated string) of controller nodes can be given
+        required: true
+        type: list
+        elements: str
+        env:
+            - name: TF_CONTROLLER_IP
+    obj_types:
+        description:
+            - object types read as hosts
+        type: list
+        elements: str
+        default: ['physical-router', 'virtual-router', 'node']
+    page_limit:
+        description:
+            - number of objects read by one request
+        type: int
+        default: 1000
+
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+# cat fabric.tungstenfabric.yml
+plugin: tungstenfabric.networking.tungstenfabric
+controller_ip: [10.0.0.11, 10.0.0.12, 10.0.0.13]
+cache: true
+cache_plugin: jsonfile
+cache_connection: /tmp/tf-inventory
+cache_timeout: 600
+keyed_groups:
+  - key: tf_vendor
+    prefix: vendor
+
+# ansible-inventory -i fabric.tungstenfabric.yml --graph
+'''
+
+import re
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
+from ansible.utils.display import Display
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import list_objects
+from ansible_collections.tungstenfabric.networking.plugins.plugin_utils.controller import PluginModule, connect
+
+display = Display()
+
+## obj_type -> (group, fields read, field of the management address)
+host_types = {
+  'physical-router': ('physical_router', ['physical_router_management_ip', 'physical_router_role', 'physical_router_vendor_name', 'physical_router_product_name', 'routing_bridging_roles', 'fabric_refs', 'physical_role_refs', 'overlay_role_refs', 'tag_refs'], 'physical_router_management_ip'),
+  'virtual-router': ('virtual_router', ['virtual_router_ip', 'virtual_router_type', 'tag_refs'], 'virtual_router_ip'),
+  'node': ('bms', ['hostname', 'ip_address', 'node_type', 'tag_refs'], 'ip_address')
+}
+
+
+def group_name(*names):
+  return re.sub(r'[^A-Za-z0-9_]', '_', '_'.join(names))
+
+
+def ref_names(obj, field):
+  return [ref.get("to", [''])[-1] for ref in obj.get(field) or []]
+
+
+def host_name(obj, type_group, names):
+  ## last element of fq_name, or <type group>_<name> (and then <name>_<uuid>) when it is already used by another host
+  name = obj.get("fq_name", [obj.get("uuid")])[-1]
+  for candidate in [name, group_name(type_group, name), '{}_{}'.format(name, obj.get("uuid"))]:
+    if not candidate in names:
+      break
+  if not candidate == name:
+    display.warning("tungstenfabric inventory: host name {} is used by more than one object, so {} {} is added as {}".format(name, type_group, obj.get("uuid"), candidate))
+  names.add(candidate)
+  return candidate
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+  NAME = 'tungstenfabric.networking.tungstenfabric'
+
+  def verify_file(self, path):
+    return super(InventoryModule, self).verify_file(path) and path.endswith(('tungstenfabric.yml', 'tungstenfabric.yaml'))
+
+  def parse(self, inventory, loader, path, cache=True):
+    super(InventoryModule, self).parse(inventory, loader, path, cache=cache)
+    self._read_config_data(path)
+
+    cache_key = self.get_cache_key(path)
+    use_cache = self.get_option('cache') and cache
+    update_cache = self.get_option('cache') and not cache
+    hosts = None
+    if use_cache:
+      try:
+        hosts = self._cache[cache_key]
+      except KeyError:
+        update_cache = True
+    if hosts is None:
+      hosts = self.read_hosts()
+    if update_cache:
+      self._cache[cache_key] = hosts
+    self.populate(hosts)
+
+  def read_hosts(self):
+    ## [{"name", "groups", "vars"}], which is json serializable for the cache plugin
+    module = PluginModule({"controller_ip": self.get_option('controller_ip')})
+    controller_ip = connect(module)
+    hosts = []
+    names = set()
+    for obj_type in self.get_option('obj_types'):
+      if not obj_type in host_types:
+        continue
+      (type_group, fields, address_field) = host_types[obj_type]
+      query = {"detail": "true", "fields": ','.join(fields)}
+      for obj in list_objects(module, controller_ip, obj_type, query=query, page_limit=self.get_option('page_limit')):
+        groups = [type_group]
+        groups += [group_name('fabric', name) for name in ref_names(obj, 'fabric_refs')]
+        physical_roles = ref_names(obj, 'physical_role_refs') or [role for role in [obj.get('physical_router_role')] if role]
+        groups += [group_name('physical_role', role) for role in physical_roles]
+        rb_roles = ref_names(obj, 'overlay_role_refs') or (obj.get('routing_bridging_roles') or {}).get('rb_roles') or []
+        groups += [group_name('rb_role', role) for role in rb_roles]
+        groups += [group_name('tag', *tag.split('=', 1)) for tag in ref_names(obj, 'tag_refs')]
+        host_vars = {
+          "tf_uuid": obj.get("uuid"),
+          "tf_type": obj_type,
+          "tf_fq_name": obj.get("fq_name"),
+          "tf_physical_roles": physical_roles,
+          "tf_rb_roles": rb_roles,
+          "tf_tags": ref_names(obj, 'tag_refs')
+        }
+        for field in fields:
+          if field in obj and not field.endswith('_refs'):
+            host_vars["tf_" + field] = obj[field]
+        if obj.get('physical_router_vendor_name'):
+          host_vars["tf_vendor"] = obj['physical_router_vendor_name']
+        if obj.get(address_field):
+          host_vars["ansible_host"] = obj[address_field]
+        hosts.append({"name": host_name(obj, type_group, names), "groups": groups, "vars": host_vars})
+    return hosts
+
+  def populate(self, hosts):
+    strict = self.get_option('strict')
+    for host in hosts:
+      name = self.inventory.add_host(host["name"])
+      for group in host["groups"]:
+        self.inventory.add_group(group)
+        self.inventory.add_child(group, name)
+      for k, v in host["vars"].items():
+        self.inventory.set_variable(name, k, v)
+      host_vars = self.inventory.get_host(name).get_vars()
+      self._set_composite_vars(self.get_option('compose'), host_vars, name, strict=strict)
+      self._add_host_to_composed_groups(self.get_option('groups'), host_vars, name, strict=strict)
+      self._add_host_to_keyed_groups(self.get_option('keyed_groups'), host_vars, name, strict=strict)
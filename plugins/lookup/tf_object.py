@@ -0,0 +1,104 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+name: tf_object
+
+short_description: tungstenfabric objects from their fq_names
+
+version_added: "2.9"
+
+description:
+    - "returns objects (dict of uuid, fq_name and fields), in the order of the fq_names given"
+    - "fq_names are resolved as tf_uuid does, and the objects are read by list api, 200 objects per request"
+
+options:
+    _terms:
+        description:
+            - fq_names, as colon separated strings (default-domain:admin:vn1) or lists
+        required: true
+    obj_type:
+        description:
+            - object type, such as virtual-network
+        required: true
+        type: str
+    fields:
+        description:
+            - fields to be returned, in addition to uuid, fq_name, parent_type and parent_uuid. all the fields are returned when it is not given
+        type: list
+        elements: str
+    controller_ip:
+        description:
+            - tungstenfabric controller ip. for a cluster, a list (or comma separated string) of controller nodes can be given
+        required: true
+        type: list
+        elements: str
+        env:
+            - name: TF_CONTROLLER_IP
+        vars:
+            - name: tf_controller_ip
+    workers:
+        description:
+            - number of fq_names resolved concurrently
+        type: int
+        default: 8
+    memo_ttl:
+        description:
+            - seconds for which a resolved uuid is reused (0 disables it)
+        type: int
+        default: 300
+        env:
+            - name: TF_LOOKUP_MEMO_TTL
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: vxlan id of a virtual-network
+  debug:
+    msg: "{{ lookup('tungstenfabric.networking.tf_object', 'default-domain:admin:vn1', obj_type='virtual-network', fields=['virtual_network_network_id']).virtual_network_network_id }}"
+  vars:
+    tf_controller_ip: x.x.x.x
+'''
+
+RETURN = '''
+_raw:
+    description: objects
+    type: list
+    elements: dict
+'''
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import list_objects
+from ansible_collections.tungstenfabric.networking.plugins.plugin_utils.controller import PluginModule, connect, resolve_uuids, UuidMemo
+
+
+class LookupModule(LookupBase):
+
+  def run(self, terms, variables=None, **kwargs):
+    self.set_options(var_options=variables, direct=kwargs)
+    module = PluginModule({"controller_ip": self.get_option('controller_ip')})
+    controller_ip = connect(module)
+    obj_type = self.get_option('obj_type')
+    uuids = resolve_uuids(module, controller_ip, obj_type, terms, workers=self.get_option('workers'), memo=UuidMemo(self.get_option('memo_ttl')))
+
+    query = {"detail": "true"}
+    if self.get_option('fields'):
+      query["fields"] = ','.join(self.get_option('fields'))
+    objs = {}
+    wanted = sorted(set(uuids))
+    for i in range(0, len(wanted), 200):
+      query["obj_uuids"] = ','.join(wanted[i:i + 200])
+      for obj in list_objects(module, controller_ip, obj_type, query=query, page_limit=200):
+        objs[obj.get("uuid")] = obj
+    missing = [uuid for uuid in wanted if not uuid in objs]
+    if missing:
+      ## deleted after its uuid was resolved
+      raise AnsibleError("{} {} doesn't exist".format(obj_type, ', '.join(missing)))
+    return [objs[uuid] for uuid in uuids]
@@ -0,0 +1,88 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+name: tf_uuid
+
+short_description: uuids of tungstenfabric objects from their fq_names
+
+version_added: "2.9"
+
+description:
+    - "returns uuids of the objects, in the order of the fq_names given"
+    - "fq_names of one lookup are resolved concurrently, and results are kept for memo_ttl seconds, shared by the tasks and forks"
+    - "a kept uuid is checked by one list call (200 uuids per request) before it is used, and resolved again when its object is deleted or has another fq_name"
+
+options:
+    _terms:
+        description:
+            - fq_names, as colon separated strings (default-domain:admin:vn1) or lists
+        required: true
+    obj_type:
+        description:
+            - object type, such as virtual-network
+        required: true
+        type: str
+    controller_ip:
+        description:
+            - tungstenfabric controller ip. for a cluster, a list (or comma separated string) of controller nodes can be given
+        required: true
+        type: list
+        elements: str
+        env:
+            - name: TF_CONTROLLER_IP
+        vars:
+            - name: tf_controller_ip
+    workers:
+        description:
+            - number of fq_names resolved concurrently
+        type: int
+        default: 8
+    memo_ttl:
+        description:
+            - seconds for which a resolved uuid is reused (0 disables it)
+        type: int
+        default: 300
+        env:
+            - name: TF_LOOKUP_MEMO_TTL
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: create loadbalancer
+  tungstenfabric.networking.loadbalancer:
+    controller_ip: x.x.x.x
+    name: lb1
+    loadbalancer_subnet_uuid: "{{ lookup('tungstenfabric.networking.tf_uuid', 'default-domain:admin:vn1', obj_type='virtual-network', controller_ip='x.x.x.x') }}"
+
+- name: uuids of many virtual-networks, by one lookup
+  debug:
+    msg: "{{ query('tungstenfabric.networking.tf_uuid', *vn_fq_names, obj_type='virtual-network') }}"
+  vars:
+    tf_controller_ip: x.x.x.x
+'''
+
+RETURN = '''
+_raw:
+    description: uuids of the objects
+    type: list
+    elements: str
+'''
+
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.tungstenfabric.networking.plugins.plugin_utils.controller import PluginModule, connect, resolve_uuids, UuidMemo
+
+
+class LookupModule(LookupBase):
+
+  def run(self, terms, variables=None, **kwargs):
+    self.set_options(var_options=variables, direct=kwargs)
+    module = PluginModule({"controller_ip": self.get_option('controller_ip')})
+    controller_ip = connect(module)
+    return resolve_uuids(module, controller_ip, self.get_option('obj_type'), terms, workers=self.get_option('workers'), memo=UuidMemo(self.get_option('memo_ttl')))
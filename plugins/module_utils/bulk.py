@@ -0,0 +1,359 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# bulk execution of resource modules
+#
+# module = AnsibleModule(argument_spec=bulk_argument_spec(module_args), supports_check_mode=True)
+# run_items(module, run_item, module_args, required_if=required_if_args)
+#
+# when 'items' is not given, run_item(module) is called once, as before.
+# when 'items' is given, run_item is called once per item, concurrently by 'bulk_workers' threads,
+# with a module-like object whose params are module.params updated by that item.
+# keystone token, webui session and fqname-to-id lookups are shared by all the items (module_utils/common.py).
+#
+# instead of items, 'src' can point to a csv (with header line) or json lines file, optionally gzipped (.gz).
+# rows are read by a generator and processed 'bulk_batch_size' rows at a time, and when 'dest' is given,
+# per-item results are written to that json lines file as they complete, so memory usage doesn't depend on the input size.
+#
+# with 'journal' (items or src only), each completed item is appended to that file (key, uuid, type, fq_name, operation).
+# a re-run with the same journal skips those items without accessing the controller (only their keys are kept in memory),
+# and 'journal_rollback: true' deletes all the objects which the journal recorded as created, in reverse order.
+#
+# progress (done / total, rate, eta, failed) is written to 'progress_file', or to the async job file under async (module_utils/progress.py).
+##
+
+import os
+import io
+import csv
+import json
+import gzip
+import hashlib
+import threading
+from itertools import islice
+from collections import OrderedDict
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, revalidate_cache, CreateConflict, vnc_api_headers, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.progress import Progress
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.common.validation import check_type_str, check_type_int, check_type_float, check_type_bool, check_type_list, check_type_dict
+
+connection_args = ['controller_ip', 'username', 'password']
+bulk_args = ['items', 'src', 'dest', 'bulk_workers', 'bulk_batch_size', 'journal', 'journal_rollback', 'progress_file']
+
+type_checkers = {
+  'str': check_type_str,
+  'int': check_type_int,
+  'float': check_type_float,
+  'bool': check_type_bool,
+  'list': check_type_list,
+  'dict': check_type_dict,
+  int: check_type_int,
+  str: check_type_str
+}
+
+
+class ItemExit(Exception):
+  def __init__(self, result, failed):
+    Exception.__init__(self, result.get('msg'))
+    self.result = result
+    self.failed = failed
+
+
+class ItemModule(object):
+  ##
+  # stands in for AnsibleModule while one item is processed: exit_json / fail_json end only that item
+  ##
+  bulk_item = True
+
+  def __init__(self, module, params):
+    self.module = module
+    self.params = params
+    self.check_mode = module.check_mode
+
+  def exit_json(self, **kwargs):
+    raise ItemExit(kwargs, False)
+
+  def fail_json(self, msg=None, **kwargs):
+    kwargs['msg'] = msg
+    raise ItemExit(kwargs, True)
+
+  def __getattr__(self, name):
+    return getattr(self.module, name)
+
+
+def bulk_argument_spec(module_args):
+  argument_spec = {}
+  for k in module_args:
+    argument_spec[k] = dict(module_args[k])
+    if not k in connection_args:
+      ## checked per item by run_items
+      argument_spec[k]['required'] = False
+  argument_spec['items'] = dict(type='list', required=False)
+  argument_spec['src'] = dict(type='path', required=False)
+  argument_spec['dest'] = dict(type='path', required=False)
+  argument_spec['bulk_workers'] = dict(type='int', required=False, default=8)
+  argument_spec['bulk_batch_size'] = dict(type='int', required=False, default=1000)
+  argument_spec['journal'] = dict(type='path', required=False)
+  argument_spec['journal_rollback'] = dict(type='bool', required=False, default=False)
+  argument_spec['progress_file'] = dict(type='path', required=False)
+  return argument_spec
+
+
+def check_required(params, module_args, required_if):
+  missing = [k for k in module_args if module_args[k].get('required') and params.get(k) is None]
+  if missing:
+    return "missing required arguments: {}".format(", ".join(sorted(missing)))
+  for key, value, requirements in (required_if or []):
+    if params.get(key) == value:
+      missing = [k for k in requirements if params.get(k) is None]
+      if missing:
+        return "{} is {} but all of the following are missing: {}".format(key, value, ", ".join(missing))
+  return None
+
+
+def item_params(module, module_args, item):
+  ##
+  # module.params (defaults) updated by one item, with types and choices checked as AnsibleModule does
+  ##
+  if not isinstance(item, dict):
+    raise ItemExit({"msg": "each item should be a dict: {}".format(item)}, True)
+  params = dict((k, v) for k, v in module.params.items() if not k in bulk_args)
+  for k in item:
+    if not k in module_args or k in connection_args:
+      raise ItemExit({"msg": "unsupported parameter in item: {}".format(k)}, True)
+    value = item[k]
+    if value is not None:
+      checker = type_checkers.get(module_args[k].get('type', 'str'))
+      if checker:
+        value = checker(value)
+      choices = module_args[k].get('choices')
+      if choices and not value in choices:
+        raise ItemExit({"msg": "value of {} must be one of: {}, got: {}".format(k, ", ".join(choices), value)}, True)
+    params[k] = value
+  return params
+
+
+class Journal(object):
+  def __init__(self, path):
+    self.path = path
+    self.lock = threading.Lock()
+    ## keys of the items done (whose last entry is not rollback)
+    self.done_keys = set()
+    for entry in self.read():
+      self.mark(entry)
+    self.f = io.open(path, 'a', encoding='utf-8')
+
+  def read(self):
+    if not os.path.exists(self.path):
+      return
+    with io.open(self.path, 'r', encoding='utf-8') as f:
+      for line in f:
+        if line.strip():
+          yield json.loads(line)
+
+  def mark(self, entry):
+    if entry.get("operation") == 'rollback':
+      self.done_keys.discard(entry["key"])
+    else:
+      self.done_keys.add(entry["key"])
+
+  def done(self, key):
+    return key in self.done_keys
+
+  def created(self):
+    ## last entries of the keys which are created (and not rolled back), in the order of first appearance
+    entries = OrderedDict()
+    for entry in self.read():
+      entries[entry["key"]] = entry
+    return [entry for entry in entries.values() if entry.get("operation") == 'create' and entry.get("uuid") and entry.get("type")]
+
+  def record(self, entry):
+    line = to_text(json.dumps(entry) + '\n')
+    with self.lock:
+      self.mark(entry)
+      self.f.write(line)
+      self.f.flush()
+
+  def close(self):
+    self.f.close()
+
+
+def item_key(params):
+  ## items are identified by their params (password is not included)
+  return hashlib.sha1(json.dumps(dict((k, v) for k, v in params.items() if not k in connection_args), sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def call_run_item(run_item, module):
+  try:
+    run_item(module)
+  except CreateConflict:
+    ## create-first found the object already exists: run again with fqname-to-id lookup, to read, compare and update it
+    module.create_first = False
+    run_item(module)
+
+
+def run_one(module, run_item, module_args, required_if, journal, index, item):
+  summary = {"index": index, "changed": False, "failed": False}
+  try:
+    if isinstance(item, dict) and item.get("name"):
+      summary["name"] = item.get("name")
+    params = item_params(module, module_args, item)
+    msg = check_required(params, module_args, required_if)
+    if msg:
+      raise ItemExit({"msg": msg}, True)
+    if journal:
+      key = item_key(params)
+      if journal.done(key):
+        summary["skipped"] = True
+        return summary
+    call_run_item(run_item, ItemModule(module, params))
+  except ItemExit as e:
+    summary["changed"] = bool(e.result.get("changed"))
+    summary["failed"] = e.failed
+    if e.failed:
+      summary["msg"] = e.result.get("msg")
+      if e.result.get("message"):
+        summary["message"] = e.result.get("message")
+    elif journal:
+      journal.record({"key": key, "uuid": e.result.get("uuid"), "type": e.result.get("type"), "fq_name": e.result.get("fq_name"), "operation": e.result.get("operation")})
+  except Exception as e:
+    summary["failed"] = True
+    summary["msg"] = "{}: {}".format(type(e).__name__, e)
+  return summary
+
+
+def open_text(path, mode):
+  if path.endswith('.gz'):
+    return io.TextIOWrapper(gzip.open(path, mode + 'b'), encoding='utf-8')
+  return io.open(path, mode, encoding='utf-8')
+
+
+def read_rows(src):
+  ##
+  # csv: first line is the header, empty cells are treated as not given
+  # json lines: one dict per line
+  ##
+  with open_text(src, 'r') as f:
+    if src.endswith('.csv') or src.endswith('.csv.gz'):
+      for row in csv.DictReader(f):
+        yield dict((k, v) for k, v in row.items() if not v == '')
+    else:
+      for line in f:
+        if line.strip():
+          yield json.loads(line)
+
+
+def rollback(module, journal):
+  ##
+  # delete objects created by the journaled run, newest first
+  ##
+  controller_ip = module.params.get('controller_ip')
+  config_api_url = 'http://' + controller_ip + ':8082/'
+  keystone_login(module, controller_ip)
+
+  created = journal.created()
+  result = dict(changed=False, summary=dict(total=len(created), deleted=0, failed=0), failed_items=[])
+  for entry in reversed(created):
+    response = transport.delete(config_api_url + entry["type"] + '/' + entry["uuid"], headers=vnc_api_headers)
+    if response.status_code in [200, 404]:
+      result["changed"] = True
+      result["summary"]["deleted"] += 1
+      journal.record({"key": entry["key"], "uuid": entry["uuid"], "type": entry["type"], "fq_name": entry.get("fq_name"), "operation": 'rollback'})
+    else:
+      result["summary"]["failed"] += 1
+      result["failed_items"].append({"uuid": entry["uuid"], "type": entry["type"], "fq_name": entry.get("fq_name"), "message": response.text})
+  journal.close()
+  if result["summary"]["failed"]:
+    module.fail_json(msg="{} of {} objects cannot be deleted".format(result["summary"]["failed"], result["summary"]["total"]), **result)
+  module.exit_json(**result)
+
+
+def run_items(module, run_item, module_args, required_if=None, max_workers=None):
+  set_controller_nodes(module)
+  items = module.params.get('items')
+  src = module.params.get('src')
+  dest = module.params.get('dest')
+  journal = None
+  if module.params.get('journal'):
+    if items is None and src is None and not module.params.get('journal_rollback'):
+      module.fail_json(msg="journal requires items or src")
+    journal = Journal(module.params.get('journal'))
+    if module.params.get('journal_rollback'):
+      rollback(module, journal)
+  elif module.params.get('journal_rollback'):
+    module.fail_json(msg="journal_rollback requires journal")
+  if items is None and src is None:
+    msg = check_required(module.params, module_args, required_if)
+    if msg:
+      module.fail_json(msg=msg)
+    call_run_item(run_item, module)
+    return
+  if not items is None and not src is None:
+    module.fail_json(msg="parameters are mutually exclusive: items|src")
+  revalidate_cache(module, module.params.get('controller_ip'))
+
+  if src is None:
+    rows = enumerate(items)
+    workers = min(module.params.get('bulk_workers') or 1, len(items) or 1)
+    progress = Progress(total=len(items), path=module.params.get('progress_file'))
+  else:
+    rows = enumerate(read_rows(src))
+    workers = module.params.get('bulk_workers') or 1
+    progress = Progress(path=module.params.get('progress_file'))
+  workers = max(1, min(workers, max_workers or workers))
+  batch_size = max(1, module.params.get('bulk_batch_size') or 1)
+
+  summary = dict(total=0, changed=0, failed=0, skipped=0)
+  summaries = []
+  out = None
+  if dest:
+    out = open_text(dest, 'w')
+  def run(args):
+    item_summary = run_one(module, run_item, module_args, required_if, journal, args[0], args[1])
+    progress.add(changed=item_summary["changed"], failed=item_summary["failed"])
+    return item_summary
+
+  from multiprocessing.pool import ThreadPool
+  pool = ThreadPool(workers)
+  try:
+    while True:
+      batch = list(islice(rows, batch_size))
+      if not batch:
+        break
+      for item_summary in pool.map(run, batch):
+        summary["total"] += 1
+        if item_summary["changed"]:
+          summary["changed"] += 1
+        if item_summary["failed"]:
+          summary["failed"] += 1
+        if item_summary.get("skipped"):
+          summary["skipped"] += 1
+        if out:
+          out.write(to_text(json.dumps(item_summary) + '\n'))
+        else:
+          summaries.append(item_summary)
+      if out:
+        out.flush()
+  finally:
+    pool.close()
+    pool.join()
+    if out:
+      out.close()
+    if journal:
+      journal.close()
+    progress.close()
+
+  result = dict(
+    changed=summary["changed"] > 0,
+    summary=summary
+  )
+  if out:
+    result["dest"] = dest
+  else:
+    result["items"] = summaries
+  if summary["failed"]:
+    module.fail_json(msg="{} of {} items failed".format(summary["failed"], summary["total"]), **result)
+  module.exit_json(**result)
@@ -3,10 +3,17 @@
 # Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
-import sys
 import os
+import time
 import json
-import requests
+import random
+import uuid as uuid_module
+import threading
+from ansible.module_utils.six import string_types
+from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.transport import transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import object_cache, last_modified
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.governor import object_lock
 
 # begin: variables: cannot be directly accessed, but can be accessed by get method
 vnc_api_headers= {"Content-Type": "application/json", "charset": "UTF-8"}
@@ -17,20 +24,36 @@ module=None
 controller_ip=""
 # end: variables
 
+## keystone token, webui sessions and fqname-to-id results are shared by the items of a bulk run (module_utils/bulk.py)
+login_lock = threading.Lock()
+web_api_sessions = {}
+fqname_cache = {}
+
 
 def get_config_api_url():
     return config_api_url
 
-def login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain='default-domain', project='default-project', fabric='dummy', physical_router='dummy', loadbalancer_pool='dummy'):
-    controller_ip = controller_ip
-    config_api_url = 'http://' + controller_ip + ':8082/'
-    web_api_url = 'https://' + controller_ip + ':8143/'
-    module=module
+def set_controller_nodes(module):
+    ##
+    # controller_ip: list of controller nodes (a single address or comma separated string is also accepted)
+    # modules use the first node as controller_ip, and transport spreads / fails over requests to the others
+    ##
+    nodes = module.params.get("controller_ip")
+    if not isinstance(nodes, list):
+      nodes = nodes.split(',')
+    nodes = [node.strip() for node in nodes if node.strip()]
+    if not nodes:
+      module.fail_json(msg="controller_ip should not be empty")
+    transport.nodes.set(nodes)
+    module.params["controller_ip"] = nodes[0]
 
+def keystone_login(module, controller_ip):
     ##
-    # get keystone token
+    # get keystone token, when OS_AUTH_URL is set
     ##
-    if not os.getenv('OS_AUTH_URL') == None:
+    with login_lock:
+      if os.getenv('OS_AUTH_URL') == None or not vnc_api_headers.get("x-auth-token") == None:
+        return
       os_auth_url = os.getenv('OS_AUTH_URL', 'http://' + controller_ip + ':35357/v3')
       url = os_auth_url + '/auth/tokens?nocatalog'
       os_auth_type = os.getenv('OS_AUTH_TYPE', 'password')
@@ -40,36 +63,112 @@ def login_and_check_id(module, name, obj_type, controller_ip, username, password
       os_user_domain_name = os.getenv('OS_USER_DOMAIN_NAME', 'Default')
       os_project_name = os.getenv('OS_PROJECT_NAME', 'admin')
       keystone_data = {"auth": {"identity": {"methods": ["{}".format(os_auth_type)], "password": {"user": {"name": "{}".format(os_username), "password": "{}".format(os_password), "domain": {"name": "{}".format(os_user_domain_name)}}}}, "scope": {"project": {"name": "{}".format(os_project_name), "domain": {"name": "{}".format(os_project_domain_name)}}}}}
-      response = requests.post(url, data=json.dumps(keystone_data), headers=vnc_api_headers)
+      response = transport.post(url, data=json.dumps(keystone_data), headers=vnc_api_headers)
       if not (response.status_code == 200 or response.status_code == 201):
         module.fail_json("keystone token cannot be obtained")
 
       keystone_token = response.headers.get("X-Subject-Token")
       vnc_api_headers["x-auth-token"]=keystone_token
 
-    ## check if the fqname exists
+class WebLoginError(Exception):
+  ## webui authenticate failed (crud and read_object report it as a failure of the task)
+  pass
+
+
+class WebSession(object):
+  ##
+  # webui session, which logs in at its first use (crud, get-config-objects),
+  # so that a task which ends up with no write (check mode, absent object, no change) doesn't log in
+  ##
+  def __init__(self, web_api_url, username, password):
+    self.web_api_url = web_api_url
+    self.username = username
+    self.password = password
+    self.session = None
+
+  def login(self):
+    with login_lock:
+      if self.session == None:
+        session = transport.session()
+        response = session.post(self.web_api_url + 'authenticate', data=json.dumps({"username": self.username, "password": self.password}), headers=web_api_headers, verify=False)
+        if not response.status_code == 200 or session.cookies.get('_csrf') == None:
+          raise WebLoginError("webui login to {} failed: {} {}".format(self.web_api_url, response.status_code, response.text))
+        csrftoken=session.cookies['_csrf']
+        web_api_headers["x-csrf-token"]=csrftoken
+        self.session = session
+    return self.session
+
+  def __getattr__(self, name):
+    return getattr(self.login(), name)
+
+
+def web_login(web_api_url, username, password):
+    ## login to web API, when it is used
+    with login_lock:
+      web_api = web_api_sessions.get((web_api_url, username))
+      if web_api == None:
+        web_api = WebSession(web_api_url, username, password)
+        web_api_sessions[(web_api_url, username)] = web_api
+    return web_api
+
+
+##
+# create-first (TF_CREATE_FIRST=true): objects which are created by create-config-object are created without fqname-to-id lookup,
+# with uuid5 derived from (type, fq_name), so a retry after timeout creates the same object.
+# when the object already exists (409), crud raises CreateConflict, and run_items runs that item again with the lookup (module_utils/bulk.py)
+##
+create_first_types = ['application-policy-set', 'bgp-as-a-service', 'bgp-router', 'firewall-policy', 'firewall-rule', 'host-based-service', 'loadbalancer-member', 'loadbalancer-pool', 'logical-router', 'network-policy', 'security-group', 'service-health-check', 'service-template', 'tag', 'virtual-network']
+create_first_namespace = uuid_module.uuid5(uuid_module.NAMESPACE_DNS, 'networking.tungstenfabric.ansible')
+
+
+class CreateConflict(Exception):
+  pass
+
+
+def create_first_enabled(module, obj_type, state):
+    return os.getenv('TF_CREATE_FIRST', '').lower() in ['1', 'true', 'yes'] and state == 'present' and obj_type in create_first_types and getattr(module, 'create_first', True)
+
+def deterministic_uuid(obj_type, fq_name):
+    return str(uuid_module.uuid5(create_first_namespace, obj_type + ':' + ':'.join(fq_name)))
+
+def object_fq_name(obj_type, name, domain, project, fabric, physical_router, loadbalancer_pool):
     if (obj_type in ['global-system-config']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config"]}' % (obj_type), headers=vnc_api_headers)
+      return ["default-global-system-config"]
     elif (obj_type in ['virtual-machine'] or (obj_type == 'tag' and project == None)):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s"]}' % (obj_type, name), headers=vnc_api_headers)
+      return [name]
     elif (obj_type in ['global-vrouter-config']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "default-global-vrouter-config"]}' % (obj_type), headers=vnc_api_headers)
+      return ["default-global-system-config", "default-global-vrouter-config"]
     elif (obj_type in ['bgp-router']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-domain", "default-project", "ip-fabric", "__default__", "%s"]}' % (obj_type, name), headers=vnc_api_headers)
+      return ["default-domain", "default-project", "ip-fabric", "__default__", name]
     elif (obj_type in ['fabric', 'api-access-list']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "%s"]}' % (obj_type, name), headers=vnc_api_headers)
+      return ["default-global-system-config", name]
     elif (obj_type in ['virtual-port-group']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (obj_type, fabric, name), headers=vnc_api_headers)
+      return ["default-global-system-config", fabric, name]
     elif (obj_type in ['physical-interface']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (obj_type, physical_router, name), headers=vnc_api_headers)
+      return ["default-global-system-config", physical_router, name]
     elif (obj_type in ['application-policy-set', 'firewall-rule', 'firewall-policy'] and project == None):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-policy-management", "%s"]}' % (obj_type, name), headers=vnc_api_headers)
+      return ["default-policy-management", name]
     elif (obj_type in ['service-template']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s", "%s"]}' % (obj_type, domain, name), headers=vnc_api_headers)
+      return [domain, name]
     elif (obj_type in ['loadbalancer-member']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s", "%s", "%s", "%s"]}' % (obj_type, domain, project, loadbalancer_pool, name), headers=vnc_api_headers)
+      return [domain, project, loadbalancer_pool, name]
     else:
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s", "%s", "%s"]}' % (obj_type, domain, project, name), headers=vnc_api_headers)
+      return [domain, project, name]
+
+def login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain='default-domain', project='default-project', fabric='dummy', physical_router='dummy', loadbalancer_pool='dummy'):
+    controller_ip = controller_ip
+    config_api_url = 'http://' + controller_ip + ':8082/'
+    web_api_url = 'https://' + controller_ip + ':8143/'
+    module=module
+
+    keystone_login(module, controller_ip)
+
+    ## check if the fqname exists
+    fq_name = object_fq_name(obj_type, name, domain, project, fabric, physical_router, loadbalancer_pool)
+    if create_first_enabled(module, obj_type, state):
+      ## create-first: skip the lookup, and create the object with the uuid derived from its fq_name (crud raises CreateConflict if it exists)
+      return (web_login(web_api_url, username, password), False, deterministic_uuid(obj_type, fq_name), {})
+    response = transport.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": obj_type, "fq_name": fq_name}), headers=vnc_api_headers)
     if response.status_code == 200:
       update = True
       uuid = json.loads(response.text).get("uuid")
@@ -81,20 +180,56 @@ def login_and_check_id(module, name, obj_type, controller_ip, username, password
     else:
       module.fail_json("config-api's /fqname-to-id failed.")
 
-    ## login to web API
-    web_api = requests.session()
-    response = web_api.post(web_api_url + 'authenticate', data=json.dumps({"username": username, "password": password}), headers=web_api_headers, verify=False)
-    csrftoken=web_api.cookies['_csrf']
-    web_api_headers["x-csrf-token"]=csrftoken
+    web_api = web_login(web_api_url, username, password)
 
     js={}
     if update and (state=='present' or obj_type == 'api-access-list'):
-      response = web_api.post(web_api_url + 'api/tenants/config/get-config-objects', data=json.dumps({"data": [{"type": obj_type, "uuid": ["{}".format(uuid)]}]}), headers=web_api_headers, verify=False)
-      js = json.loads(response.text)[0]
+      js = cached_object(obj_type, uuid, controller_ip)
+      if js == None:
+        try:
+          js = read_object(web_api, controller_ip, obj_type, uuid)
+        except WebLoginError as e:
+          module.fail_json(msg=str(e))
 
     return (web_api, update, uuid, js)
 
 
+def read_object(web_api, controller_ip, obj_type, uuid):
+    web_api_url = 'https://' + controller_ip + ':8143/'
+    response = web_api.post(web_api_url + 'api/tenants/config/get-config-objects', data=json.dumps({"data": [{"type": obj_type, "uuid": ["{}".format(uuid)]}]}), headers=web_api_headers, verify=False)
+    js = json.loads(response.text)[0]
+    object_cache.put(obj_type, uuid, js, last_modified=last_modified(js, obj_type))
+    return js
+
+
+##
+# read-modify-write of a whole object, with optimistic concurrency
+#  modify(js): applies the change of this task to the object read, and returns it
+#  write(js): writes the modified object, and its return value is returned
+#
+# write is called only when id_perms.last_modified on the controller is still the one of the object read,
+# otherwise the object is read again and modify is re-applied (after exponential backoff with jitter, from the second retry).
+#
+# check and write of the same object are serialized among forks on the ansible controller node by a file lock,
+# since config-api has no conditional write, and writes just between the check and the write would not be detected.
+# writes by others (such as webui users) are detected by the check.
+##
+def update_object(module, web_api, controller_ip, obj_type, uuid, js, modify, write, retries=5, backoff=0.2):
+    with object_lock(uuid):
+      for attempt in range(retries + 1):
+        read_last_modified = last_modified(js, obj_type)
+        if read_last_modified == None or list_last_modified(controller_ip, obj_type, [uuid]).get(uuid) == read_last_modified:
+          return write(modify(js))
+        object_cache.evict(uuid)
+        if attempt > 0:
+          time.sleep(backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        try:
+          js = read_object(web_api, controller_ip, obj_type, uuid)
+        except WebLoginError as e:
+          module.fail_json(msg=str(e))
+    module.fail_json(msg="{} {} is modified concurrently, and retries are exhausted".format(obj_type, uuid))
+
+
 ##
 # crud (web_api, 'present', result, payload)
 # crud (web_api, 'absent', result, obj_type='virtual-network', uuid='xxxx-xxxx')
@@ -103,28 +238,41 @@ def crud(web_api, controller_ip, update, state, result, payload='{}', obj_type='
     web_api_url = 'https://' + controller_ip + ':8143/'
     failed=False
 
-    csrftoken=web_api.cookies['_csrf']
+    if state == "absent" and not update and not obj_type == 'api-access-list':
+      result["message"]="delete is requested, but that fq_name is not avaialbe"
+      result["changed"]=False
+      return True
+
+    try:
+      csrftoken=web_api.cookies['_csrf']
+    except WebLoginError as e:
+      result["message"]=str(e)
+      result["changed"]=False
+      return True
     vnc_api_headers["x-csrf-token"]=csrftoken
 
     if state == "present" or obj_type == 'api-access-list':
       if update:
-        print ("update object")
-
         if obj_type == 'service-instance':
           response = web_api.put(web_api_url + 'api/tenants/config/service-instances/' + uuid, data=payload, headers=web_api_headers, verify=False)
         else:
           response = web_api.post(web_api_url + 'api/tenants/config/update-config-object', data=payload, headers=web_api_headers, verify=False)
       else:
-        print ("create object")
         if obj_type == 'service-instance':
           response = web_api.post(web_api_url + 'api/tenants/config/service-instances', data=payload, headers=web_api_headers, verify=False)
         elif obj_type == 'loadbalancer':
           response = web_api.post(web_api_url + 'api/tenants/config/lbaas/load-balancer', data=payload, headers=web_api_headers, verify=False)
         else:
+          if uuid:
+            ## create-first: uuid is given by login_and_check_id
+            js = json.loads(payload)
+            js[obj_type]["uuid"] = uuid
+            payload = json.dumps(js)
           response = web_api.post(web_api_url + 'api/tenants/config/create-config-object', data=payload, headers=web_api_headers, verify=False)
+          if uuid and response.status_code == 409:
+            raise CreateConflict(response.text)
     elif (state == "absent"):
       if update:
-        print ("delete object {}".format(uuid))
         if obj_type == 'loadbalancer':
           response = web_api.post(web_api_url + 'api/tenants/config/lbaas/load-balancer/delete', data=json.dumps({"uuids": [uuid]}), headers=web_api_headers, verify=False)
         else:
@@ -132,32 +280,295 @@ def crud(web_api, controller_ip, update, state, result, payload='{}', obj_type='
           if not userData == {}:
             delete_data[0]["userData"]=userData
           response = web_api.post(web_api_url + 'api/tenants/config/delete', data=json.dumps(delete_data), headers=web_api_headers, verify=False)
-      else:
-        result["message"]="delete is requested, but that fq_name is not avaialbe"
-        result["changed"]=False
-        return True
     message = response.text
 
     if response.status_code == 200:
       result['changed'] = True
+      if state == "absent" and not obj_type == 'api-access-list':
+        set_object_result(result, 'delete', obj_type, uuid, payload, message)
+        object_cache.evict(uuid)
+        evict_fqname(obj_type, uuid, result.get('fq_name'))
+      elif update:
+        set_object_result(result, 'update', obj_type, uuid, payload, message)
+        update_cache(obj_type, uuid, message)
+      else:
+        set_object_result(result, 'create', obj_type, uuid, payload, message)
+        evict_fqname(obj_type, result.get('uuid'), result.get('fq_name'))
     else:
       result['changed'] = False
       failed = True
+      object_cache.evict(uuid)
 
     result['message'] = message
 
     return failed
 
 
+##
+# set uuid / fq_name / operation of the object written by crud into result (used by bulk journal)
+##
+def set_object_result(result, operation, obj_type, uuid, payload, message):
+    result['operation'] = operation
+    result['type'] = obj_type
+    try:
+      result['fq_name'] = json.loads(payload).get(obj_type, {}).get('fq_name')
+    except (ValueError, AttributeError):
+      pass
+    if not uuid:
+      ## create-config-object returns created object, such as [{"virtual-network": {"uuid": ...}}]
+      try:
+        js = json.loads(message)
+        if isinstance(js, list):
+          js = js[0]
+        uuid = js.get(obj_type, {}).get('uuid')
+      except (ValueError, AttributeError, IndexError):
+        pass
+    result['uuid'] = uuid
+
+
+def list_last_modified(controller_ip, obj_type, uuids):
+    ##
+    # id_perms.last_modified of objects, by list api with field projection: {uuid: last_modified}
+    # objects which don't exist anymore are not included
+    ##
+    config_api_url = 'http://' + controller_ip + ':8082/'
+    current = {}
+    for i in range(0, len(uuids), 200):
+      response = transport.get(config_api_url + obj_type + 's?detail=true&fields=id_perms&obj_uuids=' + ','.join(uuids[i:i + 200]), headers=vnc_api_headers)
+      if not response.status_code == 200:
+        continue
+      for obj in json.loads(response.text).get(obj_type + 's', []):
+        obj = obj.get(obj_type, obj)
+        current[obj.get("uuid")] = obj.get("id_perms", {}).get("last_modified")
+    return current
+
+
+def list_objects(module, controller_ip, obj_type, query=None, page_limit=1000):
+    ##
+    # objects of obj_type by list api, one page (page_limit objects) at a time, as a generator of {...} (without "<obj_type>" key)
+    #  query: other parameters of the list api, such as {"detail": "true", "fields": "...", "parent_id": "...", "filters": "..."}
+    # pages are followed by page_marker, so only one page is kept in memory
+    ##
+    config_api_url = 'http://' + controller_ip + ':8082/'
+    marker = None
+    while True:
+      params = dict(query or {})
+      params["page_limit"] = page_limit
+      if marker:
+        params["page_marker"] = marker
+      response = transport.get(config_api_url + obj_type + 's?' + urlencode(sorted(params.items())), headers=vnc_api_headers)
+      if response.status_code == 401:
+        module.fail_json(msg="config-api's list access is not authorized. please check keystone client env, such as OS_AUTH_URL.")
+      elif not response.status_code == 200:
+        module.fail_json(msg="config-api's list of {} failed: {}".format(obj_type, response.text))
+      js = json.loads(response.text)
+      objs = js.get(obj_type + 's', [])
+      for obj in objs:
+        yield obj.get(obj_type, obj)
+      marker = js.get("marker")
+      if not objs or not marker or marker == 'None':
+        return
+
+
+def cached_object(obj_type, uuid, controller_ip):
+    ## cached object, when it is not changed since it was read
+    entry = object_cache.entry(uuid)
+    if entry == None or not entry.get("type") == obj_type:
+      return None
+    if not object_cache.is_validated(uuid):
+      current = list_last_modified(controller_ip, obj_type, [uuid])
+      if entry.get("last_modified") == None or not current.get(uuid) == entry.get("last_modified"):
+        object_cache.evict(uuid)
+        return None
+      object_cache.set_validated(uuid)
+    return object_cache.get(obj_type, uuid)
+
+
+def revalidate_cache(module, controller_ip):
+    ## revalidate all the cached objects by one list call per type (and 200 uuids), before the items of a bulk run read them
+    if not object_cache.path:
+      return
+    keystone_login(module, controller_ip)
+    entries = {}
+    for entry in object_cache.entries():
+      entries.setdefault(entry.get("type"), []).append(entry)
+    for obj_type in entries:
+      current = list_last_modified(controller_ip, obj_type, [entry["uuid"] for entry in entries[obj_type]])
+      for entry in entries[obj_type]:
+        if entry.get("last_modified") and current.get(entry["uuid"]) == entry["last_modified"]:
+          object_cache.set_validated(entry["uuid"])
+        else:
+          object_cache.evict(entry["uuid"])
+
+
+def update_cache(obj_type, uuid, message):
+    ##
+    # when the response has the updated object with its last_modified, that one is cached, and is valid as it is.
+    # otherwise the cached object is removed, since the payload might be a part of the object (such as global_system_config's),
+    # and its last_modified is not known, so the next read gets it from the controller
+    ##
+    try:
+      js = json.loads(message)
+      if isinstance(js, list):
+        js = js[0]
+    except (ValueError, IndexError):
+      js = None
+    if isinstance(js, dict) and isinstance(js.get(obj_type), dict) and js[obj_type].get("uuid") == uuid and last_modified(js, obj_type):
+      object_cache.put(obj_type, uuid, js, last_modified=last_modified(js, obj_type))
+    else:
+      object_cache.evict(uuid)
+
+
 def fqname_to_id (module, fqname, obj_type, controller_ip):
   config_api_url = 'http://' + controller_ip + ':8082/'
-  if (type(fqname) == str):
+  ## isinstance, since args of tf_batch sub-tasks are str subclasses (ansible's tagged / unsafe text)
+  if isinstance(fqname, string_types):
     fqname_list = fqname.split (":")
   else:
     fqname_list = fqname
 
-  response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": obj_type, "fq_name": fqname_list}), headers=vnc_api_headers)
+  key = (obj_type, tuple(fqname_list))
+  uuid = fqname_cache.get(key)
+  if uuid:
+    return uuid
+
+  response = transport.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": obj_type, "fq_name": fqname_list}), headers=vnc_api_headers)
   if not response.status_code == 200:
-    module.fail_json(msg="{} specified doesn't exist".fqname, **result)
+    module.fail_json(msg="{} {} doesn't exist".format(obj_type, ":".join(fqname_list)))
   uuid = json.loads(response.text).get("uuid")
+  fqname_cache[key] = uuid
   return uuid
+
+
+def evict_fqname(obj_type, uuid, fq_name=None):
+  ## fqname-to-id results of an object deleted or created by crud are not reused (such as by later sub-tasks of tf_batch)
+  key = (obj_type, tuple(fq_name or []))
+  for cached_key in [cached_key for cached_key, cached_uuid in list(fqname_cache.items()) if cached_key == key or (uuid and cached_uuid == uuid)]:
+    fqname_cache.pop(cached_key, None)
+
+
+##
+# wait until a job started by /execute-job finishes
+#  job status is queried from analytics (ObjectJobExecutionTable), and returns 'SUCCESS', 'FAILURE' or 'TIMEOUT'
+#  progress (module_utils/progress.py) is updated while waiting, to be visible from async_status
+##
+def wait_for_job(controller_ip, job_execution_id, timeout, progress=None, interval=10):
+  analytics_url = 'http://' + controller_ip + ':8081/analytics/query'
+  start = time.time()
+  while True:
+    for status in ['SUCCESS', 'FAILURE']:
+      query = {"table": "ObjectJobExecutionTable", "start_time": "now-{}s".format(int(time.time() - start) + 600), "end_time": "now",
+               "select_fields": ["MessageTS", "Messagetype"],
+               "where": [[{"name": "ObjectId", "value": "{}:{}".format(job_execution_id, status), "op": 1}]]}
+      response = transport.post(analytics_url, data=json.dumps(query), headers=vnc_api_headers)
+      if response.status_code == 200 and len(json.loads(response.text).get("value", [])) > 0:
+        if progress:
+          progress.close(status=status)
+        return status
+    if time.time() - start > timeout:
+      if progress:
+        progress.close(status='TIMEOUT')
+      return 'TIMEOUT'
+    if progress:
+      progress.update(status='running')
+    time.sleep(interval)
+
+
+##
+# run_with_profile (run_module, 'virtual_network')
+#
+# when TF_PROFILE_DIR is set, run_module() is executed under a profiler and the stats are written
+# to TF_PROFILE_DIR/<module_name>-<timestamp>-<pid>.<ext>
+#  TF_PROFILE_MODE=cprofile (default): pstats file (.prof), readable by python -m pstats or snakeviz
+#  TF_PROFILE_MODE=sample: low-overhead stack sampling of wall-clock time (.folded), readable by flamegraph.pl / speedscope
+#
+# threads started by run_module (such as ThreadPool workers of bulk runs, snapshot, restore and purge) are profiled too:
+# cprofile stats of all the threads are merged, and sampled stacks are prefixed by the thread name
+##
+def run_with_profile(run_module, module_name):
+  profile_dir = os.getenv('TF_PROFILE_DIR')
+  if not profile_dir:
+    return run_module()
+
+  if not os.path.isdir(profile_dir):
+    try:
+      os.makedirs(profile_dir)
+    except OSError:
+      pass
+  profile_mode = os.getenv('TF_PROFILE_MODE', 'cprofile')
+  profile_path = os.path.join(profile_dir, '{}-{}-{}'.format(module_name, time.strftime('%Y%m%d%H%M%S'), os.getpid()))
+
+  if profile_mode == 'sample':
+    return _run_with_sampler(run_module, profile_path + '.folded', float(os.getenv('TF_PROFILE_INTERVAL', '0.005')))
+
+  import cProfile
+  import pstats
+  profiler = cProfile.Profile()
+  thread_profilers = []
+
+  def profile_thread(frame, event, arg):
+    ## called at the first event of a new thread: its own profiler takes over
+    import sys
+    sys.setprofile(None)
+    thread_profiler = cProfile.Profile()
+    try:
+      thread_profiler.enable()
+    except ValueError:
+      ## python 3.12 or later: the profiler of the main thread already sees all the threads
+      return
+    thread_profilers.append(thread_profiler)
+
+  threading.setprofile(profile_thread)
+  try:
+    # exit_json / fail_json raise SystemExit, so stats are dumped in finally
+    return profiler.runcall(run_module)
+  finally:
+    threading.setprofile(None)
+    stats = pstats.Stats(profiler)
+    for thread_profiler in thread_profilers:
+      try:
+        stats.add(thread_profiler)
+      except TypeError:
+        ## a thread which has no stats
+        pass
+    stats.dump_stats(profile_path + '.prof')
+
+
+def _run_with_sampler(run_module, profile_path, interval):
+  ##
+  # a sampler thread reads the stacks of all the other threads by sys._current_frames() every interval (wall-clock),
+  # since a signal handler runs only in the main thread, and not while it is blocked (such as in pool.map)
+  ##
+  import sys
+  samples = {}
+  stop = threading.Event()
+
+  def sample():
+    names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+    for ident, frame in sys._current_frames().items():
+      if ident == sampler.ident:
+        continue
+      stack = []
+      while frame is not None:
+        code = frame.f_code
+        stack.append('{} ({}:{})'.format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+        frame = frame.f_back
+      stack.append(names.get(ident, 'thread-{}'.format(ident)))
+      key = ';'.join(reversed(stack))
+      samples[key] = samples.get(key, 0) + 1
+
+  def run_sampler():
+    while not stop.wait(interval):
+      sample()
+
+  sampler = threading.Thread(target=run_sampler, name='tf-profile-sampler')
+  sampler.daemon = True
+  sampler.start()
+  try:
+    return run_module()
+  finally:
+    stop.set()
+    sampler.join()
+    with open(profile_path, 'w') as f:
+      for key in samples:
+        f.write('{} {}\n'.format(key, samples[key]))
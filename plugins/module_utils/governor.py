@@ -0,0 +1,182 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# request governor shared by all the module processes on the ansible controller node (forks)
+#
+#  TF_RATE_LIMIT=read=50,write=10,job=1  requests per second, per controller node and endpoint class
+#  TF_MAX_INFLIGHT=write=4,job=1         requests in flight, per controller node and endpoint class
+#  TF_GOVERNOR_DIR=/path/to/dir          state directory (default: <tmpdir>/tf-governor-<uid>)
+#
+# endpoint classes:
+#  read: GET, and POST which doesn't change anything (fqname-to-id, get-config-objects, analytics query, login)
+#  job: execute-job
+#  write: others
+#
+# rate limit is a token bucket in a file, updated under flock, so it is shared by processes and threads.
+# in-flight limit is N slot files, and a request holds flock of one of them while it is sent.
+# both are released by the kernel when a process is killed, so no stale state is left.
+##
+
+import os
+import time
+import fcntl
+import tempfile
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+
+endpoint_classes = ['read', 'write', 'job']
+read_posts = ['fqname-to-id', 'id-to-fqname', 'get-config-objects', 'analytics/query', 'authenticate', 'auth/tokens', 'list-bulk-collection']
+
+
+class GovernorError(Exception):
+  pass
+
+
+def parse_limits(value, name):
+  ## 'read=50,write=10' -> {'read': 50.0, 'write': 10.0}, a number without class applies to all the classes
+  limits = {}
+  for token in (value or '').split(','):
+    token = token.strip()
+    if not token:
+      continue
+    try:
+      if '=' in token:
+        k, v = token.split('=', 1)
+        if not k.strip() in endpoint_classes:
+          raise ValueError(k)
+        limits[k.strip()] = float(v)
+      else:
+        for k in endpoint_classes:
+          limits[k] = float(token)
+    except ValueError:
+      raise GovernorError("{} should be like read=50,write=10,job=1: {}".format(name, value))
+  return limits
+
+
+def endpoint_class(method, url):
+  if method == 'GET':
+    return 'read'
+  path = urlparse(url).path
+  if path.endswith('execute-job'):
+    return 'job'
+  if method == 'POST' and any(path.endswith(read_post) for read_post in read_posts):
+    return 'read'
+  return 'write'
+
+
+def state_dir():
+  return os.getenv('TF_GOVERNOR_DIR') or os.path.join(tempfile.gettempdir(), 'tf-governor-{}'.format(os.getuid()))
+
+
+def make_state_dir(path):
+  if not os.path.isdir(path):
+    try:
+      os.makedirs(path)
+    except OSError:
+      if not os.path.isdir(path):
+        raise
+
+
+class FileLock(object):
+  ##
+  # lock shared by processes and threads on the ansible controller node
+  #  with object_lock(uuid): ...
+  ##
+  def __init__(self, path):
+    self.path = path
+    self.f = None
+
+  def __enter__(self):
+    make_state_dir(os.path.dirname(self.path))
+    self.f = open(self.path, 'a')
+    fcntl.flock(self.f, fcntl.LOCK_EX)
+    return self
+
+  def __exit__(self, *args):
+    fcntl.flock(self.f, fcntl.LOCK_UN)
+    self.f.close()
+    self.f = None
+
+
+def object_lock(name):
+  return FileLock(os.path.join(state_dir(), os.path.basename(name) + '.lock'))
+
+
+class Slot(object):
+  def __init__(self, f):
+    self.f = f
+
+  def release(self):
+    if self.f:
+      fcntl.flock(self.f, fcntl.LOCK_UN)
+      self.f.close()
+      self.f = None
+
+
+class Governor(object):
+  def __init__(self):
+    self.rate_limits = parse_limits(os.getenv('TF_RATE_LIMIT'), 'TF_RATE_LIMIT')
+    self.max_inflight = parse_limits(os.getenv('TF_MAX_INFLIGHT'), 'TF_MAX_INFLIGHT')
+    self.enabled = bool(self.rate_limits or self.max_inflight)
+    self.state_dir = state_dir()
+    if self.enabled:
+      make_state_dir(self.state_dir)
+
+  def state_path(self, host, klass, suffix):
+    return os.path.join(self.state_dir, '{}-{}.{}'.format(host, klass, suffix))
+
+  def acquire(self, method, url):
+    ## blocks until the request can be sent, returns a slot which should be released after the response is read
+    if not self.enabled:
+      return None
+    host = urlparse(url).hostname
+    klass = endpoint_class(method, url)
+    slot = None
+    if self.max_inflight.get(klass):
+      slot = self.acquire_slot(host, klass, int(max(1, self.max_inflight[klass])))
+    if self.rate_limits.get(klass):
+      try:
+        self.take_token(host, klass, self.rate_limits[klass])
+      except Exception:
+        if slot:
+          slot.release()
+        raise
+    return slot
+
+  def take_token(self, host, klass, rate):
+    ##
+    # token bucket: "<tokens> <timestamp>", refilled by rate per second up to rate (1 sec burst)
+    # tokens can be negative, which means the request reserved a future token, and waits for it outside of the lock
+    ##
+    burst = max(1.0, rate)
+    with open(self.state_path(host, klass, 'bucket'), 'a+') as f:
+      fcntl.flock(f, fcntl.LOCK_EX)
+      f.seek(0)
+      now = time.time()
+      try:
+        tokens, last = [float(v) for v in f.read().split()]
+      except ValueError:
+        tokens, last = burst, now
+      tokens = min(burst, tokens + (now - last) * rate) - 1
+      f.seek(0)
+      f.truncate()
+      f.write('{} {}'.format(tokens, now))
+      f.flush()
+      fcntl.flock(f, fcntl.LOCK_UN)
+    if tokens < 0:
+      time.sleep(-tokens / rate)
+
+  def acquire_slot(self, host, klass, count):
+    interval = 0.01
+    while True:
+      for i in range(count):
+        f = open(self.state_path(host, klass, 'slot{}'.format(i)), 'a')
+        try:
+          fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+          return Slot(f)
+        except (IOError, OSError):
+          f.close()
+      time.sleep(interval)
+      interval = min(interval * 2, 0.05)
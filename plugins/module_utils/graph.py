@@ -0,0 +1,284 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# object graph index, for impact analysis
+#
+# graph = build_graph(module, controller_ip, ['virtual-network', 'network-policy', ...])
+# graph.referenced_by(uuid)   ## [(uuid, relation)], objects which refer to it ('ref') or are its children ('child')
+# graph.references(uuid)      ## [(uuid, relation)], objects which it refers to ('ref') or its parent ('parent')
+# graph.closure(uuid, 'referenced_by', max_depth=None)  ## transitive, [(uuid, depth, relation, via uuid)]
+# (levels, unlinks) = delete_plan(graph, uuid)            ## cascade delete order
+#
+# objects are numbered by integer ids, and edges are kept as adjacency arrays (CSR: offsets and targets, array('i')),
+# so that a graph of a few hundred thousand objects fits in some tens of MB, and traversals don't touch dicts.
+# objects are listed with field projection (fq_name, parent and refs to the types indexed), since the graph needs nothing else,
+# so refs to types which are not indexed are not read. parents which are not read (types not indexed) are also numbered,
+# with type / fq_name from the child, and so are objects referred to but not read, such as the ones deleted meanwhile.
+#
+# graph.obj_types is the list of types given to build_graph (None: all the types), and it is kept with the index by save / load
+##
+
+import json
+import threading
+from array import array
+from ansible.module_utils._text import to_text
+from multiprocessing.pool import ThreadPool
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import list_objects
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import ItemModule, ItemExit, open_text
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import ref_type
+
+PARENT = 0
+REF = 1
+
+relations = {
+  'references': {PARENT: 'parent', REF: 'ref'},
+  'referenced_by': {PARENT: 'child', REF: 'ref'}
+}
+
+
+class ObjectGraph(object):
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.ids = {}
+    self.uuids = []
+    self.types = []
+    self.type_ids = {}
+    self.node_types = array('i')
+    self.fq_names = []
+    ## (source, target, kind) triples, until freeze
+    self.edges = array('i')
+    self.out_offsets = self.out_targets = self.out_kinds = None
+    self.in_offsets = self.in_sources = self.in_kinds = None
+    self.obj_types = None
+
+  def type_id(self, obj_type):
+    type_id = self.type_ids.get(obj_type)
+    if type_id is None:
+      type_id = self.type_ids[obj_type] = len(self.types)
+      self.types.append(obj_type)
+    return type_id
+
+  def node_id(self, uuid, obj_type='', fq_name=None, read=False):
+    ## a node created by a ref is updated when the object itself is read
+    i = self.ids.get(uuid)
+    if i is None:
+      i = self.ids[uuid] = len(self.uuids)
+      self.uuids.append(uuid)
+      self.node_types.append(self.type_id(obj_type or ''))
+      self.fq_names.append(':'.join(fq_name or []))
+    elif read:
+      self.node_types[i] = self.type_id(obj_type)
+      self.fq_names[i] = ':'.join(fq_name or [])
+    return i
+
+  def add(self, obj_type, obj):
+    with self.lock:
+      i = self.node_id(obj["uuid"], obj_type, obj.get("fq_name"), read=True)
+      if obj.get("parent_uuid"):
+        self.edges.extend([i, self.node_id(obj["parent_uuid"], obj.get("parent_type"), obj.get("fq_name", [])[:-1]), PARENT])
+      for field, value in obj.items():
+        if not field.endswith('_refs') or field.endswith('_back_refs'):
+          continue
+        for ref in value or []:
+          if ref.get("uuid"):
+            self.edges.extend([i, self.node_id(ref["uuid"], ref_type(field), ref.get("to")), REF])
+
+  def freeze(self):
+    ## edges -> adjacency arrays of both directions
+    n = len(self.uuids)
+    sources = self.edges[0::3]
+    targets = self.edges[1::3]
+    kinds = self.edges[2::3]
+    (self.out_offsets, self.out_targets, self.out_kinds) = adjacency(n, sources, targets, kinds)
+    (self.in_offsets, self.in_sources, self.in_kinds) = adjacency(n, targets, sources, kinds)
+    return self
+
+  def neighbors(self, i, direction):
+    if direction == 'references':
+      (offsets, nodes, kinds) = (self.out_offsets, self.out_targets, self.out_kinds)
+    else:
+      (offsets, nodes, kinds) = (self.in_offsets, self.in_sources, self.in_kinds)
+    return zip(nodes[offsets[i]:offsets[i + 1]], kinds[offsets[i]:offsets[i + 1]])
+
+  def node(self, i):
+    return {"type": self.types[self.node_types[i]], "uuid": self.uuids[i], "fq_name": self.fq_names[i].split(':') if self.fq_names[i] else []}
+
+  def references(self, uuid):
+    return [(self.uuids[j], relations['references'][kind]) for (j, kind) in self.neighbors(self.ids[uuid], 'references')]
+
+  def referenced_by(self, uuid):
+    return [(self.uuids[j], relations['referenced_by'][kind]) for (j, kind) in self.neighbors(self.ids[uuid], 'referenced_by')]
+
+  def closure(self, uuid, direction, max_depth=None):
+    ## breadth first: [(uuid, depth, relation, via uuid)], each object once, at its shortest depth
+    start = self.ids[uuid]
+    seen = set([start])
+    frontier = [start]
+    found = []
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+      depth += 1
+      next_frontier = []
+      for i in frontier:
+        for (j, kind) in self.neighbors(i, direction):
+          if not j in seen:
+            seen.add(j)
+            next_frontier.append(j)
+            found.append((self.uuids[j], depth, relations[direction][kind], self.uuids[i]))
+      frontier = next_frontier
+    return found
+
+  def save(self, path):
+    with open_text(path, 'w') as f:
+      f.write(to_text(json.dumps({"obj_types": self.obj_types, "uuids": self.uuids, "types": self.types, "node_types": self.node_types.tolist(), "fq_names": self.fq_names, "edges": self.edges.tolist()})))
+
+  @classmethod
+  def load(cls, path):
+    with open_text(path, 'r') as f:
+      js = json.load(f)
+    graph = cls()
+    ## an index saved without obj_types is not matched by any request
+    graph.obj_types = js.get("obj_types", False)
+    graph.uuids = js["uuids"]
+    graph.ids = dict((uuid, i) for i, uuid in enumerate(graph.uuids))
+    graph.types = js["types"]
+    graph.type_ids = dict((obj_type, i) for i, obj_type in enumerate(graph.types))
+    graph.node_types = array('i', js["node_types"])
+    graph.fq_names = js["fq_names"]
+    graph.edges = array('i', js["edges"])
+    return graph.freeze()
+
+
+def adjacency(n, sources, targets, kinds):
+  ## (offsets, targets, kinds): targets of node i are targets[offsets[i]:offsets[i + 1]]
+  offsets = array('i', [0] * (n + 1))
+  for source in sources:
+    offsets[source + 1] += 1
+  for i in range(n):
+    offsets[i + 1] += offsets[i]
+  position = array('i', offsets)
+  sorted_targets = array('i', [0] * len(targets))
+  sorted_kinds = array('i', [0] * len(targets))
+  for (source, target, kind) in zip(sources, targets, kinds):
+    sorted_targets[position[source]] = target
+    sorted_kinds[position[source]] = kind
+    position[source] += 1
+  return (offsets, sorted_targets, sorted_kinds)
+
+
+def graph_fields(obj_types):
+  ## fields which the graph needs: fq_name, parent, and refs to obj_types (config-api returns the ones which each type has)
+  return ','.join(['fq_name', 'parent_type', 'parent_uuid'] + sorted(obj_type.replace('-', '_') + '_refs' for obj_type in obj_types))
+
+
+def build_graph(module, controller_ip, obj_types, workers=8, page_limit=1000, all_types=False):
+  ## objects of obj_types are read concurrently, each type by paginated list calls (all_types: obj_types are all the types)
+  graph = ObjectGraph()
+  graph.obj_types = None if all_types else sorted(obj_types)
+  query = {"detail": "true", "fields": graph_fields(obj_types)}
+  def read_type(obj_type):
+    try:
+      for obj in list_objects(ItemModule(module, module.params), controller_ip, obj_type, query=query, page_limit=page_limit):
+        graph.add(obj_type, obj)
+    except ItemExit as e:
+      return "{}: {}".format(obj_type, e.result.get("msg"))
+    return None
+  pool = ThreadPool(max(1, min(workers, len(obj_types) or 1)))
+  try:
+    errors = [error for error in pool.map(read_type, obj_types) if error]
+  finally:
+    pool.close()
+    pool.join()
+  if errors:
+    module.fail_json(msg="objects cannot be read: {}".format(', '.join(errors)))
+  return graph.freeze()
+
+
+##
+# cascade delete plan
+#  objects to be deleted: the object, its children, and objects which refer to them and are under the object (by fq_name)
+#  or depend on them by dependent_types (such as instance-ip of a virtual-machine-interface), transitively.
+#  other objects which refer to them are not deleted, and their refs are removed (unlinks), so that a port of another project
+#  which refers to a security-group or a tag being deleted is kept.
+#  children of managed_types (such as routing-instance of a virtual-network) are deleted by the controller with their parent.
+##
+## type -> types by whose refs it is deleted with them
+dependent_types = {
+  'virtual-machine-interface': ['virtual-network', 'virtual-machine'],
+  'instance-ip': ['virtual-machine-interface', 'virtual-network'],
+  'floating-ip': ['virtual-machine-interface', 'virtual-network'],
+  'alias-ip': ['virtual-machine-interface', 'virtual-network']
+}
+managed_types = ['routing-instance', 'access-control-list']
+
+
+def delete_plan(graph, uuid, dependents=None, managed=None):
+  ##
+  # returns (levels, unlinks)
+  #  levels: [[uuid, ...], ...], objects of a level can be deleted concurrently, after the former levels
+  #  unlinks: [(uuid, ref uuid), ...], refs removed before deletes: refs from the objects not deleted,
+  #           and refs in a cycle among the objects deleted
+  ##
+  dependents = dependent_types if dependents is None else dependents
+  managed = managed_types if managed is None else managed
+  start = graph.ids[uuid]
+  prefix = graph.fq_names[start] + ':'
+  def type_of(i):
+    return graph.types[graph.node_types[i]]
+
+  deleted = set([start])
+  referrers = []
+  frontier = [start]
+  while frontier:
+    next_frontier = []
+    for i in frontier:
+      for (j, kind) in graph.neighbors(i, 'referenced_by'):
+        if j in deleted:
+          continue
+        if kind == PARENT and type_of(j) in managed:
+          continue
+        if kind == PARENT or type_of(i) in dependents.get(type_of(j), ()) or graph.fq_names[j].startswith(prefix):
+          deleted.add(j)
+          next_frontier.append(j)
+        else:
+          referrers.append((j, i))
+    frontier = next_frontier
+  unlinks = [(graph.uuids[j], graph.uuids[i]) for (j, i) in sorted(set(referrers)) if not j in deleted]
+
+  ## topological sort: an object is deleted after its children and referrers which are deleted
+  kinds = {}
+  for i in deleted:
+    for (j, kind) in graph.neighbors(i, 'referenced_by'):
+      if j in deleted and not j == i:
+        kinds.setdefault((j, i), set()).add(kind)
+  waits = dict((i, 0) for i in deleted)
+  followers = dict((i, []) for i in deleted)
+  for (j, i) in kinds:
+    waits[i] += 1
+    followers[j].append(i)
+  ## refs which can be removed to break a cycle (not between a child and its parent)
+  ref_edges = set(pair for pair, pair_kinds in kinds.items() if not PARENT in pair_kinds)
+  levels = []
+  remaining = set(deleted)
+  while remaining:
+    level = sorted(i for i in remaining if waits[i] == 0)
+    if not level:
+      ## refs in a cycle are removed first
+      for (j, i) in sorted(ref_edges):
+        if j in remaining and i in remaining:
+          unlinks.append((graph.uuids[j], graph.uuids[i]))
+          waits[i] -= 1
+          followers[j].remove(i)
+          ref_edges.discard((j, i))
+      level = sorted(i for i in remaining if waits[i] == 0)
+      if not level:
+        raise ValueError("delete order cannot be decided, children are in a cycle")
+    for i in level:
+      for k in followers[i]:
+        waits[k] -= 1
+    remaining -= set(level)
+    levels.append([graph.uuids[i] for i in level])
+  return (levels, unlinks)
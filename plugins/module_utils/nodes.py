@@ -0,0 +1,121 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# controller nodes of a cluster, when controller_ip is a list
+#
+#  reads (GET, fqname-to-id etc) go to the healthy node with least requests in flight, and then lowest recent latency
+#  writes go to the first healthy node in controller_ip order
+#  reads fail over to the next node on connection errors and 503, and writes only when the connection failed (the request was not sent)
+#  webui sessions stay on the node they logged in to, while it is healthy
+#
+# node health ({"down_until", "latency"}) is kept in <TF_GOVERNOR_DIR>/nodes.json, shared by tasks and forks,
+# and a failed node is skipped for TF_NODE_DOWN_TIME seconds (default: 30)
+##
+
+import os
+import json
+import time
+import fcntl
+import threading
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.governor import state_dir, make_state_dir
+
+
+class Nodes(object):
+  def __init__(self):
+    self.nodes = []
+    self.down_time = float(os.getenv('TF_NODE_DOWN_TIME', '30'))
+    self.path = os.path.join(state_dir(), 'nodes.json')
+    self.lock = threading.Lock()
+    self.inflight = {}
+    self.health = {}
+    self.loaded = None
+    self.last_save = 0
+
+  def set(self, nodes):
+    self.nodes = list(nodes)
+    if len(self.nodes) > 1:
+      make_state_dir(os.path.dirname(self.path))
+
+  def handles(self, host):
+    return len(self.nodes) > 1 and host in self.nodes
+
+  def candidates(self, klass, sticky=None):
+    ## nodes in the order to be tried: healthy nodes first, and then down nodes which will be up soonest
+    with self.lock:
+      self.load()
+      now = time.time()
+      up = [node for node in self.nodes if self.health.get(node, {}).get("down_until", 0) <= now]
+      down = sorted([node for node in self.nodes if not node in up], key=lambda node: self.health[node]["down_until"])
+      if sticky in up:
+        up.remove(sticky)
+        up.insert(0, sticky)
+      elif klass == 'read':
+        ## a node without latency record is tried first, so that all the nodes are measured
+        up.sort(key=lambda node: (self.inflight.get(node, 0), self.health.get(node, {}).get("latency", 0)))
+      return up + down
+
+  def start(self, node):
+    with self.lock:
+      self.inflight[node] = self.inflight.get(node, 0) + 1
+
+  def done(self, node, elapsed=None, error=False):
+    with self.lock:
+      self.inflight[node] -= 1
+      now = time.time()
+      health = self.health.setdefault(node, {})
+      changed = False
+      if error:
+        health["down_until"] = now + self.down_time
+        changed = True
+      else:
+        if health.pop("down_until", None):
+          changed = True
+        latency = health.get("latency")
+        health["latency"] = round(elapsed if latency is None else latency * 0.7 + elapsed * 0.3, 4)
+      if changed or now - self.last_save > 1:
+        self.save()
+        self.last_save = now
+
+  def load(self):
+    ## reload only when another process updated the file
+    try:
+      mtime = os.stat(self.path).st_mtime
+    except OSError:
+      return
+    if mtime == self.loaded:
+      return
+    try:
+      with open(self.path) as f:
+        fcntl.flock(f, fcntl.LOCK_SH)
+        js = json.loads(f.read() or '{}')
+        fcntl.flock(f, fcntl.LOCK_UN)
+    except (IOError, OSError, ValueError):
+      return
+    self.loaded = mtime
+    for node in self.nodes:
+      if node in js:
+        self.health[node] = js[node]
+
+  def save(self):
+    try:
+      with open(self.path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+          js = json.loads(f.read() or '{}')
+        except ValueError:
+          js = {}
+        for node in self.nodes:
+          if node in self.health:
+            js[node] = self.health[node]
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(js))
+        f.flush()
+        fcntl.flock(f, fcntl.LOCK_UN)
+      self.loaded = os.stat(self.path).st_mtime
+    except (IOError, OSError):
+      pass
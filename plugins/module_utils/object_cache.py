@@ -0,0 +1,121 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# object cache shared by the tasks of a play
+#
+#  TF_OBJECT_CACHE=/path/to/dir
+#
+# objects read by get-config-objects are kept in <dir>/<uuid>.json as {"type", "uuid", "last_modified", "object"},
+# and the following tasks (and items of a bulk run) read them from there instead of the controller.
+#  - an object updated by this collection is replaced by the updated one in the response, or removed when the response doesn't have it
+#  - an object deleted by this collection, or whose write failed (such as conflict), is removed
+#
+# before a cached object is used, its last_modified is compared with the controller's one, which is read
+# by a list call with field projection (fields=id_perms), and the whole object is read only when it is changed
+# (module_utils/common.py: cached_object, revalidate_cache).
+# an object is revalidated once per module run, and bulk runs revalidate all the cached objects by one list call per type.
+##
+
+import os
+import copy
+import json
+import tempfile
+import threading
+
+
+class ObjectCache(object):
+  def __init__(self, path):
+    self.path = path
+    self.lock = threading.Lock()
+    ## uuid -> entry, read / written by this process
+    self.objects = {}
+    ## uuids whose last_modified is checked with the controller by this process
+    self.validated = set()
+    if self.path and not os.path.isdir(self.path):
+      try:
+        os.makedirs(self.path)
+      except OSError:
+        if not os.path.isdir(self.path):
+          raise
+
+  def object_path(self, uuid):
+    return os.path.join(self.path, os.path.basename(uuid) + '.json')
+
+  def entry(self, uuid):
+    if not self.path or not uuid:
+      return None
+    with self.lock:
+      entry = self.objects.get(uuid)
+    if entry is None:
+      try:
+        with open(self.object_path(uuid)) as f:
+          entry = json.load(f)
+      except (IOError, OSError, ValueError):
+        return None
+      with self.lock:
+        self.objects[uuid] = entry
+    return entry
+
+  def entries(self):
+    if not self.path:
+      return []
+    return [entry for entry in (self.entry(f[:-5]) for f in os.listdir(self.path) if f.endswith('.json')) if entry]
+
+  def get(self, obj_type, uuid):
+    ## returns a copy of cached {"<obj_type>": {...}}, or None
+    entry = self.entry(uuid)
+    if entry is None or not entry.get("type") == obj_type:
+      return None
+    return copy.deepcopy(entry["object"])
+
+  def is_validated(self, uuid):
+    with self.lock:
+      return uuid in self.validated
+
+  def set_validated(self, uuid):
+    with self.lock:
+      self.validated.add(uuid)
+
+  def put(self, obj_type, uuid, js, last_modified=None):
+    ## an object with last_modified is the one just read from the controller
+    if not self.path or not uuid:
+      return
+    entry = {"type": obj_type, "uuid": uuid, "last_modified": last_modified, "object": copy.deepcopy(js)}
+    with self.lock:
+      self.objects[uuid] = entry
+      if last_modified:
+        self.validated.add(uuid)
+      else:
+        self.validated.discard(uuid)
+    try:
+      fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+      with os.fdopen(fd, 'w') as f:
+        f.write(json.dumps(entry))
+      os.rename(tmp_path, self.object_path(uuid))
+    except (IOError, OSError):
+      self.evict(uuid)
+
+  def evict(self, uuid):
+    if not self.path or not uuid:
+      return
+    with self.lock:
+      self.objects.pop(uuid, None)
+      self.validated.discard(uuid)
+    try:
+      os.remove(self.object_path(uuid))
+    except OSError:
+      pass
+
+
+def last_modified(js, obj_type):
+  ## id_perms.last_modified of {"<obj_type>": {...}}
+  try:
+    return js[obj_type]["id_perms"]["last_modified"]
+  except (KeyError, TypeError):
+    return None
+
+
+object_cache = ObjectCache(os.getenv('TF_OBJECT_CACHE'))
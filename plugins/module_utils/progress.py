@@ -0,0 +1,124 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# progress record for long-running tasks (bulk runs, fabric job waits)
+#
+# progress = Progress(total=1000, path=module.params.get('progress_file'))
+# progress.add(changed=True, failed=False)  ## one item done
+# progress.update(status='running')         ## no item count, such as job wait
+# progress.close()
+#
+# the record ({"done", "total", "failed", "rate", "eta", "elapsed", "status"}) is written
+# at most once per 'interval' seconds:
+#  - to path, when it is given
+#  - when the module runs under async (async: / poll:), to the async job file as "progress",
+#    so that async_status shows it while the task is running
+##
+
+import os
+import json
+import time
+import glob
+import threading
+
+
+def async_job_path():
+  ##
+  # async_wrapper runs the module as a child process, with its own argv: async_wrapper <jid> <time_limit> <module> <argsfile>
+  # and writes the job status to <async_dir>/<jid>.<pid of async_wrapper>
+  ##
+  try:
+    with open('/proc/{}/cmdline'.format(os.getppid()), 'rb') as f:
+      argv = f.read().decode('utf-8', 'replace').split('\0')
+  except (IOError, OSError):
+    return None
+  for i in range(len(argv) - 1):
+    if 'async_wrapper' in os.path.basename(argv[i]):
+      async_dir = os.path.expanduser(os.getenv('ANSIBLE_ASYNC_DIR', '~/.ansible_async'))
+      job_paths = [path for path in glob.glob(os.path.join(async_dir, argv[i + 1] + '.*')) if not path.endswith('.tmp')]
+      if len(job_paths) == 1:
+        return job_paths[0]
+  return None
+
+
+class Progress(object):
+  def __init__(self, total=None, path=None, interval=5):
+    self.total = total
+    self.path = path
+    self.async_job = False
+    if self.path is None:
+      self.path = async_job_path()
+      self.async_job = not self.path is None
+    self.interval = interval
+    self.lock = threading.Lock()
+    self.start = time.time()
+    self.last_write = 0
+    self.done = 0
+    self.changed = 0
+    self.failed = 0
+    self.status = 'running'
+
+  def add(self, changed=False, failed=False):
+    with self.lock:
+      self.done += 1
+      if changed:
+        self.changed += 1
+      if failed:
+        self.failed += 1
+      self.write()
+
+  def update(self, status=None, force=False):
+    with self.lock:
+      if status:
+        self.status = status
+      self.write(force=force)
+
+  def close(self, status='finished'):
+    self.update(status=status, force=True)
+
+  def record(self):
+    elapsed = time.time() - self.start
+    rate = self.done / elapsed if elapsed > 0 else 0
+    record = {"done": self.done, "total": self.total, "changed": self.changed, "failed": self.failed,
+              "elapsed": round(elapsed, 1), "rate": round(rate, 2), "eta": None, "status": self.status}
+    if self.total and rate > 0:
+      record["eta"] = round((self.total - self.done) / rate, 1)
+    return record
+
+  def write(self, force=False):
+    if self.path is None:
+      return
+    now = time.time()
+    if not force and now - self.last_write < self.interval:
+      return
+    self.last_write = now
+
+    js = self.record()
+    if self.async_job:
+      ## keep the job status written by async_wrapper, and don't touch it once it is finished
+      try:
+        with open(self.path) as f:
+          job = json.load(f)
+      except (IOError, OSError, ValueError):
+        return
+      if job.get("finished"):
+        return
+      job["progress"] = js
+      js = job
+    tmp_path = self.path + '.progress.tmp'
+    try:
+      with open(tmp_path, 'w') as f:
+        f.write(json.dumps(js))
+      os.rename(tmp_path, self.path)
+    except (IOError, OSError):
+      pass
+
+
+def job_progress(module):
+  ## items of a bulk run are reported by module_utils/bulk.py as a whole, so only a single run reports job progress
+  if getattr(module, 'bulk_item', False):
+    return None
+  return Progress(path=module.params.get('progress_file'))
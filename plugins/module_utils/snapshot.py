@@ -0,0 +1,219 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# config snapshot
+#
+# a snapshot is a json lines file (gzipped when it ends with .gz) of {"type": "<obj_type>", "object": {...}},
+# and <snapshot>.manifest.json: {"created", "count", "sha256", "fields", "types": {"<obj_type>": {"count", "sha256"}}}
+#  - sha256 of a type is the one of its lines, in the order they are written
+#  - sha256 of the snapshot is the one of the file
+#  - fields is the list of fields exported, when objects are partial (null: whole objects)
+#
+# writer = SnapshotWriter(path)
+# writer.write(obj_type, obj)  ## thread safe
+# manifest = writer.close()
+# for (obj_type, obj) in read_snapshot(path): ...
+#
+# spool = Spool()  ## rows kept in temporary files by key (such as type), read back without reading the snapshot again
+##
+
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from ansible.module_utils._text import to_text
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import vnc_api_headers, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import open_text
+
+
+def manifest_path(path):
+  return path + '.manifest.json'
+
+
+def file_sha256(path):
+  sha256 = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+      sha256.update(chunk)
+  return sha256.hexdigest()
+
+
+def config_types(module, controller_ip):
+  ## all the object types, from collection links of config-api's root
+  config_api_url = 'http://' + controller_ip + ':8082/'
+  response = transport.get(config_api_url, headers=vnc_api_headers)
+  if not response.status_code == 200:
+    module.fail_json(msg="config-api's / failed: {}".format(response.text))
+  links = [link.get("link", {}) for link in json.loads(response.text).get("links", [])]
+  return sorted(set(link.get("name") for link in links if link.get("rel") == 'collection' and link.get("name")))
+
+
+class SnapshotWriter(object):
+  def __init__(self, path, fields=None):
+    self.path = path
+    self.fields = fields
+    self.lock = threading.Lock()
+    self.f = open_text(path, 'w')
+    self.types = {}
+
+  def write(self, obj_type, obj):
+    line = to_text(json.dumps({"type": obj_type, "object": obj}, sort_keys=True) + '\n')
+    with self.lock:
+      entry = self.types.get(obj_type)
+      if entry is None:
+        entry = self.types[obj_type] = {"count": 0, "sha256": hashlib.sha256()}
+      entry["count"] += 1
+      entry["sha256"].update(line.encode('utf-8'))
+      self.f.write(line)
+
+  def close(self):
+    self.f.close()
+    manifest = {
+      "created": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+      "count": sum(entry["count"] for entry in self.types.values()),
+      "sha256": file_sha256(self.path),
+      "fields": self.fields,
+      "types": dict((obj_type, {"count": entry["count"], "sha256": entry["sha256"].hexdigest()}) for obj_type, entry in self.types.items())
+    }
+    with open(manifest_path(self.path), 'w') as f:
+      f.write(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def read_manifest(path):
+  try:
+    with open(manifest_path(path)) as f:
+      return json.load(f)
+  except (IOError, OSError, ValueError):
+    return None
+
+
+def read_snapshot(path):
+  ## (obj_type, obj), one line at a time
+  with open_text(path, 'r') as f:
+    for line in f:
+      if line.strip():
+        js = json.loads(line)
+        yield (js["type"], js["object"])
+
+
+##
+# restore
+#  objects are created by config-api with their uuids, and parents / refs are given by fq_name ("to"),
+#  so that they are resolved on the target cluster, where default objects can have other uuids
+##
+drop_fields = ['href', 'parent_href', 'parent_uuid', 'id_perms', 'perms2']
+
+
+def ref_type(field):
+  ## virtual_network_refs -> virtual-network
+  return field[:-len('_refs')].replace('_', '-')
+
+
+def is_children(field, value):
+  ## children list, such as virtual_networks of a project, is not written
+  return field.endswith('s') and not field.endswith('_refs') and isinstance(value, list) and value and all(isinstance(v, dict) and 'href' in v and 'to' in v for v in value)
+
+
+def restore_payload(obj):
+  ## object to be written: without read-only fields, back_refs and children, with refs by fq_name
+  payload = {}
+  for field, value in obj.items():
+    if field in drop_fields or field.endswith('_back_refs') or is_children(field, value):
+      continue
+    if field.endswith('_refs'):
+      value = [dict((k, v) for k, v in [("to", ref.get("to")), ("attr", ref.get("attr"))] if not v is None) for ref in value or []]
+    payload[field] = value
+  return payload
+
+
+def normalize(payload):
+  ## refs are compared regardless of their order
+  return dict((k, sorted(v, key=lambda ref: json.dumps(ref, sort_keys=True)) if k.endswith('_refs') else v) for k, v in payload.items())
+
+
+def object_hash(obj):
+  ## sha256 of the content which restore writes, so that read-only fields (last_modified etc) don't change it
+  return hashlib.sha256(json.dumps(normalize(restore_payload(obj)), sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class Spool(object):
+  ## rows (obj_type, obj) kept in a temporary file per key, in the order they are added (thread safe)
+  def __init__(self):
+    self.files = {}
+    self.lock = threading.Lock()
+
+  def add(self, key, obj_type, obj):
+    line = json.dumps({"type": obj_type, "object": obj}) + '\n'
+    with self.lock:
+      if not key in self.files:
+        self.files[key] = tempfile.TemporaryFile(mode='w+')
+      self.files[key].write(line)
+
+  def read(self, key):
+    f = self.files.get(key)
+    if f is None:
+      return
+    f.flush()
+    f.seek(0)
+    for line in f:
+      js = json.loads(line)
+      yield (js["type"], js["object"])
+
+  def close(self):
+    for f in self.files.values():
+      f.close()
+    self.files = {}
+
+
+def type_graph(path, obj_types=None, spool=None):
+  ##
+  # types in the snapshot, and types which each type depends on as parent / refs: (types, parents, refs)
+  # when spool is given, the rows are added to it by type, so the snapshot is read only once
+  ##
+  types = set()
+  parents = {}
+  refs = {}
+  for (obj_type, obj) in read_snapshot(path):
+    if obj_types and not obj_type in obj_types:
+      continue
+    if spool:
+      spool.add(obj_type, obj_type, obj)
+    types.add(obj_type)
+    parents.setdefault(obj_type, set())
+    refs.setdefault(obj_type, set())
+    if obj.get("parent_type"):
+      parents[obj_type].add(obj["parent_type"])
+    for field, value in obj.items():
+      if field.endswith('_refs') and not field.endswith('_back_refs') and value:
+        refs[obj_type].add(ref_type(field))
+  return (types, parents, refs)
+
+
+def dependency_levels(types, parents, refs):
+  ##
+  # topological sort of types, by levels: types of a level depend only on the ones of former levels
+  # returns (levels, deferred)
+  #  deferred: {type: set of ref types}, refs which are written after all the objects are created,
+  #  such as refs to the same type, and refs in a cycle among types (parents never make a cycle)
+  ##
+  deferred = dict((t, set([t]) & refs[t]) for t in types)
+  deps = dict((t, ((parents[t] | refs[t]) & types) - set([t])) for t in types)
+  levels = []
+  done = set()
+  remaining = set(types)
+  while remaining:
+    level = sorted(t for t in remaining if deps[t] <= done)
+    if not level:
+      for t in remaining:
+        deferred[t] |= refs[t] & remaining
+        deps[t] = deps[t] - (refs[t] & remaining - parents[t])
+      level = sorted(t for t in remaining if deps[t] <= done) or sorted(remaining)
+    levels.append(level)
+    done |= set(level)
+    remaining -= set(level)
+  return (levels, dict((t, d) for t, d in deferred.items() if d))
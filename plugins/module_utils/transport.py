@@ -0,0 +1,386 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# http transport shared by all the modules
+#
+#  response = transport.post(config_api_url + 'fqname-to-id', data=..., headers=vnc_api_headers)
+#  web_api = transport.session()   ## keeps cookies, used for webui (:8143)
+#
+# record / replay:
+#  TF_CASSETTE=/path/to/cassette.jsonl
+#  TF_CASSETTE_MODE=record: every request / response pair is appended to the cassette, with secrets scrubbed
+#  TF_CASSETTE_MODE=replay: responses are served from the cassette, no controller access
+#  TF_CASSETTE_LATENCY=1.0: replay latency scale (1.0: original latency, 0: no wait)
+#  TF_CASSETTE_RUN=<id>: replay run, module runs with the same id go through the cassette in order (without it, each module run replays from the top)
+#
+# backend:
+#  TF_TRANSPORT=requests (default): python-requests
+#  TF_TRANSPORT=http: http.client with per-thread keep-alive connections, python-requests is not imported
+#  in both cases, the backend library is imported when the first request is sent
+#
+# requests per second and requests in flight can be limited across forks by TF_RATE_LIMIT / TF_MAX_INFLIGHT (module_utils/governor.py)
+#
+# when controller_ip is a list, requests to those nodes are spread / failed over by transport.nodes (module_utils/nodes.py)
+##
+
+import os
+import re
+import json
+import time
+import fcntl
+import threading
+from ansible.module_utils.six import text_type
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.governor import Governor, endpoint_class
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.nodes import Nodes
+
+secret_keys = ['password', 'token', 'secret']
+replay_lock = threading.Lock()
+
+
+class TransportError(Exception):
+  pass
+
+
+class ConnectError(IOError):
+  ## connection to the node failed, so the request was not sent, and it can be sent to another node
+  pass
+
+
+class Headers(dict):
+  ## case-insensitive get, as requests' response.headers
+  def get(self, key, default=None):
+    key = key.lower()
+    for k in self:
+      if k.lower() == key:
+        return self[k]
+    return default
+
+
+class Response(object):
+  def __init__(self, status_code, text, headers=None, cookies=None):
+    self.status_code = status_code
+    self.text = text
+    self.headers = Headers(headers or {})
+    self.cookies = cookies or {}
+
+  def json(self):
+    return json.loads(self.text)
+
+
+class Session(object):
+  ##
+  # cookie-keeping session, used as web_api
+  ##
+  def __init__(self, transport):
+    self.transport = transport
+    self.cookies = {}
+    self.backend_session = None
+    ## controller node which this session logged in to
+    self.node = None
+
+  def request(self, method, url, **kwargs):
+    response = self.transport.request(method, url, session=self, **kwargs)
+    self.cookies.update(response.cookies)
+    return response
+
+  def get(self, url, **kwargs):
+    return self.request('GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('POST', url, **kwargs)
+
+  def put(self, url, **kwargs):
+    return self.request('PUT', url, **kwargs)
+
+  def delete(self, url, **kwargs):
+    return self.request('DELETE', url, **kwargs)
+
+
+class Transport(object):
+  def __init__(self):
+    self.backend = os.getenv('TF_TRANSPORT', 'requests')
+    if not self.backend in ['requests', 'http']:
+      raise TransportError("TF_TRANSPORT should be requests or http: {}".format(self.backend))
+    self.backend_session = None
+    self.connections = threading.local()
+    self.governor = Governor()
+    self.nodes = Nodes()
+    self.cassette = None
+    cassette_path = os.getenv('TF_CASSETTE')
+    if cassette_path:
+      self.cassette = Cassette(cassette_path, os.getenv('TF_CASSETTE_MODE', 'replay'), float(os.getenv('TF_CASSETTE_LATENCY', '1.0')), os.getenv('TF_CASSETTE_RUN'))
+
+  def session(self):
+    return Session(self)
+
+  def request(self, method, url, session=None, data=None, headers=None, verify=True):
+    if self.cassette and self.cassette.mode == 'replay':
+      return self.cassette.replay(method, url, data)
+    if self.nodes.handles(urlparse(url).hostname):
+      return self.request_nodes(method, url, session, data, headers, verify)
+    return self.request_node(method, url, session, data, headers, verify)
+
+  def request_node(self, method, url, session, data, headers, verify):
+    slot = self.governor.acquire(method, url)
+    try:
+      start = time.time()
+      response = self.send(method, url, session, data, headers, verify)
+    finally:
+      if slot:
+        slot.release()
+    if self.cassette:
+      self.cassette.record(method, url, data, response, time.time() - start)
+    return response
+
+  def request_nodes(self, method, url, session, data, headers, verify):
+    klass = endpoint_class(method, url)
+    error = None
+    response = None
+    for node in self.nodes.candidates(klass, sticky=session.node if session else None):
+      self.nodes.start(node)
+      start = time.time()
+      try:
+        ## connection errors of both backends (requests.ConnectionError, socket.error) are IOError
+        response = self.request_node(method, replace_host(url, node), session, data, headers, verify)
+      except IOError as e:
+        self.nodes.done(node, error=True)
+        ## a write which might have reached the node (such as a read timeout after it is sent) is not sent again
+        if not klass == 'read' and not isinstance(e, ConnectError):
+          raise
+        error = e
+        continue
+      if response.status_code == 503 and klass == 'read':
+        self.nodes.done(node, error=True)
+        continue
+      self.nodes.done(node, time.time() - start)
+      if session:
+        session.node = node
+      return response
+    if response is None:
+      raise error
+    return response
+
+  def send(self, method, url, session, data, headers, verify):
+    if self.backend == 'http':
+      return self.send_http(method, url, session, data, headers, verify)
+
+    import requests
+    if session is None:
+      if self.backend_session is None:
+        self.backend_session = requests.session()
+      backend_session = self.backend_session
+    else:
+      if session.backend_session is None:
+        session.backend_session = requests.session()
+      backend_session = session.backend_session
+    try:
+      r = backend_session.request(method, url, data=data, headers=headers, verify=verify)
+    except requests.exceptions.ConnectionError as e:
+      ## ConnectTimeoutError of urllib3 (and NewConnectionError, its subclass): the request was not sent
+      from requests.packages.urllib3.exceptions import ConnectTimeoutError
+      reason = getattr(e.args[0], 'reason', e.args[0]) if e.args else None
+      if isinstance(e, requests.exceptions.ConnectTimeout) or isinstance(reason, ConnectTimeoutError):
+        raise ConnectError(e)
+      raise
+    return Response(r.status_code, r.text, dict(r.headers), r.cookies.get_dict())
+
+  def send_http(self, method, url, session, data, headers, verify):
+    from ansible.module_utils.six.moves import http_client
+    parsed = urlparse(url)
+    path = parsed.path or '/'
+    if parsed.query:
+      path += '?' + parsed.query
+    request_headers = dict(headers or {})
+    if session is not None and session.cookies:
+      request_headers['Cookie'] = '; '.join('{}={}'.format(k, v) for k, v in session.cookies.items())
+    if isinstance(data, text_type):
+      data = data.encode('utf-8')
+
+    key = (parsed.scheme, parsed.netloc, verify)
+    pool = getattr(self.connections, 'pool', None)
+    if pool is None:
+      pool = self.connections.pool = {}
+    ## a kept-alive connection might be closed by server, so retry once with a new connection
+    for reused in [key in pool, False]:
+      conn = pool.get(key)
+      if conn is None:
+        conn = pool[key] = new_connection(parsed, verify)
+      if conn.sock is None:
+        try:
+          conn.connect()
+        except IOError as e:
+          conn.close()
+          del pool[key]
+          raise ConnectError(e)
+      try:
+        conn.request(method, path, body=data, headers=request_headers)
+        r = conn.getresponse()
+        body = r.read()
+        break
+      except (http_client.HTTPException, IOError):
+        conn.close()
+        del pool[key]
+        if not reused:
+          raise
+    if r.getheader('Connection', '').lower() == 'close':
+      conn.close()
+      del pool[key]
+
+    cookies = {}
+    for name, value in r.getheaders():
+      if name.lower() == 'set-cookie':
+        cookie = value.split(';')[0].split('=', 1)
+        if len(cookie) == 2:
+          cookies[cookie[0].strip()] = cookie[1].strip()
+    return Response(r.status, body.decode('utf-8', 'replace'), dict(r.getheaders()), cookies)
+
+  def get(self, url, **kwargs):
+    return self.request('GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('POST', url, **kwargs)
+
+  def put(self, url, **kwargs):
+    return self.request('PUT', url, **kwargs)
+
+  def delete(self, url, **kwargs):
+    return self.request('DELETE', url, **kwargs)
+
+
+##
+# cassette: one json per line
+#  {"m": method, "e": endpoint (port + path), "q": request body, "s": status, "t": elapsed, "b": response body, "h": headers, "c": cookies}
+##
+class Cassette(object):
+  def __init__(self, path, mode, latency_scale, run=None):
+    if not mode in ['record', 'replay']:
+      raise TransportError("TF_CASSETTE_MODE should be record or replay: {}".format(mode))
+    if run and not re.match(r'^[A-Za-z0-9_.-]+$', run):
+      raise TransportError("TF_CASSETTE_RUN should be alphanumeric: {}".format(run))
+    self.path = path
+    self.mode = mode
+    self.latency_scale = latency_scale
+    self.run = run
+    self.interactions = None
+    self.index = {}
+    self.consumed = set()
+
+  def record(self, method, url, data, response, elapsed):
+    headers = {}
+    if response.headers.get('Content-Type'):
+      headers['Content-Type'] = response.headers.get('Content-Type')
+    if response.headers.get('X-Subject-Token'):
+      headers['X-Subject-Token'] = '***'
+    interaction = {"m": method, "e": endpoint(url), "q": scrub(data), "s": response.status_code, "t": round(elapsed, 4),
+                   "b": scrub(response.text), "h": headers, "c": dict((k, '***') for k in response.cookies)}
+    line = json.dumps(interaction, separators=(',', ':')) + '\n'
+    with open(self.path, 'a') as f:
+      fcntl.flock(f, fcntl.LOCK_EX)
+      f.write(line)
+      fcntl.flock(f, fcntl.LOCK_UN)
+
+  def load(self):
+    self.interactions = []
+    with open(self.path) as f:
+      for line in f:
+        if line.strip():
+          self.interactions.append(json.loads(line))
+    for i in range(len(self.interactions)):
+      interaction = self.interactions[i]
+      self.index.setdefault((interaction["m"], interaction["e"]), []).append(i)
+
+  def replay(self, method, url, data):
+    if self.interactions is None:
+      self.load()
+    candidates = self.index.get((method, endpoint(url)), [])
+    body = scrub(data)
+
+    ## consumed interactions of a run are kept in <cassette>.replay.<run>, so that module runs of the run go through the cassette in order,
+    ## and another run starts from the top. without a run, they are kept in memory of this module run
+    if self.run:
+      with open(self.path + '.replay.' + self.run, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        pick = self.pick(candidates, body, set(int(i) for i in f.read().split()))
+        if not pick is None:
+          f.write('{}\n'.format(pick))
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+      with replay_lock:
+        pick = self.pick(candidates, body, self.consumed)
+        if not pick is None:
+          self.consumed.add(pick)
+
+    if pick is None:
+      raise TransportError("no recorded response for {} {} in {}".format(method, endpoint(url), self.path))
+    interaction = self.interactions[pick]
+    if self.latency_scale > 0:
+      time.sleep(interaction["t"] * self.latency_scale)
+    return Response(interaction["s"], interaction["b"], interaction["h"], interaction["c"])
+
+  def pick(self, candidates, body, consumed):
+    ## the first unconsumed interaction with the same request body, or the first unconsumed one
+    for i in candidates:
+      if not i in consumed and self.interactions[i]["q"] == body:
+        return i
+    for i in candidates:
+      if not i in consumed:
+        return i
+    return None
+
+
+def new_connection(parsed, verify):
+  from ansible.module_utils.six.moves import http_client
+  if parsed.scheme == 'https':
+    import ssl
+    context = ssl.create_default_context()
+    if not verify:
+      context.check_hostname = False
+      context.verify_mode = ssl.CERT_NONE
+    return http_client.HTTPSConnection(parsed.hostname, parsed.port or 443, context=context)
+  return http_client.HTTPConnection(parsed.hostname, parsed.port or 80)
+
+
+def replace_host(url, host):
+  parsed = urlparse(url)
+  netloc = host
+  if parsed.port:
+    netloc += ':{}'.format(parsed.port)
+  return parsed._replace(netloc=netloc).geturl()
+
+
+def endpoint(url):
+  parsed = urlparse(url)
+  path = parsed.path
+  if parsed.query:
+    path += '?' + parsed.query
+  return ':{}{}'.format(parsed.port or '', path)
+
+
+def scrub(data):
+  if data is None:
+    return None
+  try:
+    js = json.loads(data)
+  except ValueError:
+    return data
+  return json.dumps(_scrub(js), sort_keys=True)
+
+
+def _scrub(js):
+  if isinstance(js, dict):
+    for k in js:
+      if any(secret_key in k.lower() for secret_key in secret_keys):
+        js[k] = '***'
+      else:
+        js[k] = _scrub(js[k])
+  elif isinstance(js, list):
+    return [_scrub(v) for v in js]
+  return js
+
+
+transport = Transport()
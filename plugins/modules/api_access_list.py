@@ -21,10 +21,30 @@ description:
     - "create / delete tungstenfabric tag"
 
 options:
-    controller_ip:
+    rule_object:
         description:
-            - tungstenfabric controller ip
-        required: true
+            - rule_object of the rbac rule (such as virtual-network). required unless entries is given
+        required: false
+    rule_field:
+        description:
+            - rule_field of the rbac rule (such as "*"). required unless entries is given
+        required: false
+    role_crud_list:
+        description:
+            - list of crud permissions (such as CRUD, R), one for each role in role_name_list. required when state is present
+        required: false
+    role_name_list:
+        description:
+            - list of role names
+        required: false
+    entries:
+        description:
+            - list of rbac rules, each of which is a dict with rule_object, rule_field, state (default: state of this task), role_crud_list and role_name_list. all of them are applied to default-api-access-list by one read and one write. unlike a single rule, an existing rule is updated and a missing rule is ignored on delete
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
 
 author:
     - Tatsuya Naganawa (@tnaganawa)
@@ -76,6 +96,14 @@ EXAMPLES = '''
       - [physical-router, "*", ["R"], ["_member_"]] ## visible only when it is shared to that tenant
       - [physical-interface, "*", ["R"], ["_member_"]] ## visible only when it is shared to that tenant
       - [port-profile, "*", ["R"], ["_member_"]]
+
+- name: add many rbac rules by one read and one write
+  tungstenfabric.networking.api_access_list:
+    controller_ip: x.x.x.x
+    entries:
+      - {rule_object: virtual-network, rule_field: "*", role_crud_list: ["CRUD"], role_name_list: ["_member_"]}
+      - {rule_object: logical-router, rule_field: "*", role_crud_list: ["CRUD"], role_name_list: ["_member_"]}
+      - {rule_object: network-ipam, rule_field: "*", state: absent}
 '''
 
 RETURN = '''
@@ -83,44 +111,67 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+entries:
+    description: number of rbac rules added / updated / deleted
+    type: dict
+    returned: when the api-access-list is read
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, update_object, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=False),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False),
+    rule_object=dict(type='str', required=False),
+    rule_field=dict(type='str', required=False),
+    role_crud_list=dict(type='list', required=False),
+    role_name_list=dict(type='list', required=False),
+    entries=dict(type='list', required=False)
+)
+
+required_if_args = []
+
+## items are applied one by one, since each of them is a read-merge-write of the same api-access-list
+max_workers = 1
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=False),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False),
-        rule_object=dict(type='str', required=True),
-        rule_field=dict(type='str', required=True),
-        role_crud_list=dict(type='list', required=False),
-        role_name_list=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args, max_workers=max_workers)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["state", "present", ["role_crud_list", "role_name_list"]]
-    ]
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = "default-api-access-list"
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -132,6 +183,30 @@ def run_module():
     rule_field = module.params.get("rule_field")
     role_crud_list = module.params.get("role_crud_list")
     role_name_list = module.params.get("role_name_list")
+    entries = module.params.get("entries")
+
+    ## a rule given by rule_object / rule_field, or all the rules in entries, are applied by one read-merge-write
+    if entries == None:
+      if rule_object == None or rule_field == None:
+        module.fail_json(msg="rule_object and rule_field are required, unless entries is given", **result)
+      entries = [dict(rule_object=rule_object, rule_field=rule_field, state=state, role_crud_list=role_crud_list, role_name_list=role_name_list)]
+      strict = True
+    else:
+      strict = False
+    changes = {}
+    for entry in entries:
+      if not isinstance(entry, dict) or entry.get("rule_object") == None or entry.get("rule_field") == None:
+        module.fail_json(msg="each entry should be a dict with rule_object and rule_field: {}".format(entry), **result)
+      entry_state = entry.get("state", state)
+      if not entry_state in ['present', 'absent']:
+        module.fail_json(msg="state of entry should be present or absent: {}".format(entry), **result)
+      rule_perms = None
+      if entry_state == 'present':
+        if entry.get("role_crud_list") == None or entry.get("role_name_list") == None or not len(entry.get("role_crud_list")) == len(entry.get("role_name_list")):
+          module.fail_json(msg="state is present but role_crud_list / role_name_list (of the same length) are missing: {}".format(entry), **result)
+        rule_perms = [{"role_name": role_name, "role_crud": role_crud} for role_name, role_crud in zip(entry.get("role_name_list"), entry.get("role_crud_list"))]
+      ## the last one wins, when the same rule is given more than once
+      changes[(entry.get("rule_object"), entry.get("rule_field"))] = rule_perms
 
     if module.check_mode:
         module.exit_json(**result)
@@ -146,34 +221,49 @@ def run_module():
       module.fail_json(msg='default-api-access-list is not available. cannot add an entry to that.', **result)
 
     ## begin: object specific
-    rbac_rule = js["api-access-list"].get("api_access_list_entries").get("rbac_rule")
-
-    entry_to_be_deleted = -1
-    for i in range(len(rbac_rule)):
-      rbac_entry = rbac_rule[i]
-      tmp_rule_object = rbac_entry.get("rule_object")
-      tmp_rule_field = rbac_entry.get("rule_field")
-      if tmp_rule_object == rule_object and tmp_rule_field == rule_field:
-        if state == 'present':
+    counts = dict(added=0, updated=0, deleted=0)
+    def modify(js):
+      for k in counts:
+        counts[k] = 0
+      rbac_rule = js["api-access-list"].get("api_access_list_entries").get("rbac_rule")
+
+      ## rbac entries indexed by (rule_object, rule_field)
+      index = {}
+      for i in range(len(rbac_rule)):
+        index[(rbac_rule[i].get("rule_object"), rbac_rule[i].get("rule_field"))] = i
+
+      deleted = set()
+      for key, rule_perms in changes.items():
+        i = index.get(key)
+        if rule_perms == None:
+          if i == None:
+            if strict:
+              module.fail_json(msg='cannot find rbac entry that matches the given rule.', **result)
+            continue
+          deleted.add(i)
+          counts["deleted"] += 1
+        elif i == None:
+          rbac_rule.append ({"rule_object": key[0], "rule_field": key[1], "rule_perms": rule_perms})
+          counts["added"] += 1
+        elif strict:
           module.fail_json(msg='That entry is already available. please firstly delete and re-create it.', **result)
-        if state == 'absent':
-          entry_to_be_deleted = i
-
-    if state == 'present':
-      rule_perms = []
-      for i in range(len(role_name_list)):
-        rule_perms.append({"role_name": role_name_list[i], "role_crud": role_crud_list[i]})
-      rbac_rule.append ({"rule_object": rule_object, "rule_field": rule_field, "rule_perms": rule_perms})
-    elif state == 'absent':
-      if entry_to_be_deleted == -1:
-        module.fail_json(msg='cannot find rbac entry that matches the given rule.', **result)
-      del rbac_rule[entry_to_be_deleted]
+        elif not rbac_rule[i].get("rule_perms") == rule_perms:
+          rbac_rule[i]["rule_perms"] = rule_perms
+          counts["updated"] += 1
+      if deleted:
+        rbac_rule[:] = [rbac_rule[i] for i in range(len(rbac_rule)) if not i in deleted]
+      return js
     ## end: object specific
 
 
-    payload=json.dumps(js)
+    def write(js):
+      result["entries"] = counts
+      if counts["added"] + counts["updated"] + counts["deleted"] == 0:
+        return False
+      payload=json.dumps(js)
+      return crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = update_object(module, web_api, controller_ip, obj_type, uuid, js, modify, write)
 
 
     if failed:
@@ -182,7 +272,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'api_access_list')
 
 if __name__ == '__main__':
     main()
@@ -25,15 +25,15 @@ options:
         description:
             - application_policy_set name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     project:
         description:
             - project name (if it is defined, application_policy_set will be project scoped)
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -66,41 +66,58 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, fqname_to_id, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False),
+    firewall_policies=dict(type='list', required=False)
+)
+
+required_if_args = [
+  ["state", "present", ["firewall_policies"]]
+]
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False),
-        firewall_policies=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["state", "present", ["firewall_policies"]]
-    ]
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -114,8 +131,6 @@ def run_module():
         module.exit_json(**result)
 
 
-    config_api_url = 'http://' + controller_ip + ':8082/'
-
     obj_type='application-policy-set'
 
     (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
@@ -157,10 +172,7 @@ def run_module():
           firewall_policy_fqname = [domain, project, firewall_policy_name]
         else:
           firewall_policy_fqname = ["default-policy-management", firewall_policy_name]
-        response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": "firewall-policy", "fq_name": firewall_policy_fqname}), headers=vnc_api_headers)
-        if not response.status_code == 200:
-          module.fail_json(msg="specified firewall-policy doesn't exist", **result)
-        firewall_policy_uuid = json.loads(response.text).get("uuid")
+        firewall_policy_uuid = fqname_to_id (module, firewall_policy_fqname, 'firewall-policy', controller_ip)
         firewall_policy_refs.append({"attr": {"sequence": "{}".format(i)}, "to": firewall_policy_fqname, "uuid": firewall_policy_uuid})
       js["application-policy-set"]["firewall_policy_refs"] = firewall_policy_refs
     ## end: object specific
@@ -177,7 +189,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'application_policy_set')
 
 if __name__ == '__main__':
     main()
@@ -25,10 +25,6 @@ options:
         description:
             - bgp-as-a-service name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - bgp-as-a-service subnet
@@ -38,6 +34,10 @@ options:
             - bgp-as-a-service subnet
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -63,6 +63,22 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
 '''
@@ -113,38 +129,40 @@ message:
 
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='default-project'),
+    bgpaas_ip_address=dict(type='str', required=False),
+    hold_time=dict(type='int', required=False, default=90),
+    address_families=dict(type='list', required=False, default=['inet']),
+    autonomous_system=dict(type='int', required=True),
+    virtual_machine_interface_refs=dict(type='str', required=False)
+)
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='default-project'),
-        bgpaas_ip_address=dict(type='str', required=False),
-        hold_time=dict(type='int', required=False, default=90),
-        address_families=dict(type='list', required=False, default=['inet']),
-        autonomous_system=dict(type='int', required=True),
-        virtual_machine_interface_refs=dict(type='str', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -207,7 +225,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'bgp_as_a_service')
 
 if __name__ == '__main__':
     main()
@@ -21,10 +21,6 @@ description:
     - "add vlan / vn pair to vpg"
 
 options:
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - domain for this vpg and vmi
@@ -38,6 +34,9 @@ options:
             - list of vpg / vn / vlan-id tuple
         required: true
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -74,15 +73,14 @@ message:
 
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, vnc_api_headers, run_with_profile, set_controller_nodes, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import object_cache
 
 def run_module():
     module_args = dict(
-        controller_ip=dict(type='str', required=True),
+        controller_ip=dict(type='list', elements='str', required=True),
         username=dict(type='str', required=False, default='admin'),
         password=dict(type='str', required=False, default='contrail123'),
         state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
@@ -100,6 +98,7 @@ def run_module():
         argument_spec=module_args,
         supports_check_mode=True
     )
+    set_controller_nodes(module)
 
     name = "dummy"
     controller_ip = module.params.get("controller_ip")
@@ -133,12 +132,12 @@ def run_module():
         native_vlan = vpg_vn_vlan_list[i][3]
 
       ## check if the vpg exists
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "virtual-port-group", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (fabric, vpg_name), headers=vnc_api_headers)
+      response = transport.post(config_api_url + 'fqname-to-id', data='{"type": "virtual-port-group", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (fabric, vpg_name), headers=vnc_api_headers)
       if response.status_code == 200:
         tmp = json.loads(response.text)
         vpg_uuid = tmp.get("uuid")
 
-        response = requests.get(config_api_url + 'virtual-port-group/' + vpg_uuid, headers=vnc_api_headers)
+        response = transport.get(config_api_url + 'virtual-port-group/' + vpg_uuid, headers=vnc_api_headers)
         vpg_vmi_refs = json.loads(response.text).get("virtual-port-group").get("virtual_machine_interface_refs")
         physical_interface_refs = json.loads(response.text).get("virtual-port-group").get("physical_interface_refs")
 
@@ -160,7 +159,7 @@ def run_module():
         # skip this if already available
 
         # check virtual-network uuid
-        response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "virtual-network", "fq_name": ["%s", "%s", "%s"]}' % (domain, project, vn_name), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'fqname-to-id', data='{"type": "virtual-network", "fq_name": ["%s", "%s", "%s"]}' % (domain, project, vn_name), headers=vnc_api_headers)
         if response.status_code == 200:
           vn_uuid = json.loads(response.text).get("uuid")
         else:
@@ -217,7 +216,9 @@ def run_module():
         # annotation or virtual_machine_interface_refs' attr
         # skip this if already available
 
-        response = requests.post(config_api_url + 'virtual-machine-interfaces', data=json.dumps(js), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'virtual-machine-interfaces', data=json.dumps(js), headers=vnc_api_headers)
+        ## vmi refs of the vpg are updated by config-api
+        object_cache.evict(vpg_uuid)
         if response.status_code == 200:
           pass
         elif response.status_code == 409:
@@ -244,7 +245,9 @@ def run_module():
           module.fail_json(msg="cannot find vmi_uuid to be deleted", **result)
 
         # delete virtual-machine-interfaces
-        response = requests.delete(config_api_url + 'virtual-machine-interfaces/' + vmi_uuid, headers=vnc_api_headers)
+        response = transport.delete(config_api_url + 'virtual-machine-interfaces/' + vmi_uuid, headers=vnc_api_headers)
+        ## vmi refs of the vpg are updated by config-api
+        object_cache.evict(vpg_uuid)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -258,7 +261,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'bms_vmi')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,279 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: config_drift
+
+short_description: detect drift of tungstenfabric config from a baseline
+
+version_added: "2.9"
+
+description:
+    - "compares objects on the controller with a baseline recorded in state_file, and reports added / removed / modified objects"
+    - "state_file keeps a hash of the normalized content of each object, and a hash tree of them (object -> project -> domain, by fq_name)"
+    - "last_modified of all the objects is read by list api with field projection, and only the objects changed since the last run are read and hashed again"
+    - "only the projects whose hash differs from the baseline are compared object by object"
+
+options:
+    state_file:
+        description:
+            - file to keep the baseline and the hashes of the last run. when it doesn't exist, the current config is recorded as the baseline
+        required: true
+    obj_types:
+        description:
+            - object types to be checked. all the types of config-api are checked when it is not given
+        required: false
+    exclude_types:
+        description:
+            - object types not to be checked
+        required: false
+    update_baseline:
+        description:
+            - when it is set to true, the current config is recorded as the baseline after the check (Default: false)
+        required: false
+    workers:
+        description:
+            - number of requests sent concurrently (Default: 8)
+        required: false
+    page_limit:
+        description:
+            - number of objects read by one request (Default: 1000)
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: record baseline
+  tungstenfabric.networking.config_drift:
+    controller_ip: x.x.x.x
+    obj_types: [virtual-network, network-policy, logical-router]
+    state_file: /var/lib/tf-drift/state.json
+    update_baseline: true
+
+- name: nightly drift check
+  tungstenfabric.networking.config_drift:
+    controller_ip: x.x.x.x
+    obj_types: [virtual-network, network-policy, logical-router]
+    state_file: /var/lib/tf-drift/state.json
+  register: drift
+  failed_when: drift.drift
+'''
+
+RETURN = '''
+drift:
+    description: true when the config differs from the baseline
+    type: bool
+    returned: always
+added:
+    description: objects which are not in the baseline (type, uuid, fq_name)
+    type: list
+    returned: always
+removed:
+    description: objects of the baseline which don't exist anymore (type, uuid, fq_name)
+    type: list
+    returned: always
+modified:
+    description: objects whose content differs from the baseline (type, uuid, fq_name)
+    type: list
+    returned: always
+summary:
+    description: number of objects, objects read again since the last run, and projects compared object by object
+    type: dict
+    returned: always
+'''
+
+import os
+import json
+import hashlib
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, list_objects, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import ItemModule, ItemExit
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import config_types, object_hash
+
+module_args = dict(
+    state_file=dict(type='path', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    obj_types=dict(type='list', elements='str', required=False),
+    exclude_types=dict(type='list', elements='str', required=False, default=[]),
+    update_baseline=dict(type='bool', required=False, default=False),
+    workers=dict(type='int', required=False, default=8),
+    page_limit=dict(type='int', required=False, default=1000)
+)
+
+def project_key(fq_name):
+    ## objects are grouped by the first two names of fq_name, such as default-domain:admin
+    return ':'.join(fq_name[:2])
+
+def hash_tree(objects):
+    ##
+    # objects: {uuid: {"type", "fq_name", "hash", ...}}
+    # returns {"root", "domains": {domain: hash}, "projects": {project: hash}}
+    ##
+    lines = {}
+    for uuid, entry in objects.items():
+      lines.setdefault(project_key(entry["fq_name"]), []).append(uuid + ' ' + entry["hash"])
+    projects = dict((project, hashlib.sha256('\n'.join(sorted(project_lines)).encode('utf-8')).hexdigest()) for project, project_lines in lines.items())
+    domain_lines = {}
+    for project, project_hash in projects.items():
+      domain_lines.setdefault(project.split(':')[0], []).append(project + ' ' + project_hash)
+    domains = dict((domain, hashlib.sha256('\n'.join(sorted(d_lines)).encode('utf-8')).hexdigest()) for domain, d_lines in domain_lines.items())
+    root = hashlib.sha256('\n'.join(sorted(domain + ' ' + domain_hash for domain, domain_hash in domains.items())).encode('utf-8')).hexdigest()
+    return {"root": root, "domains": domains, "projects": projects}
+
+def changed_projects(baseline_tree, tree):
+    ## projects whose hash differs, looking into only the domains whose hash differs
+    if baseline_tree["root"] == tree["root"]:
+      return set()
+    projects = set()
+    for domain in set(baseline_tree["domains"]) | set(tree["domains"]):
+      if baseline_tree["domains"].get(domain) == tree["domains"].get(domain):
+        continue
+      for project in set(baseline_tree["projects"]) | set(tree["projects"]):
+        if project.split(':')[0] == domain and not baseline_tree["projects"].get(project) == tree["projects"].get(project):
+          projects.add(project)
+    return projects
+
+def baseline_of(objects, tree):
+    return {"objects": dict((uuid, {"type": entry["type"], "fq_name": entry["fq_name"], "hash": entry["hash"]}) for uuid, entry in objects.items()), "tree": tree}
+
+def load_state(path):
+    try:
+      with open(path) as f:
+        return json.load(f)
+    except (IOError, OSError, ValueError):
+      return None
+
+def save_state(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+      f.write(json.dumps(state))
+    os.rename(tmp_path, path)
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+    set_controller_nodes(module)
+
+    controller_ip = module.params.get("controller_ip")
+    state_file = module.params.get("state_file")
+    page_limit = max(1, module.params.get("page_limit"))
+
+    result = dict(
+        changed=False,
+        drift=False,
+        added=[],
+        removed=[],
+        modified=[],
+        summary=dict(objects=0, read=0, projects=0)
+    )
+
+    keystone_login(module, controller_ip)
+
+    obj_types = module.params.get("obj_types") or config_types(module, controller_ip)
+    obj_types = [obj_type for obj_type in obj_types if not obj_type in module.params.get("exclude_types")]
+
+    state = load_state(state_file) or {}
+    ## {uuid: {"type", "fq_name", "last_modified", "hash"}}, of the last run
+    last = state.get("objects", {})
+
+    ## last_modified of all the objects, by one paginated list per type
+    def list_type(obj_type):
+      try:
+        return [(obj_type, obj) for obj in list_objects(ItemModule(module, module.params), controller_ip, obj_type, query={"detail": "true", "fields": "id_perms"}, page_limit=page_limit)]
+      except ItemExit as e:
+        return e
+    pool = ThreadPool(max(1, module.params.get("workers") or 1))
+    try:
+      objects = {}
+      stale = {}
+      for listed in pool.map(list_type, obj_types):
+        if isinstance(listed, ItemExit):
+          module.fail_json(msg=listed.result.get("msg"))
+        for (obj_type, obj) in listed:
+          last_modified = (obj.get("id_perms") or {}).get("last_modified")
+          entry = last.get(obj["uuid"])
+          if entry and entry["type"] == obj_type and entry["last_modified"] == last_modified and not last_modified is None:
+            objects[obj["uuid"]] = entry
+          else:
+            objects[obj["uuid"]] = {"type": obj_type, "fq_name": obj["fq_name"], "last_modified": last_modified, "hash": None}
+            stale.setdefault(obj_type, []).append(obj["uuid"])
+
+      ## objects changed since the last run are read and hashed again
+      def read_objects(args):
+        (obj_type, uuids) = args
+        try:
+          return [(obj["uuid"], object_hash(obj)) for obj in list_objects(ItemModule(module, module.params), controller_ip, obj_type, query={"detail": "true", "obj_uuids": ','.join(uuids)}, page_limit=len(uuids))]
+        except ItemExit as e:
+          return e
+      batches = [(obj_type, uuids[i:i + 200]) for obj_type, uuids in stale.items() for i in range(0, len(uuids), 200)]
+      for hashes in pool.map(read_objects, batches):
+        if isinstance(hashes, ItemExit):
+          module.fail_json(msg=hashes.result.get("msg"))
+        for (uuid, obj_hash) in hashes:
+          objects[uuid]["hash"] = obj_hash
+    finally:
+      pool.close()
+      pool.join()
+
+    ## deleted between the list and the read
+    objects = dict((uuid, entry) for uuid, entry in objects.items() if entry["hash"])
+    result["summary"]["objects"] = len(objects)
+    result["summary"]["read"] = sum(len(uuids) for uuids in stale.values())
+
+    tree = hash_tree(objects)
+    baseline = state.get("baseline")
+    if baseline is None:
+      ## first run: the current config is the baseline
+      baseline = baseline_of(objects, tree)
+      result["baseline_created"] = True
+
+    projects = changed_projects(baseline["tree"], tree)
+    result["summary"]["projects"] = len(projects)
+    if projects:
+      result["drift"] = True
+      def entry_of(uuid, entry):
+        return {"type": entry["type"], "uuid": uuid, "fq_name": entry["fq_name"]}
+      for uuid, entry in objects.items():
+        if not project_key(entry["fq_name"]) in projects:
+          continue
+        baseline_entry = baseline["objects"].get(uuid)
+        if baseline_entry is None:
+          result["added"].append(entry_of(uuid, entry))
+        elif not baseline_entry["hash"] == entry["hash"]:
+          result["modified"].append(entry_of(uuid, entry))
+      for uuid, entry in baseline["objects"].items():
+        if project_key(entry["fq_name"]) in projects and not uuid in objects:
+          result["removed"].append(entry_of(uuid, entry))
+
+    if module.params.get("update_baseline"):
+      baseline = baseline_of(objects, tree)
+      result["changed"] = result["drift"]
+    if not module.check_mode:
+      save_state(state_file, {"baseline": baseline, "objects": objects, "tree": tree})
+
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'config_drift')
+
+if __name__ == '__main__':
+    main()
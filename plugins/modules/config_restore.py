@@ -0,0 +1,274 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: config_restore
+
+short_description: restore tungstenfabric config from a snapshot file
+
+version_added: "2.9"
+
+description:
+    - "create objects of a snapshot written by config_snapshot, which don't exist on the controller, with their original uuids"
+    - "types are ordered by their parent / ref dependencies (topological sort), and objects of one dependency level are created concurrently, batch_size objects at a time"
+    - "refs to the same type, or in a cycle among types, are added after all the objects are created"
+    - "objects which exist with the same content are skipped. the snapshot is read once, and its objects are kept in temporary files per type until they are restored"
+
+options:
+    src:
+        description:
+            - snapshot file written by config_snapshot. when <src>.manifest.json exists, sha256 of the file is checked before restore. a snapshot taken with fields (partial objects) is not restored
+        required: true
+    obj_types:
+        description:
+            - object types to be restored. all the types in the snapshot are restored when it is not given
+        required: false
+    overwrite:
+        description:
+            - when it is set to true, objects which exist with different content are updated by the snapshot, otherwise they are reported as differs (Default: false)
+        required: false
+    workers:
+        description:
+            - number of objects written concurrently (Default: 8)
+        required: false
+    batch_size:
+        description:
+            - number of objects read from the snapshot and processed at a time (Default: 1000)
+        required: false
+    progress_file:
+        description:
+            - file to write progress of this task to (done / total, rate, eta, failed). when async is used, progress is also written to the async job file, and visible from async_status
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: restore a project into a lab cluster
+  tungstenfabric.networking.config_restore:
+    controller_ip: x.x.x.x
+    src: /backup/admin.jsonl.gz
+'''
+
+RETURN = '''
+summary:
+    description: number of total / created / updated / skipped / differs / conflicts / failed objects
+    type: dict
+    returned: always
+levels:
+    description: object types by dependency level, in the order they are restored
+    type: list
+    returned: always
+failed_items:
+    description: objects which cannot be written (type, uuid, fq_name, message)
+    type: list
+    returned: always
+differs:
+    description: objects which exist with different content, and are not updated since overwrite is false (type, uuid, fq_name)
+    type: list
+    returned: always
+conflicts:
+    description: objects whose fq_name exists with another uuid (type, uuid, fq_name)
+    type: list
+    returned: always
+'''
+
+import json
+from itertools import islice
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, list_objects, vnc_api_headers, transport, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.progress import Progress
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import ItemModule, ItemExit
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import Spool, read_manifest, file_sha256, type_graph, dependency_levels, restore_payload, normalize, ref_type
+
+module_args = dict(
+    src=dict(type='path', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    obj_types=dict(type='list', elements='str', required=False),
+    overwrite=dict(type='bool', required=False, default=False),
+    workers=dict(type='int', required=False, default=8),
+    batch_size=dict(type='int', required=False, default=1000),
+    progress_file=dict(type='path', required=False)
+)
+
+def same_content(payload, live):
+    live = normalize(restore_payload(live))
+    return all(v == live.get(k) for k, v in normalize(payload).items())
+
+def live_objects(module, controller_ip, batch):
+    ## {uuid: object} of the objects in the batch which exist on the controller
+    live = {}
+    uuids_by_type = {}
+    for (obj_type, obj) in batch:
+      uuids_by_type.setdefault(obj_type, []).append(obj["uuid"])
+    for obj_type, uuids in uuids_by_type.items():
+      for i in range(0, len(uuids), 200):
+        for obj in list_objects(module, controller_ip, obj_type, query={"detail": "true", "obj_uuids": ','.join(uuids[i:i + 200])}, page_limit=200):
+          live[obj.get("uuid")] = obj
+    return live
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+    set_controller_nodes(module)
+
+    src = module.params.get("src")
+    ## the first node of controller_ip (set_controller_nodes), and transport spreads requests to the others
+    controller_ip = module.params.get("controller_ip")
+    config_api_url = 'http://' + controller_ip + ':8082/'
+    overwrite = module.params.get("overwrite")
+    batch_size = max(1, module.params.get("batch_size") or 1)
+
+    result = dict(
+        changed=False,
+        summary=dict(total=0, created=0, updated=0, skipped=0, differs=0, conflicts=0, failed=0),
+        levels=[],
+        failed_items=[],
+        differs=[],
+        conflicts=[]
+    )
+
+    manifest = read_manifest(src)
+    if manifest and not manifest.get("sha256") == file_sha256(src):
+      module.fail_json(msg="sha256 of {} doesn't match its manifest".format(src))
+    if manifest and manifest.get("fields"):
+      module.fail_json(msg="{} has only some fields of objects ({}), so it cannot be restored".format(src, ', '.join(manifest.get("fields"))))
+
+    keystone_login(module, controller_ip)
+
+    spool = Spool()
+    (types, parents, refs) = type_graph(src, module.params.get("obj_types"), spool=spool)
+    (levels, deferred) = dependency_levels(types, parents, refs)
+    result["levels"] = levels
+
+    def deferred_refs(obj_type, payload):
+      ## ref fields written after all the objects are created
+      return [field for field in payload if field.endswith('_refs') and ref_type(field) in deferred.get(obj_type, ())]
+
+    progress = Progress(total=manifest.get("count") if manifest and not module.params.get("obj_types") else None, path=module.params.get("progress_file"))
+
+    def item(obj_type, obj, status, message=None):
+      entry = {"type": obj_type, "uuid": obj.get("uuid"), "fq_name": obj.get("fq_name")}
+      if message:
+        entry["message"] = message
+      return (status, entry)
+
+    def restore_one(args):
+      ## an exception (such as a connection error) fails the object, not the whole restore
+      (obj_type, obj, live) = args
+      try:
+        return restore(obj_type, obj, live)
+      except Exception as e:
+        return item(obj_type, obj, 'failed', "{}: {}".format(type(e).__name__, e))
+
+    def restore(obj_type, obj, live):
+      payload = restore_payload(obj)
+      if live:
+        if same_content(payload, live):
+          return item(obj_type, obj, 'skipped')
+        if not overwrite:
+          return item(obj_type, obj, 'differs')
+        if module.check_mode:
+          return item(obj_type, obj, 'updated')
+        response = transport.put(config_api_url + obj_type + '/' + obj["uuid"], data=json.dumps({obj_type: payload}), headers=vnc_api_headers)
+        return item(obj_type, obj, 'updated') if response.status_code == 200 else item(obj_type, obj, 'failed', response.text)
+      fields = deferred_refs(obj_type, payload)
+      if fields:
+        payload = dict((k, v) for k, v in payload.items() if not k in fields)
+      if module.check_mode:
+        return item(obj_type, obj, 'created')
+      response = transport.post(config_api_url + obj_type + 's', data=json.dumps({obj_type: payload}), headers=vnc_api_headers)
+      if response.status_code == 409:
+        return item(obj_type, obj, 'conflicts', response.text)
+      if not response.status_code == 200:
+        return item(obj_type, obj, 'failed', response.text)
+      if fields:
+        ## created objects with refs which are written later
+        spool.add('deferred', obj_type, obj)
+      return item(obj_type, obj, 'created')
+
+    def count(status, entry):
+      result["summary"]["total"] += 1
+      result["summary"][status] += 1
+      if status in ['created', 'updated']:
+        result["changed"] = True
+      elif status == 'failed':
+        result["failed_items"].append(entry)
+      elif status in ['differs', 'conflicts']:
+        result[status].append(entry)
+      progress.add(changed=status in ['created', 'updated'], failed=status == 'failed')
+
+    pool = ThreadPool(max(1, module.params.get("workers") or 1))
+    try:
+      for level in levels:
+        rows = ((obj_type, obj) for level_type in level for (obj_type, obj) in spool.read(level_type))
+        while True:
+          batch = list(islice(rows, batch_size))
+          if not batch:
+            break
+          ## a failed list request fails the objects of this batch, not the whole restore
+          try:
+            live = live_objects(ItemModule(module, module.params), controller_ip, batch)
+          except ItemExit as e:
+            for (obj_type, obj) in batch:
+              count(*item(obj_type, obj, 'failed', e.result.get("msg")))
+            continue
+          except Exception as e:
+            for (obj_type, obj) in batch:
+              count(*item(obj_type, obj, 'failed', "{}: {}".format(type(e).__name__, e)))
+            continue
+          for (status, entry) in pool.map(restore_one, [(obj_type, obj, live.get(obj["uuid"])) for (obj_type, obj) in batch]):
+            count(status, entry)
+
+      ## refs which were not written at create
+      rows = spool.read('deferred')
+      def add_refs(args):
+        (obj_type, obj) = args
+        payload = restore_payload(obj)
+        refs_payload = dict((field, payload[field]) for field in deferred_refs(obj_type, payload))
+        try:
+          response = transport.put(config_api_url + obj_type + '/' + obj["uuid"], data=json.dumps({obj_type: refs_payload}), headers=vnc_api_headers)
+        except Exception as e:
+          return item(obj_type, obj, 'failed', "{}: {}".format(type(e).__name__, e))[1]
+        return None if response.status_code == 200 else item(obj_type, obj, 'failed', response.text)[1]
+      while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+          break
+        for entry in pool.map(add_refs, batch):
+          if entry:
+            result["summary"]["failed"] += 1
+            result["failed_items"].append(entry)
+    finally:
+      pool.close()
+      pool.join()
+      progress.close()
+      spool.close()
+
+    if result["summary"]["failed"]:
+      module.fail_json(msg="{} of {} objects cannot be restored".format(result["summary"]["failed"], result["summary"]["total"]), **result)
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'config_restore')
+
+if __name__ == '__main__':
+    main()
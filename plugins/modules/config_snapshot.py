@@ -0,0 +1,236 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: config_snapshot
+
+short_description: export tungstenfabric config to a snapshot file
+
+version_added: "2.9"
+
+description:
+    - "export objects of the given types (or all the types) to a json lines file, with a manifest of counts and checksums (<dest>.manifest.json)"
+    - "types are read concurrently, each by config-api's list api one page at a time, and objects are written as they are read, so memory usage doesn't depend on the number of objects"
+    - "with project or fabric, objects are found by walking down from them by parent_id of the list api (children of the exported types, level by level), so objects out of the scope are not read"
+
+options:
+    dest:
+        description:
+            - snapshot file (json lines, gzipped when it ends with .gz)
+        required: true
+    obj_types:
+        description:
+            - object types to be exported. all the types of config-api are exported when it is not given
+        required: false
+    exclude_types:
+        description:
+            - object types not to be exported
+        required: false
+    domain:
+        description:
+            - domain name of project
+        required: false
+    project:
+        description:
+            - export only the project and objects under it (its children of the exported types, and their children, and so on)
+        required: false
+    fabric:
+        description:
+            - export only the fabric and objects under it, including physical routers of the fabric and objects under them. with project, objects under either of them are exported
+        required: false
+    fields:
+        description:
+            - fields to be exported, in addition to uuid, fq_name, parent_type and parent_uuid. all the fields are exported when it is not given. a snapshot with fields has partial objects, so it is marked in the manifest, and config_restore doesn't restore it
+        required: false
+    workers:
+        description:
+            - number of types read concurrently (Default: 8)
+        required: false
+    page_limit:
+        description:
+            - number of objects read by one request (Default: 1000)
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: snapshot of a project
+  tungstenfabric.networking.config_snapshot:
+    controller_ip: x.x.x.x
+    project: admin
+    dest: /backup/admin-{{ lookup('pipe', 'date +%Y%m%d%H%M%S') }}.jsonl.gz
+
+- name: snapshot of some types
+  tungstenfabric.networking.config_snapshot:
+    controller_ip: x.x.x.x
+    obj_types: [virtual-network, network-ipam, network-policy]
+    dest: /backup/vn.jsonl.gz
+'''
+
+RETURN = '''
+dest:
+    description: snapshot file
+    type: str
+    returned: always
+manifest:
+    description: counts and sha256 of the snapshot and of each type, which are also written to <dest>.manifest.json
+    type: dict
+    returned: always
+failed_types:
+    description: types which cannot be read, with the error
+    type: list
+    returned: when some types cannot be read
+'''
+
+import json
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, list_objects, fqname_to_id, vnc_api_headers, transport, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import ItemModule, ItemExit
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import SnapshotWriter, config_types
+
+module_args = dict(
+    dest=dict(type='path', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    obj_types=dict(type='list', elements='str', required=False),
+    exclude_types=dict(type='list', elements='str', required=False, default=[]),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False),
+    fabric=dict(type='str', required=False),
+    fields=dict(type='list', elements='str', required=False),
+    workers=dict(type='int', required=False, default=8),
+    page_limit=dict(type='int', required=False, default=1000)
+)
+
+def scope_roots(module, controller_ip):
+    ## (type, uuid) of the objects whose subtrees are exported, or None for all the objects
+    config_api_url = 'http://' + controller_ip + ':8082/'
+    roots = []
+    if module.params.get("project"):
+      roots.append(('project', fqname_to_id(module, [module.params.get("domain"), module.params.get("project")], 'project', controller_ip)))
+    fabric = module.params.get("fabric")
+    if fabric:
+      fabric_uuid = fqname_to_id(module, ['default-global-system-config', fabric], 'fabric', controller_ip)
+      roots.append(('fabric', fabric_uuid))
+      ## physical routers of the fabric, by back-refs of the fabric
+      response = transport.get(config_api_url + 'fabric/' + fabric_uuid + '?fields=physical_router_back_refs', headers=vnc_api_headers)
+      if not response.status_code == 200:
+        module.fail_json(msg="fabric {} cannot be read: {}".format(fabric, response.text))
+      for ref in json.loads(response.text).get("fabric", {}).get("physical_router_back_refs") or []:
+        roots.append(('physical-router', ref["uuid"]))
+    return roots or None
+
+def read_children(module, controller_ip, obj_type, parent_uuids, query, page_limit):
+    ## objects of obj_type whose parent is one of parent_uuids, 200 parents per list call
+    for i in range(0, len(parent_uuids), 200):
+      child_query = dict(query)
+      child_query["parent_id"] = ','.join(parent_uuids[i:i + 200])
+      for obj in list_objects(module, controller_ip, obj_type, query=child_query, page_limit=page_limit):
+        yield obj
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+    set_controller_nodes(module)
+
+    result = dict(
+        changed=False,
+        dest=module.params.get("dest")
+    )
+
+    controller_ip = module.params.get("controller_ip")
+    fields = module.params.get("fields")
+    page_limit = max(1, module.params.get("page_limit"))
+
+    keystone_login(module, controller_ip)
+
+    obj_types = module.params.get("obj_types") or config_types(module, controller_ip)
+    obj_types = [obj_type for obj_type in obj_types if not obj_type in module.params.get("exclude_types")]
+    roots = scope_roots(module, controller_ip)
+
+    query = {"detail": "true"}
+    if fields:
+      query["fields"] = ','.join(fields)
+
+    if module.check_mode:
+      module.exit_json(**result)
+
+    writer = SnapshotWriter(module.params.get("dest"), fields=fields)
+    def export(args):
+      ##
+      # (obj_type, query) -> uuids of the objects written
+      # fail_json of list_objects ends only this type
+      ##
+      (obj_type, type_query) = args
+      uuids = []
+      try:
+        if "parent_id" in type_query:
+          objs = read_children(ItemModule(module, module.params), controller_ip, obj_type, type_query["parent_id"], query, page_limit)
+        else:
+          objs = list_objects(ItemModule(module, module.params), controller_ip, obj_type, query=type_query, page_limit=page_limit)
+        for obj in objs:
+          writer.write(obj_type, obj)
+          uuids.append(obj["uuid"])
+      except ItemExit as e:
+        return {"type": obj_type, "msg": e.result.get("msg")}
+      return uuids
+
+    pool = ThreadPool(max(1, min(module.params.get("workers") or 1, len(obj_types) or 1)))
+    failed_types = []
+    def run(args_list):
+      uuids = []
+      for written in pool.map(export, args_list):
+        if isinstance(written, dict):
+          failed_types.append(written)
+        else:
+          uuids.extend(written)
+      return uuids
+    try:
+      if roots is None:
+        run([(obj_type, query) for obj_type in obj_types])
+      else:
+        ## the roots themselves, and then their children level by level
+        root_uuids = {}
+        for (root_type, uuid) in roots:
+          root_uuids.setdefault(root_type, []).append(uuid)
+        run([(root_type, dict(query, obj_uuids=','.join(uuids))) for root_type, uuids in root_uuids.items() if root_type in obj_types])
+        seen = set(uuid for (root_type, uuid) in roots)
+        frontier = sorted(seen)
+        while frontier:
+          uuids = run([(obj_type, {"parent_id": frontier}) for obj_type in obj_types])
+          frontier = sorted(set(uuids) - seen)
+          seen.update(frontier)
+    finally:
+      pool.close()
+      pool.join()
+      result["manifest"] = writer.close()
+
+    result["changed"] = True
+    if failed_types:
+      result["failed_types"] = failed_types
+      module.fail_json(msg="{} of {} types cannot be read".format(len(failed_types), len(obj_types)), **result)
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'config_snapshot')
+
+if __name__ == '__main__':
+    main()
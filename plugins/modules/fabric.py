@@ -25,10 +25,6 @@ options:
         description:
             - fabric name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - fabric subnet
@@ -37,6 +33,18 @@ options:
         description:
             - fabric subnet
         required: false
+    wait:
+        description:
+            - when it is set to true, wait until the job finishes (Default: false). job status is checked by analytics api (:8081), and progress is written to progress_file, or to async job file when async is used
+        required: false
+    wait_timeout:
+        description:
+            - seconds to wait for the job (Default: 3600)
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
 
 author:
     - Tatsuya Naganawa (@tnaganawa)
@@ -84,50 +92,69 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+job_execution_id:
+    description: id of the job started by this task
+    type: str
+    returned: when wait is true
+job_status:
+    description: SUCCESS, FAILURE or TIMEOUT
+    type: str
+    returned: when wait is true
 '''
 
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, wait_for_job, vnc_api_headers, run_with_profile, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.progress import job_progress
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='admin'),
+    device_username=dict(type='str', required=True),
+    device_password=dict(type='str', required=True),
+    overlay_ibgp_asn=dict(type='int', required=True),
+    enterprise_style=dict(type='bool', required=False, default=True),
+    management_subnets=dict(type='list', required=True),
+    loopback_subnets=dict(type='list', required=True),
+    fabric_subnets=dict(type='list', required=False),
+    fabric_asn_pool=dict(type='list', required=False),
+    wait=dict(type='bool', required=False, default=False),
+    wait_timeout=dict(type='int', required=False, default=3600)
+)
+
+required_if_args = [
+  ["state", "present", ["device_username", "device_password"]]
+]
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='admin'),
-        device_username=dict(type='str', required=True),
-        device_password=dict(type='str', required=True),
-        overlay_ibgp_asn=dict(type='int', required=True),
-        enterprise_style=dict(type='bool', required=False, default=True),
-        management_subnets=dict(type='list', required=True),
-        loopback_subnets=dict(type='list', required=True),
-        fabric_subnets=dict(type='list', required=False),
-        fabric_asn_pool=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["state", "present", ["device_username", "device_password"]]
-    ]
-
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -135,6 +162,8 @@ def run_module():
     state = module.params.get("state")
     domain = module.params.get("domain")
     project = module.params.get("project")
+    wait = module.params.get("wait")
+    wait_timeout = module.params.get("wait_timeout")
     device_username = module.params.get("device_username")
     device_password = module.params.get("device_password")
     management_subnets = module.params.get("management_subnets")
@@ -161,10 +190,16 @@ def run_module():
       elif state == 'absent':
         # delete fabric
         payload = {'job_template_fq_name': ['default-global-system-config', 'fabric_deletion_template'], "input": {'fabric_fq_name': ["default-global-system-config", name]}}
-        response = requests.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
+        elif wait:
+          job_execution_id = json.loads(response.text).get("job_execution_id")
+          result["job_execution_id"] = job_execution_id
+          result["job_status"] = wait_for_job(controller_ip, job_execution_id, wait_timeout, progress=job_progress(module))
+          if not result["job_status"] == 'SUCCESS':
+            failed = True
     else:
       if state == 'present':
         management_subnets_dict= [{"cidr": management_subnet } for management_subnet in management_subnets]
@@ -183,10 +218,16 @@ def run_module():
           job_input["fabric_asn_pool"]=[{"asn_min": fabric_asn_pool[0], "asn_max": fabric_asn_pool[1]}]
 
         payload = {'job_template_fq_name': ['default-global-system-config', 'existing_fabric_onboard_template'], "input": job_input}
-        response = requests.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
+        elif wait:
+          job_execution_id = json.loads(response.text).get("job_execution_id")
+          result["job_execution_id"] = job_execution_id
+          result["job_status"] = wait_for_job(controller_ip, job_execution_id, wait_timeout, progress=job_progress(module))
+          if not result["job_status"] == 'SUCCESS':
+            failed = True
       else:
         module.fail_json(msg='cannot reach here', **result)
     
@@ -200,7 +241,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'fabric')
 
 if __name__ == '__main__':
     main()
@@ -25,10 +25,6 @@ options:
         description:
             - fabric name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - fabric subnet
@@ -41,7 +37,18 @@ options:
         description:
             - dictionary for routing / bridging roles of each device
         required: false
+    wait:
+        description:
+            - when it is set to true, wait until the job finishes (Default: false). job status is checked by analytics api (:8081), and progress is written to progress_file, or to async job file when async is used
+        required: false
+    wait_timeout:
+        description:
+            - seconds to wait for the job (Default: 3600)
+        required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
 
 author:
     - Tatsuya Naganawa (@tnaganawa)
@@ -73,37 +80,58 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+job_execution_id:
+    description: id of the job started by this task
+    type: str
+    returned: when wait is true
+job_status:
+    description: SUCCESS, FAILURE or TIMEOUT
+    type: str
+    returned: when wait is true
 '''
 
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, wait_for_job, vnc_api_headers, run_with_profile, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.progress import job_progress
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='admin'),
+    dict_device_role=dict(type='dict', required=False, default='root'),
+    wait=dict(type='bool', required=False, default=False),
+    wait_timeout=dict(type='int', required=False, default=3600)
+)
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='admin'),
-        dict_device_role=dict(type='dict', required=False, default='root')
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -111,6 +139,8 @@ def run_module():
     state = module.params.get("state")
     domain = module.params.get("domain")
     project = module.params.get("project")
+    wait = module.params.get("wait")
+    wait_timeout = module.params.get("wait_timeout")
     dict_device_role = module.params.get("dict_device_role")
 
     if module.check_mode:
@@ -132,11 +162,16 @@ def run_module():
                        'role_assignments': role_assignment_list
                     }
         payload = {'job_template_fq_name': ['default-global-system-config', 'role_assignment_template'], "input": job_input}
-        response = requests.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
-        ## TODO: wait_for for this job
+        elif wait:
+          job_execution_id = json.loads(response.text).get("job_execution_id")
+          result["job_execution_id"] = job_execution_id
+          result["job_status"] = wait_for_job(controller_ip, job_execution_id, wait_timeout, progress=job_progress(module))
+          if not result["job_status"] == 'SUCCESS':
+            failed = True
     else:
         result["message"]="fabric {} doesn't exist".format(name)
     ## end: object specific
@@ -148,7 +183,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'fabric_role_assignment')
 
 if __name__ == '__main__':
     main()
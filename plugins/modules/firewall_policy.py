@@ -25,10 +25,6 @@ options:
         description:
             - firewall-policy name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     project:
         description:
             - project name (if it is defined, firewall-policy will be project scoped rule)
@@ -38,6 +34,10 @@ options:
             - rule of this firewall-policy (see EXAMPLES)
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -70,41 +70,58 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, fqname_to_id, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False),
+    firewall_rules=dict(type='list', required=False)
+)
+
+required_if_args = [
+  ["state", "present", ["firewall_rules"]]
+]
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False),
-        firewall_rules=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["state", "present", ["firewall_rules"]]
-    ]
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -118,8 +135,6 @@ def run_module():
         module.exit_json(**result)
 
 
-    config_api_url = 'http://' + controller_ip + ':8082/'
-
     obj_type='firewall-policy'
 
     (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
@@ -161,10 +176,7 @@ def run_module():
           firewall_rule_fqname = [domain, project, firewall_rule_name]
         else:
           firewall_rule_fqname = ["default-policy-management", firewall_rule_name]
-        response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": "firewall-rule", "fq_name": firewall_rule_fqname}), headers=vnc_api_headers)
-        if not response.status_code == 200:
-          module.fail_json(msg="specified firewall-rule doesn't exist", **result)
-        firewall_rule_uuid = json.loads(response.text).get("uuid")
+        firewall_rule_uuid = fqname_to_id (module, firewall_rule_fqname, 'firewall-rule', controller_ip)
         firewall_rule_refs.append({"attr": {"sequence": "{}".format(i)}, "to": firewall_rule_fqname, "uuid": firewall_rule_uuid})
       js["firewall-policy"]["firewall_rule_refs"] = firewall_rule_refs
     ## end: object specific
@@ -181,7 +193,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'firewall_policy')
 
 if __name__ == '__main__':
     main()
@@ -21,15 +21,14 @@ description:
     - "create / delete tungstenfabric global-system-config"
 
 options:
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     autonomous_system:
         description:
             - global AS number of this cluster
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -50,15 +49,13 @@ message:
 '''
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, update_object, run_with_profile, set_controller_nodes
 
 def run_module():
     module_args = dict(
-        controller_ip=dict(type='str', required=True),
+        controller_ip=dict(type='list', elements='str', required=True),
         username=dict(type='str', required=False, default='admin'),
         password=dict(type='str', required=False, default='contrail123'),
         state=dict(type='str', required=False, default='present', choices=['present']),
@@ -73,6 +70,7 @@ def run_module():
         argument_spec=module_args,
         supports_check_mode=True
     )
+    set_controller_nodes(module)
 
     name='global-default-system-config'
     controller_ip = module.params.get("controller_ip")
@@ -89,26 +87,26 @@ def run_module():
     (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
 
     ## begin: object specific
-    old_js = js
-    js = {"global-system-config": {}}
+    def modify(js):
+      old_js = js
+      js = {"global-system-config": {}}
 
-    ## limit properties because of web api limitation
-    for k in old_js["global-system-config"]:
-      if k in ["bgpaas_parameters", "igmp_enable", "parent_type", "ibgp_auto_mesh", "rd_cluster_seed", "autonomous_system", "enable_4byte_as", "display_name", "plugin_tuning", "tag_refs", "id_perms:enable", "id_perms:description", "id_perms:user_visible", "id_perms:permissions", "fast_convergence_parameters", "ip_fabric_subnets", "annotations", "mac_limit_control", "user_defined_log_statistics", "config_version", "supported_vendor_hardwares", "enable_security_policy_draft", "perms2", "bgp_router_refs", "supported_fabric_annotations", "alarm_enable", "mac_move_control", "data_center_interconnect_loopback_namespace", "bgp_always_compare_med", "data_center_interconnect_asn_namespace", "graceful_restart_parameters", "supported_device_families", "mac_aging_time", "fq_name", "uuid", "display_name", "parent_type", "parent_uuid"]:
-        js["global-system-config"][k]=old_js["global-system-config"][k]
+      ## limit properties because of web api limitation
+      for k in old_js["global-system-config"]:
+        if k in ["bgpaas_parameters", "igmp_enable", "parent_type", "ibgp_auto_mesh", "rd_cluster_seed", "autonomous_system", "enable_4byte_as", "display_name", "plugin_tuning", "tag_refs", "id_perms:enable", "id_perms:description", "id_perms:user_visible", "id_perms:permissions", "fast_convergence_parameters", "ip_fabric_subnets", "annotations", "mac_limit_control", "user_defined_log_statistics", "config_version", "supported_vendor_hardwares", "enable_security_policy_draft", "perms2", "bgp_router_refs", "supported_fabric_annotations", "alarm_enable", "mac_move_control", "data_center_interconnect_loopback_namespace", "bgp_always_compare_med", "data_center_interconnect_asn_namespace", "graceful_restart_parameters", "supported_device_families", "mac_aging_time", "fq_name", "uuid", "display_name", "parent_type", "parent_uuid"]:
+          js["global-system-config"][k]=old_js["global-system-config"][k]
 
 
-    if autonomous_system:
-      js ["global-system-config"]["autonomous_system"]=autonomous_system
+      if autonomous_system:
+        js ["global-system-config"]["autonomous_system"]=autonomous_system
+      return js
     ## end: object specific
 
+    def write(js):
+      payload=json.dumps(js)
+      return crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
-    payload=json.dumps(js)
-    #print (payload)
-    #print (js.get("global-system-config").get("uuid"))
-    #sys.exit(35)
-
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = update_object(module, web_api, controller_ip, obj_type, uuid, js, modify, write)
 
 
     if failed:
@@ -117,7 +115,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'global_system_config')
 
 if __name__ == '__main__':
     main()
@@ -21,15 +21,14 @@ description:
     - "create / delete tungstenfabric global-vrouter-config"
 
 options:
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     flow_export_rate:
         description:
             - flow export rate from vRouter
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -53,15 +52,13 @@ message:
 '''
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, update_object, run_with_profile, set_controller_nodes
 
 def run_module():
     module_args = dict(
-        controller_ip=dict(type='str', required=True),
+        controller_ip=dict(type='list', elements='str', required=True),
         username=dict(type='str', required=False, default='admin'),
         password=dict(type='str', required=False, default='contrail123'),
         state=dict(type='str', required=False, default='present', choices=['present']),
@@ -79,6 +76,7 @@ def run_module():
         argument_spec=module_args,
         supports_check_mode=True
     )
+    set_controller_nodes(module)
 
     name='default-global-vrouter-config'
     controller_ip = module.params.get("controller_ip")
@@ -98,28 +96,31 @@ def run_module():
     (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
 
     ## begin: object specific
-    if vxlan_network_identifier_mode:
-      js ["global-vrouter-config"]["vxlan_network_identifier_mode"]=vxlan_network_identifier_mode
-
-    if encapsulation_priorities:
-      js ["global-vrouter-config"]["encapsulation_priorities"]["encapsulation"]=encapsulation_priorities
-
-    if flow_export_rate:
-      js ["global-vrouter-config"]["flow_export_rate"]=flow_export_rate
-
-    if port_translation_pool:
-      port_translation_pool_list=[]
-      if port_translation_pool.get("tcp"):
-        port_translation_pool_list.append({"protocol": "tcp", "port_count": str(port_translation_pool.get("tcp"))})
-      if port_translation_pool.get("udp"):
-        port_translation_pool_list.append({"protocol": "udp", "port_count": str(port_translation_pool.get("udp"))})
-      js ["global-vrouter-config"]["port_translation_pools"]={"port_translation_pool": port_translation_pool_list}
-
+    def modify(js):
+      if vxlan_network_identifier_mode:
+        js ["global-vrouter-config"]["vxlan_network_identifier_mode"]=vxlan_network_identifier_mode
+
+      if encapsulation_priorities:
+        js ["global-vrouter-config"]["encapsulation_priorities"]["encapsulation"]=encapsulation_priorities
+
+      if flow_export_rate:
+        js ["global-vrouter-config"]["flow_export_rate"]=flow_export_rate
+
+      if port_translation_pool:
+        port_translation_pool_list=[]
+        if port_translation_pool.get("tcp"):
+          port_translation_pool_list.append({"protocol": "tcp", "port_count": str(port_translation_pool.get("tcp"))})
+        if port_translation_pool.get("udp"):
+          port_translation_pool_list.append({"protocol": "udp", "port_count": str(port_translation_pool.get("udp"))})
+        js ["global-vrouter-config"]["port_translation_pools"]={"port_translation_pool": port_translation_pool_list}
+      return js
     ## end: object specific
 
-    payload=json.dumps(js)
+    def write(js):
+      payload=json.dumps(js)
+      return crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = update_object(module, web_api, controller_ip, obj_type, uuid, js, modify, write)
 
 
     if failed:
@@ -128,7 +129,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'global_vrouter_config')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,184 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: impact_info
+
+short_description: show objects affected by a change of a tungstenfabric object
+
+version_added: "2.9"
+
+description:
+    - "shows objects which refer to an object or are its children (referenced_by), or objects which it refers to (references), directly and transitively"
+    - "objects of obj_types are read by list api and indexed as a graph (module_utils/graph.py), which can be kept in index_file and reused"
+    - "blocking lists the objects which make a delete of the object fail (direct back-refs and children)"
+
+options:
+    obj_type:
+        description:
+            - type of the object, such as virtual-network
+        required: true
+    fq_name:
+        description:
+            - fq_name of the object, as a list or a colon separated string. either fq_name or uuid is required
+        required: false
+    uuid:
+        description:
+            - uuid of the object
+        required: false
+    direction:
+        description:
+            - referenced_by (objects which refer to the object, and its children) or references (objects which the object refers to, and its parent) (Default: referenced_by)
+        required: false
+    max_depth:
+        description:
+            - depth of transitive search. 1 shows only the direct ones. all the depths are searched when it is not given
+        required: false
+    obj_types:
+        description:
+            - object types indexed (only refs to these types are read). all the types of config-api are indexed when it is not given
+        required: false
+    index_file:
+        description:
+            - file to keep the index in (gzipped when it ends with .gz). it is used instead of reading objects while it is newer than index_max_age seconds, and is built for the same obj_types
+        required: false
+    index_max_age:
+        description:
+            - seconds for which index_file is used (Default: 300)
+        required: false
+    workers:
+        description:
+            - number of types read concurrently (Default: 8)
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: what would be affected by deleting vn1
+  tungstenfabric.networking.impact_info:
+    controller_ip: x.x.x.x
+    obj_type: virtual-network
+    fq_name: default-domain:admin:vn1
+    index_file: /tmp/tf-graph.json.gz
+  register: impact
+
+- debug: var=impact.blocking
+'''
+
+RETURN = '''
+object:
+    description: the object (type, uuid, fq_name)
+    type: dict
+    returned: always
+impacted:
+    description: objects found (type, uuid, fq_name, depth, relation, via). relation is ref, child or parent, and via is uuid of the object by which it was found
+    type: list
+    returned: always
+blocking:
+    description: direct back-refs and children, which make a delete of the object fail (only for direction referenced_by)
+    type: list
+    returned: always
+summary:
+    description: number of impacted objects per type, and number of objects / types indexed
+    type: dict
+    returned: always
+'''
+
+import os
+import time
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, fqname_to_id, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.graph import ObjectGraph, build_graph
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import config_types
+
+module_args = dict(
+    obj_type=dict(type='str', required=True),
+    fq_name=dict(type='raw', required=False),
+    uuid=dict(type='str', required=False),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    direction=dict(type='str', required=False, default='referenced_by', choices=['referenced_by', 'references']),
+    max_depth=dict(type='int', required=False),
+    obj_types=dict(type='list', elements='str', required=False),
+    index_file=dict(type='path', required=False),
+    index_max_age=dict(type='int', required=False, default=300),
+    workers=dict(type='int', required=False, default=8)
+)
+
+def load_graph(module, controller_ip):
+    ## index_file is used while it is fresh, and is built for the same obj_types (None: all the types)
+    index_file = module.params.get("index_file")
+    requested = sorted(module.params.get("obj_types")) if module.params.get("obj_types") else None
+    if index_file and os.path.exists(index_file) and time.time() - os.path.getmtime(index_file) < module.params.get("index_max_age"):
+      graph = ObjectGraph.load(index_file)
+      if graph.obj_types == requested:
+        return graph
+    obj_types = requested or config_types(module, controller_ip)
+    graph = build_graph(module, controller_ip, obj_types, workers=module.params.get("workers") or 1, all_types=requested is None)
+    if index_file:
+      graph.save(index_file)
+    return graph
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_one_of=[['fq_name', 'uuid']],
+        mutually_exclusive=[['fq_name', 'uuid']]
+    )
+    set_controller_nodes(module)
+
+    obj_type = module.params.get("obj_type")
+    controller_ip = module.params.get("controller_ip")
+    direction = module.params.get("direction")
+
+    result = dict(
+        changed=False,
+        impacted=[],
+        blocking=[]
+    )
+
+    keystone_login(module, controller_ip)
+
+    uuid = module.params.get("uuid")
+    if not uuid:
+      fq_name = module.params.get("fq_name")
+      uuid = fqname_to_id(module, fq_name if isinstance(fq_name, list) else str(fq_name), obj_type, controller_ip)
+
+    graph = load_graph(module, controller_ip)
+    if not uuid in graph.ids:
+      module.fail_json(msg="{} {} is not in the index. obj_types should include {}".format(obj_type, uuid, obj_type), **result)
+    result["object"] = graph.node(graph.ids[uuid])
+
+    per_type = {}
+    for (found_uuid, depth, relation, via) in graph.closure(uuid, direction, max_depth=module.params.get("max_depth")):
+      entry = graph.node(graph.ids[found_uuid])
+      entry.update(depth=depth, relation=relation, via=via)
+      result["impacted"].append(entry)
+      per_type[entry["type"]] = per_type.get(entry["type"], 0) + 1
+      if direction == 'referenced_by' and depth == 1:
+        result["blocking"].append(entry)
+
+    result["summary"] = dict(impacted=len(result["impacted"]), types=per_type, indexed_objects=len(graph.uuids), indexed_types=len(graph.types))
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'impact_info')
+
+if __name__ == '__main__':
+    main()
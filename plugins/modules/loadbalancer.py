@@ -25,10 +25,6 @@ options:
         description:
             - loadbalancer name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - loadbalancer subnet
@@ -38,6 +34,10 @@ options:
             - loadbalancer subnet
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -73,45 +73,62 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='default-project'),
+    loadbalancer_provider=dict(type='str', required=False, default='opencontrail', choices=['native', 'opencontrail']),
+    loadbalancer_virtual_network=dict(type='str', required=False),
+    loadbalancer_subnet_uuid=dict(type='str', required=False),
+    loadbalancer_member_address_list=dict(type='list', required=False),
+    loadbalancer_member_port_list=dict(type='list', required=False)
+)
+
+required_if_args = [
+  ["state", "present", ["loadbalancer_virtual_network", "loadbalancer_subnet_uuid", "loadbalancer_member_address_list", "loadbalancer_member_port_list"]]
+]
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='default-project'),
-        loadbalancer_provider=dict(type='str', required=False, default='opencontrail', choices=['native', 'opencontrail']),
-        loadbalancer_virtual_network=dict(type='str', required=False),
-        loadbalancer_subnet_uuid=dict(type='str', required=False),
-        loadbalancer_member_address_list=dict(type='list', required=False),
-        loadbalancer_member_port_list=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["state", "present", ["loadbalancer_virtual_network", "loadbalancer_subnet_uuid", "loadbalancer_member_address_list", "loadbalancer_member_port_list"]]
-    ]
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -248,7 +265,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'loadbalancer')
 
 if __name__ == '__main__':
     main()
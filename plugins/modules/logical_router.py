@@ -25,10 +25,6 @@ options:
         description:
             - logical-router name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - logical-router domain
@@ -46,6 +42,10 @@ options:
             - virtual-networks connected to this logical-router
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -87,41 +87,59 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
-
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='default-project'),
+    router_type=dict(type='str', required=False, choices=['snat-routing', 'vxlan-routing']),
+    connected_networks=dict(type='list', required=False),
+    route_target_list=dict(type='list', required=False),
+    vxlan_network_identifier=dict(type='int', required=False),
+    physical_router_refs=dict(type='list', required=False)
+)
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='default-project'),
-        router_type=dict(type='str', required=False, choices=['snat-routing', 'vxlan-routing']),
-        connected_networks=dict(type='list', required=False),
-        route_target_list=dict(type='list', required=False),
-        vxlan_network_identifier=dict(type='int', required=False),
-        physical_router_refs=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -167,9 +185,7 @@ def run_module():
     if route_target_list:
       js ["logical-router"]["configured_route_target_list"]={"route_target": [ "target:{}".format(route_target) for route_target in route_target_list] }
 
-    print ("connected_networks", connected_networks)
     if not connected_networks == None:
-      print ("try to connect", connected_networks)
       js ["logical-router"]["virtual_machine_interface_refs"]=[]
       for network in connected_networks:
         js ["logical-router"]["virtual_machine_interface_refs"].append(
@@ -192,7 +208,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'logical_router')
 
 if __name__ == '__main__':
     main()
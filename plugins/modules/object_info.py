@@ -0,0 +1,198 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: object_info
+
+short_description: list tungstenfabric objects
+
+version_added: "2.9"
+
+description:
+    - "list tungstenfabric objects of a type, with filters and field projection"
+    - "objects are read by config-api's list api one page at a time (page_limit / page_marker), and can be written to a json lines file, so memory usage doesn't depend on the number of objects"
+
+options:
+    obj_type:
+        description:
+            - object type, such as virtual-network, virtual-machine-interface
+        required: true
+    parent_type:
+        description:
+            - parent type, such as project. used with parent_fq_name
+        required: false
+    parent_fq_name:
+        description:
+            - fq_name of the parent, such as [default-domain, admin]. used with parent_type
+        required: false
+    parent_uuid:
+        description:
+            - list of parent uuids
+        required: false
+    fq_name_prefix:
+        description:
+            - list objects whose fq_name starts with this list, such as [default-domain, admin]
+        required: false
+    tags:
+        description:
+            - list objects which have all of these tags, such as ["application=web", "site=dc1"]
+        required: false
+    filters:
+        description:
+            - 'list objects whose fields have these values, such as {"display_name": "vn1"}. evaluated by config-api'
+        required: false
+    fields:
+        description:
+            - fields to be returned, in addition to uuid, fq_name, parent_type and parent_uuid. all the fields are returned when it is not given
+        required: false
+    page_limit:
+        description:
+            - number of objects read by one request (Default: 1000)
+        required: false
+    dest:
+        description:
+            - json lines file (optionally gzipped, .gz) to write objects to, one object per line, instead of returning them as objects
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: list virtual-networks of a project
+  tungstenfabric.networking.object_info:
+    controller_ip: x.x.x.x
+    obj_type: virtual-network
+    parent_type: project
+    parent_fq_name: [default-domain, admin]
+    fields: [virtual_network_network_id, network_ipam_refs]
+  register: vns
+
+- name: dump all the virtual-machine-interfaces to a file
+  tungstenfabric.networking.object_info:
+    controller_ip: x.x.x.x
+    obj_type: virtual-machine-interface
+    fields: [virtual_machine_interface_mac_addresses, virtual_network_refs]
+    tags: ["application=web"]
+    dest: /tmp/vmis.jsonl.gz
+'''
+
+RETURN = '''
+objects:
+    description: objects listed, each of which is a dict of uuid, fq_name and the fields
+    type: list
+    returned: when dest is not given
+count:
+    description: number of objects listed
+    type: int
+    returned: always
+dest:
+    description: json lines file which objects are written to
+    type: str
+    returned: when dest is given
+'''
+
+import json
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.six import string_types
+from ansible.module_utils._text import to_text
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, list_objects, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import open_text
+
+module_args = dict(
+    obj_type=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    parent_type=dict(type='str', required=False),
+    parent_fq_name=dict(type='list', elements='str', required=False),
+    parent_uuid=dict(type='list', elements='str', required=False),
+    fq_name_prefix=dict(type='list', elements='str', required=False),
+    tags=dict(type='list', elements='str', required=False),
+    filters=dict(type='dict', required=False),
+    fields=dict(type='list', elements='str', required=False),
+    page_limit=dict(type='int', required=False, default=1000),
+    dest=dict(type='path', required=False)
+)
+
+def list_query(module):
+    ## parameters of config-api's list api
+    query = {"detail": "true"}
+    fields = module.params.get("fields")
+    tags = module.params.get("tags")
+    if fields:
+      if tags and not 'tag_refs' in fields:
+        fields = fields + ['tag_refs']
+      query["fields"] = ','.join(fields)
+    if module.params.get("parent_uuid"):
+      query["parent_id"] = ','.join(module.params.get("parent_uuid"))
+    elif module.params.get("parent_fq_name"):
+      query["parent_type"] = module.params.get("parent_type")
+      query["parent_fq_name_str"] = ':'.join(module.params.get("parent_fq_name"))
+    filters = module.params.get("filters")
+    if filters:
+      query["filters"] = ','.join('{}=={}'.format(k, v if isinstance(v, string_types) else json.dumps(v)) for k, v in sorted(filters.items()))
+    return query
+
+def match(obj, fq_name_prefix, tags):
+    ## filters which config-api doesn't have
+    if fq_name_prefix and not obj.get("fq_name", [])[:len(fq_name_prefix)] == fq_name_prefix:
+      return False
+    if tags:
+      obj_tags = [ref.get("to", [''])[-1] for ref in obj.get("tag_refs", [])]
+      if not all(tag in obj_tags for tag in tags):
+        return False
+    return True
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_together=[['parent_type', 'parent_fq_name']],
+        mutually_exclusive=[['parent_uuid', 'parent_fq_name']]
+    )
+    set_controller_nodes(module)
+
+    result = dict(
+        changed=False,
+        count=0
+    )
+
+    obj_type = module.params.get("obj_type")
+    controller_ip = module.params.get("controller_ip")
+    fq_name_prefix = module.params.get("fq_name_prefix")
+    tags = module.params.get("tags")
+    dest = module.params.get("dest")
+
+    keystone_login(module, controller_ip)
+
+    objs = (obj for obj in list_objects(module, controller_ip, obj_type, query=list_query(module), page_limit=max(1, module.params.get("page_limit"))) if match(obj, fq_name_prefix, tags))
+    if dest:
+      with open_text(dest, 'w') as out:
+        for obj in objs:
+          out.write(to_text(json.dumps(obj) + '\n'))
+          result["count"] += 1
+      result["dest"] = dest
+    else:
+      result["objects"] = list(objs)
+      result["count"] = len(result["objects"])
+
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'object_info')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: object_purge
+
+short_description: delete a tungstenfabric object with its dependent objects
+
+version_added: "2.9"
+
+description:
+    - "deletes an object (such as a project or a virtual-network), its children, and the objects which refer to them and are under the object (by fq_name) or depend on them by dependent_types, transitively"
+    - "other objects which refer to them (such as a port of another project which refers to a security-group) are not deleted, and their refs are removed"
+    - "when the object doesn't exist, nothing is done (changed is false), so a finished teardown can be run again"
+    - "objects are deleted level by level in dependency order (children and referrers first), and objects of one level are deleted concurrently"
+    - "when a delete fails, the following levels are not deleted, so the object and its parents are left as they are, and a re-run continues from there"
+    - "with check mode, only the plan (levels and unlinks) is returned"
+
+options:
+    obj_type:
+        description:
+            - type of the object, such as project
+        required: true
+    fq_name:
+        description:
+            - fq_name of the object, as a list or a colon separated string. either fq_name or uuid is required
+        required: false
+    uuid:
+        description:
+            - uuid of the object
+        required: false
+    obj_types:
+        description:
+            - object types read to find dependent objects (only refs to these types are read). all the types of config-api are read when it is not given
+        required: false
+    dependent_types:
+        description:
+            - dict of a type and the types by whose refs it is deleted with them, even if it is not under the object (Default: virtual-machine-interface by virtual-network / virtual-machine, instance-ip / floating-ip / alias-ip by virtual-machine-interface / virtual-network)
+        required: false
+    managed_types:
+        description:
+            - types of children which are deleted by the controller with their parent, so not deleted by this module (Default: routing-instance, access-control-list)
+        required: false
+    workers:
+        description:
+            - number of requests sent concurrently (Default: 8)
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: plan of tenant teardown
+  tungstenfabric.networking.object_purge:
+    controller_ip: x.x.x.x
+    obj_type: project
+    fq_name: default-domain:tenant1
+  check_mode: true
+  register: plan
+
+- name: tenant teardown
+  tungstenfabric.networking.object_purge:
+    controller_ip: x.x.x.x
+    obj_type: project
+    fq_name: default-domain:tenant1
+'''
+
+RETURN = '''
+levels:
+    description: objects to be deleted (type, uuid, fq_name), by level in the order they are deleted
+    type: list
+    returned: always
+unlinks:
+    description: refs to be removed before deletes (type, uuid, fq_name of the referrer, and ref_type, ref_uuid)
+    type: list
+    returned: always
+summary:
+    description: number of objects deleted, refs removed and failures
+    type: dict
+    returned: always
+failed_items:
+    description: objects or refs which cannot be deleted, with the message
+    type: list
+    returned: always
+'''
+
+import json
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, vnc_api_headers, transport, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import object_cache
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.graph import build_graph, delete_plan, dependent_types, managed_types
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import config_types
+
+module_args = dict(
+    obj_type=dict(type='str', required=True),
+    fq_name=dict(type='raw', required=False),
+    uuid=dict(type='str', required=False),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    obj_types=dict(type='list', elements='str', required=False),
+    dependent_types=dict(type='dict', required=False, default=dependent_types),
+    managed_types=dict(type='list', elements='str', required=False, default=managed_types),
+    workers=dict(type='int', required=False, default=8)
+)
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_one_of=[['fq_name', 'uuid']],
+        mutually_exclusive=[['fq_name', 'uuid']]
+    )
+    set_controller_nodes(module)
+
+    obj_type = module.params.get("obj_type")
+    controller_ip = module.params.get("controller_ip")
+    config_api_url = 'http://' + controller_ip + ':8082/'
+
+    result = dict(
+        changed=False,
+        levels=[],
+        unlinks=[],
+        summary=dict(deleted=0, unlinked=0, failed=0),
+        failed_items=[]
+    )
+
+    keystone_login(module, controller_ip)
+
+    ## the object which is already deleted (such as by the former run) is not an error
+    uuid = module.params.get("uuid")
+    if uuid:
+      response = transport.get(config_api_url + obj_type + '/' + uuid, headers=vnc_api_headers)
+    else:
+      fq_name = module.params.get("fq_name")
+      fq_name = fq_name if isinstance(fq_name, list) else str(fq_name).split(':')
+      response = transport.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": obj_type, "fq_name": fq_name}), headers=vnc_api_headers)
+      if response.status_code == 200:
+        uuid = json.loads(response.text).get("uuid")
+    if response.status_code == 404:
+      result["message"] = "{} doesn't exist".format(obj_type)
+      module.exit_json(**result)
+    elif not response.status_code == 200:
+      module.fail_json(msg="{} cannot be read: {}".format(obj_type, response.text), **result)
+
+    obj_types = module.params.get("obj_types") or config_types(module, controller_ip)
+    graph = build_graph(module, controller_ip, obj_types, workers=module.params.get("workers") or 1)
+    if not uuid in graph.ids:
+      module.fail_json(msg="{} {} is not found. obj_types should include {}".format(obj_type, uuid, obj_type), **result)
+    try:
+      (levels, unlinks) = delete_plan(graph, uuid, dependents=module.params.get("dependent_types"), managed=module.params.get("managed_types"))
+    except ValueError as e:
+      module.fail_json(msg=str(e), **result)
+
+    def node(uuid):
+      return graph.node(graph.ids[uuid])
+    result["levels"] = [[node(uuid) for uuid in level] for level in levels]
+    for (referrer, ref_uuid) in unlinks:
+      unlink = node(referrer)
+      unlink.update(ref_type=node(ref_uuid)["type"], ref_uuid=ref_uuid)
+      result["unlinks"].append(unlink)
+
+    if module.check_mode:
+      module.exit_json(**result)
+
+    def failed(entry, message):
+      entry = dict(entry)
+      entry["message"] = message
+      return entry
+
+    def unlink(entry):
+      data = {"operation": "DELETE", "type": entry["type"], "uuid": entry["uuid"], "ref-type": entry["ref_type"], "ref-uuid": entry["ref_uuid"]}
+      try:
+        response = transport.post(config_api_url + 'ref-update', data=json.dumps(data), headers=vnc_api_headers)
+      except Exception as e:
+        return failed(entry, "{}: {}".format(type(e).__name__, e))
+      finally:
+        object_cache.evict(entry["uuid"])
+      return None if response.status_code in [200, 404] else failed(entry, response.text)
+
+    def delete(entry):
+      try:
+        response = transport.delete(config_api_url + entry["type"] + '/' + entry["uuid"], headers=vnc_api_headers)
+      except Exception as e:
+        return failed(entry, "{}: {}".format(type(e).__name__, e))
+      finally:
+        object_cache.evict(entry["uuid"])
+      return None if response.status_code in [200, 404] else failed(entry, response.text)
+
+    def run(function, entries, count):
+      failed_items = [entry for entry in pool.map(function, entries) if entry]
+      if len(entries) > len(failed_items):
+        result["changed"] = True
+      result["summary"][count] += len(entries) - len(failed_items)
+      result["summary"]["failed"] += len(failed_items)
+      result["failed_items"].extend(failed_items)
+      return not failed_items
+
+    pool = ThreadPool(max(1, module.params.get("workers") or 1))
+    try:
+      ## a failure stops before the next level, so parents of what is not deleted are kept
+      if run(unlink, result["unlinks"], "unlinked"):
+        for level in result["levels"]:
+          if not run(delete, level, "deleted"):
+            break
+    finally:
+      pool.close()
+      pool.join()
+
+    if result["summary"]["failed"]:
+      module.fail_json(msg="{} objects or refs cannot be deleted".format(result["summary"]["failed"]), **result)
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'object_purge')
+
+if __name__ == '__main__':
+    main()
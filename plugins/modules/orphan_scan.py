@@ -0,0 +1,289 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: orphan_scan
+
+short_description: find (and delete) orphaned tungstenfabric objects
+
+version_added: "2.9"
+
+description:
+    - "finds objects which are left behind, by one paginated list call per type (with field projection) and a join of them in memory"
+    - "vmi: virtual-machine-interfaces of a project, without virtual-machine or port-tuple refs, which are not referred to by objects other than instance-ips"
+    - "vpg_vmi: virtual-machine-interfaces of a virtual-port-group (device_owner baremetal), which are not referred to by any virtual-port-group anymore"
+    - "instance_ip: instance-ips which refer to virtual-machine-interfaces, all of which don't exist or are orphaned"
+    - "loadbalancer: <name>-listener, <name>-pool, <name>-healthmonitor created by the loadbalancer module, whose loadbalancer <name> doesn't exist, and members of the pools"
+    - "objects created in the last min_age seconds are not reported, so objects which are being created are not deleted"
+    - "when delete is set to true, orphans are deleted concurrently, instance-ips and members first"
+
+options:
+    checks:
+        description:
+            - kinds of orphans to find, from vmi, vpg_vmi, instance_ip and loadbalancer (Default: all of them)
+        required: false
+    min_age:
+        description:
+            - objects created in the last min_age seconds are not reported (Default: 3600)
+        required: false
+    delete:
+        description:
+            - when it is set to true, orphans found are deleted (Default: false)
+        required: false
+    max_delete:
+        description:
+            - when more orphans than max_delete are found, nothing is deleted and the module fails
+        required: false
+    workers:
+        description:
+            - number of requests sent concurrently (Default: 8)
+        required: false
+    page_limit:
+        description:
+            - number of objects read by one request (Default: 1000)
+        required: false
+
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: report orphans
+  tungstenfabric.networking.orphan_scan:
+    controller_ip: x.x.x.x
+  register: orphans
+
+- name: nightly cleanup
+  tungstenfabric.networking.orphan_scan:
+    controller_ip: x.x.x.x
+    checks: [vpg_vmi, instance_ip, loadbalancer]
+    min_age: 86400
+    delete: true
+    max_delete: 200
+'''
+
+RETURN = '''
+orphans:
+    description: orphans found (type, uuid, fq_name, check)
+    type: list
+    returned: always
+summary:
+    description: number of orphans per check, and number of objects deleted and failed
+    type: dict
+    returned: always
+failed_items:
+    description: orphans which cannot be deleted (type, uuid, fq_name, check, message)
+    type: list
+    returned: always
+'''
+
+import time
+import calendar
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, list_objects, vnc_api_headers, transport, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import object_cache
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import ItemModule, ItemExit
+
+module_args = dict(
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    checks=dict(type='list', elements='str', required=False, default=['vmi', 'vpg_vmi', 'instance_ip', 'loadbalancer'], choices=['vmi', 'vpg_vmi', 'instance_ip', 'loadbalancer']),
+    min_age=dict(type='int', required=False, default=3600),
+    delete=dict(type='bool', required=False, default=False),
+    max_delete=dict(type='int', required=False),
+    workers=dict(type='int', required=False, default=8),
+    page_limit=dict(type='int', required=False, default=1000)
+)
+
+## types which refer to virtual-machine-interfaces (by virtual_machine_interface_refs)
+vmi_referrer_types = ['virtual-machine-interface', 'instance-ip', 'floating-ip', 'alias-ip', 'virtual-port-group', 'logical-router', 'loadbalancer', 'loadbalancer-pool', 'bgp-as-a-service', 'virtual-ip', 'logical-interface', 'subnet', 'customer-attachment']
+loadbalancer_suffixes = {'loadbalancer-listener': '-listener', 'loadbalancer-pool': '-pool', 'loadbalancer-healthmonitor': '-healthmonitor'}
+
+## orphans are deleted in this order, since the former ones refer to (or are children of) the latter ones
+delete_levels = [
+  ['instance-ip', 'loadbalancer-member'],
+  ['loadbalancer-pool'],
+  ['virtual-machine-interface', 'loadbalancer-listener', 'loadbalancer-healthmonitor']
+]
+
+def list_fields(checks):
+    ## {obj_type: fields} to be listed for the checks
+    fields = {}
+    def add(obj_type, *names):
+      fields.setdefault(obj_type, set(['id_perms'])).update(names)
+    if 'vmi' in checks or 'vpg_vmi' in checks or 'instance_ip' in checks:
+      add('virtual-machine-interface', 'virtual_machine_refs', 'port_tuple_refs', 'virtual_machine_interface_device_owner', 'virtual_machine_interface_bindings', 'virtual_machine_interface_refs')
+      for obj_type in vmi_referrer_types:
+        add(obj_type, 'virtual_machine_interface_refs')
+    if 'loadbalancer' in checks:
+      for obj_type in ['loadbalancer', 'loadbalancer-member'] + list(loadbalancer_suffixes):
+        add(obj_type)
+    return dict((obj_type, ','.join(sorted(names))) for obj_type, names in fields.items())
+
+def created_at(obj):
+    ## epoch seconds of id_perms.created (UTC), or None
+    id_perms = obj.get("id_perms") or {}
+    created = id_perms.get("created") or id_perms.get("last_modified")
+    try:
+      return calendar.timegm(time.strptime(created[:19], '%Y-%m-%dT%H:%M:%S'))
+    except (TypeError, ValueError):
+      return None
+
+def is_baremetal(vmi):
+    bindings = (vmi.get("virtual_machine_interface_bindings") or {}).get("key_value_pair") or []
+    return (vmi.get("virtual_machine_interface_device_owner") or '').startswith('baremetal') or any(pair.get("key") == 'vpg' for pair in bindings)
+
+def find_orphans(objects, checks, min_age, now):
+    ##
+    # objects: {obj_type: [obj, ...]}
+    # returns [(check, obj_type, obj)]
+    ##
+    def old(obj):
+      created = created_at(obj)
+      return not created is None and now - created >= min_age
+
+    orphans = []
+    found = set()
+    def add(check, obj_type, obj):
+      orphans.append((check, obj_type, obj))
+      found.add(obj["uuid"])
+
+    ## referrer types of each vmi
+    referrers = {}
+    for obj_type in vmi_referrer_types:
+      for obj in objects.get(obj_type, []):
+        for ref in obj.get("virtual_machine_interface_refs") or []:
+          referrers.setdefault(ref.get("uuid"), set()).add(obj_type)
+
+    vmis = objects.get('virtual-machine-interface', [])
+    for vmi in vmis:
+      if not vmi.get("parent_type") == 'project' or not old(vmi):
+        continue
+      if vmi.get("virtual_machine_refs") or vmi.get("port_tuple_refs"):
+        continue
+      if referrers.get(vmi["uuid"], set()) - set(['instance-ip']):
+        continue
+      check = 'vpg_vmi' if is_baremetal(vmi) else 'vmi'
+      if check in checks:
+        add(check, 'virtual-machine-interface', vmi)
+
+    if 'instance_ip' in checks:
+      existing = set(vmi["uuid"] for vmi in vmis)
+      for iip in objects.get('instance-ip', []):
+        if not old(iip):
+          continue
+        ## an instance-ip without vmi refs (such as a gateway or service address) is not an orphan
+        refs = iip.get("virtual_machine_interface_refs") or []
+        if refs and all(not ref.get("uuid") in existing or ref.get("uuid") in found for ref in refs):
+          add('instance_ip', 'instance-ip', iip)
+
+    if 'loadbalancer' in checks:
+      loadbalancers = set(':'.join(obj["fq_name"]) for obj in objects.get('loadbalancer', []))
+      for obj_type, suffix in sorted(loadbalancer_suffixes.items()):
+        for obj in objects.get(obj_type, []):
+          name = obj["fq_name"][-1]
+          if not name.endswith(suffix) or not old(obj):
+            continue
+          if not ':'.join(obj["fq_name"][:-1] + [name[:-len(suffix)]]) in loadbalancers:
+            add('loadbalancer', obj_type, obj)
+      for member in objects.get('loadbalancer-member', []):
+        if member.get("parent_uuid") in found:
+          add('loadbalancer', 'loadbalancer-member', member)
+
+    return orphans
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+    set_controller_nodes(module)
+
+    controller_ip = module.params.get("controller_ip")
+    config_api_url = 'http://' + controller_ip + ':8082/'
+    checks = module.params.get("checks")
+    page_limit = max(1, module.params.get("page_limit"))
+
+    result = dict(
+        changed=False,
+        orphans=[],
+        summary=dict((check, 0) for check in checks),
+        failed_items=[]
+    )
+    result["summary"].update(deleted=0, failed=0)
+
+    keystone_login(module, controller_ip)
+
+    def list_type(args):
+      (obj_type, fields) = args
+      try:
+        return (obj_type, list(list_objects(ItemModule(module, module.params), controller_ip, obj_type, query={"detail": "true", "fields": fields}, page_limit=page_limit)))
+      except ItemExit as e:
+        return e
+
+    pool = ThreadPool(max(1, module.params.get("workers") or 1))
+    try:
+      objects = {}
+      for listed in pool.map(list_type, sorted(list_fields(checks).items())):
+        if isinstance(listed, ItemExit):
+          module.fail_json(msg=listed.result.get("msg"), **result)
+        objects[listed[0]] = listed[1]
+
+      orphans = find_orphans(objects, checks, module.params.get("min_age"), time.time())
+      for (check, obj_type, obj) in orphans:
+        result["orphans"].append({"type": obj_type, "uuid": obj["uuid"], "fq_name": obj.get("fq_name"), "check": check})
+        result["summary"][check] += 1
+
+      if module.params.get("delete") and result["orphans"]:
+        max_delete = module.params.get("max_delete")
+        if not max_delete is None and len(result["orphans"]) > max_delete:
+          module.fail_json(msg="{} orphans are found, which is more than max_delete {}. nothing is deleted".format(len(result["orphans"]), max_delete), **result)
+        if not module.check_mode:
+          def delete(entry):
+            ## an exception (such as a connection error) fails the orphan, not the whole scan
+            try:
+              response = transport.delete(config_api_url + entry["type"] + '/' + entry["uuid"], headers=vnc_api_headers)
+              message = None if response.status_code in [200, 404] else response.text
+            except Exception as e:
+              message = "{}: {}".format(type(e).__name__, e)
+            finally:
+              object_cache.evict(entry["uuid"])
+            if message is None:
+              return None
+            entry = dict(entry)
+            entry["message"] = message
+            return entry
+          for level in delete_levels:
+            entries = [entry for entry in result["orphans"] if entry["type"] in level]
+            failed_items = [entry for entry in pool.map(delete, entries) if entry]
+            result["summary"]["deleted"] += len(entries) - len(failed_items)
+            result["summary"]["failed"] += len(failed_items)
+            result["failed_items"].extend(failed_items)
+        result["changed"] = result["summary"]["deleted"] > 0 or module.check_mode
+    finally:
+      pool.close()
+      pool.join()
+
+    if result["summary"]["failed"]:
+      module.fail_json(msg="{} orphans cannot be deleted".format(result["summary"]["failed"]), **result)
+    module.exit_json(**result)
+
+def main():
+    run_with_profile(run_module, 'orphan_scan')
+
+if __name__ == '__main__':
+    main()
@@ -25,10 +25,6 @@ options:
         description:
             - physical-interface name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     physical-router:
         description:
             - physical-router for this physical-interface (this needs to be unique among fabrics)
@@ -38,6 +34,10 @@ options:
             - share this physical-interface to specified tenant with specified permission
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -64,38 +64,49 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
 '''
 
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, fqname_to_id, update_object, vnc_api_headers, run_with_profile, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import object_cache
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='admin'),
+    physical_router=dict(type='str', required=True),
+    share=dict(type='list', required=False)
+)
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='admin'),
-        physical_router=dict(type='str', required=True),
-        share=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -121,21 +132,21 @@ def run_module():
 
     if update:
       if state == 'present':
-
-        if not share == None:
-          tmp_share_list=[]
-          for tenant_name, tenant_permission in share:
-            response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "project", "fq_name": ["%s", "%s"]}' % (domain, tenant_name), headers=vnc_api_headers)
-            if not response.status_code == 200:
-              failed = True
-              result["message"] = response.text
-              module.fail_json(msg="uuid of specified shared project cannot be obtained", **result)
-            project_uuid = json.loads(response.text).get("uuid")
-            tmp_share_list.append({"tenant": project_uuid, "tenant_access": tenant_permission})
-          js["physical-interface"]["perms2"]["share"]=tmp_share_list
-
-
-        response = requests.put(config_api_url + 'physical-interface/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        def modify(js):
+          if not share == None:
+            tmp_share_list=[]
+            for tenant_name, tenant_permission in share:
+              project_uuid = fqname_to_id (module, [domain, tenant_name], 'project', controller_ip)
+              tmp_share_list.append({"tenant": project_uuid, "tenant_access": tenant_permission})
+            js["physical-interface"]["perms2"]["share"]=tmp_share_list
+          return js
+
+        def write(js):
+          response = transport.put(config_api_url + 'physical-interface/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+          object_cache.evict(uuid)
+          return response
+
+        response = update_object(module, web_api, controller_ip, obj_type, uuid, js, modify, write)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -143,7 +154,8 @@ def run_module():
 
       elif state == 'absent':
         # delete physical-interface
-        response = requests.delete(config_api_url + 'physical-interface/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        response = transport.delete(config_api_url + 'physical-interface/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        object_cache.evict(uuid)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -160,7 +172,7 @@ def run_module():
         }
         ''' % (physical_router, name)
         )
-        response = requests.post(config_api_url + 'physical-interfaces', data=json.dumps(js), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'physical-interfaces', data=json.dumps(js), headers=vnc_api_headers)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -179,7 +191,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'physical_interface')
 
 if __name__ == '__main__':
     main()
@@ -25,10 +25,6 @@ options:
         description:
             - service-instance name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - service-instance domain
@@ -58,6 +54,10 @@ options:
             - uuids of right virtual-machine-interface
         required: true
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -89,47 +89,64 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
-import uuid as uuid_module
 import json
-import requests
+import uuid as module_uuid
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers, run_with_profile, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='default-project'),
+    mgmt_virtual_network=dict(type='str', required=False),
+    left_virtual_network=dict(type='str', required=True),
+    right_virtual_network=dict(type='str', required=True),
+    left_interface_uuids=dict(type='list', required=False),
+    right_interface_uuids=dict(type='list', required=False),
+    service_template=dict(type='str', required=True)
+)
+
+required_if_args = [
+  ["state", "present", ["left_virtual_network", "right_virtual_network", "service_template"]]
+]
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='default-project'),
-        mgmt_virtual_network=dict(type='str', required=False),
-        left_virtual_network=dict(type='str', required=True),
-        right_virtual_network=dict(type='str', required=True),
-        left_interface_uuids=dict(type='list', required=False),
-        right_interface_uuids=dict(type='list', required=False),
-        service_template=dict(type='str', required=True)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["state", "present", ["left_virtual_network", "right_virtual_network", "service_template"]]
-    ]
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -184,7 +201,7 @@ def run_module():
     if not update and left_interface_uuids:
       tmp_port_tuples = []
       for i in range(len(left_interface_uuids)):
-        port_tuple_uuid = str(uuid_module.uuid4())
+        port_tuple_uuid = str(module_uuid.uuid4())
         tmp_port_tuples.append(
         {"to": [domain, project, name, "port-tuple{}-{}".format(i, port_tuple_uuid)],
           "vmis": [{"fq_name": [domain, project, left_interface_uuids[i]], "interfaceType": "left", "uuid": left_interface_uuids[i]}, {"fq_name": [domain, project, right_interface_uuids[i]], "interfaceType": "right", "uuid": right_interface_uuids[i]}]
@@ -192,7 +209,7 @@ def run_module():
       js["service-instance"]["port_tuples"]=tmp_port_tuples
 
     if update:
-      response = requests.get (config_api_url + 'service-instance/' + uuid, headers=vnc_api_headers)
+      response = transport.get(config_api_url + 'service-instance/' + uuid, headers=vnc_api_headers)
       if not response.status_code == 200:
         failed = True
         result["message"] = response.text
@@ -206,7 +223,7 @@ def run_module():
 
         # get vmi uuids
         port_tuple_uuid = port_tuples[i].get("uuid")
-        response = requests.get (config_api_url + 'port-tuple/' + port_tuple_uuid, headers=vnc_api_headers)
+        response = transport.get(config_api_url + 'port-tuple/' + port_tuple_uuid, headers=vnc_api_headers)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -215,7 +232,7 @@ def run_module():
         vmis = []
         for vmi_back_ref in vmi_back_refs:
           vmi_uuid = vmi_back_ref.get("uuid")
-          response = requests.get (config_api_url + 'virtual-machine-interface/' + vmi_uuid, headers=vnc_api_headers)
+          response = transport.get(config_api_url + 'virtual-machine-interface/' + vmi_uuid, headers=vnc_api_headers)
           if not response.status_code == 200:
             failed = True
             result["message"] = response.text
@@ -246,7 +263,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'service_instance')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: tf_batch
+
+short_description: run many tasks of tungstenfabric modules in one python process
+
+version_added: "2.9"
+
+description:
+    - "runs sub-tasks of the resource modules (the ones which support items), in the order given, in the process of the ansible controller node (action plugin)"
+    - "keystone token, webui session, object cache and fqname-to-id lookups are shared by all the sub-tasks, so module packaging, python start and login are done only once"
+    - "environment variables (such as OS_AUTH_URL, TF_OBJECT_CACHE) are read from the ansible controller node, not from the environment keyword of the task"
+    - "requires ansible-core 2.11 or later (other modules of this collection work with ansible 2.9)"
+
+options:
+    tasks:
+        description:
+            - list of sub-tasks. each sub-task is a dict of one module name (such as virtual_network, or tungstenfabric.networking.virtual_network) and its args. items and src of the module can be used in the args
+        required: true
+    controller_ip:
+        description:
+            - tungstenfabric controller ip, used by all the sub-tasks. for a cluster, a list (or comma separated string) of controller nodes can be given
+        required: true
+    username:
+        description:
+            - username of webui, used by all the sub-tasks (Default: admin)
+        required: false
+    password:
+        description:
+            - password of webui, used by all the sub-tasks (Default: contrail123)
+        required: false
+    stop_on_error:
+        description:
+            - when it is set to true, sub-tasks after a failed one are not run, and reported as skipped (Default: true)
+        required: false
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+- name: tenant network setup
+  tungstenfabric.networking.tf_batch:
+    controller_ip: x.x.x.x
+    tasks:
+      - virtual_network:
+          name: vn1
+          project: admin
+          subnet: 10.0.1.0
+          subnet_prefix: 24
+      - virtual_network:
+          name: vn2
+          project: admin
+          subnet: 10.0.2.0
+          subnet_prefix: 24
+      - network_policy:
+          name: vn1-to-vn2
+          project: admin
+          policy_rule:
+            - src_addresses:
+                - virtual_network: default-domain:admin:vn1
+              dst_addresses:
+                - virtual_network: default-domain:admin:vn2
+              protocol: any
+              action_list:
+                simple_action: pass
+  register: batch
+'''
+
+RETURN = '''
+results:
+    description: result of each sub-task, with index, module, changed, failed, msg, elapsed (seconds), and the values returned by the module
+    type: list
+    returned: always
+summary:
+    description: number of total / changed / failed / skipped sub-tasks
+    type: dict
+    returned: always
+'''
@@ -25,10 +25,6 @@ options:
         description:
             - virtual-network name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     subnet:
         description:
             - virtual-network subnet
@@ -134,6 +130,10 @@ options:
             - provider network segmentation id which this VN is associated to
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -190,71 +190,88 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
+uuid:
+    description: uuid of the created / updated / deleted object
+    type: str
+    returned: when the object is written
+operation:
+    description: create, update or delete
+    type: str
+    returned: when the object is written
 '''
 
-import sys
-import uuid as uuid_module
 import json
-import requests
+import uuid as module_uuid
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, fqname_to_id, run_with_profile
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    global_object=dict(type='bool', required=False),
+    uuid=dict(type='str', required=False),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='default-project'),
+    subnet=dict(type='str', required=False),
+    subnet_prefix=dict(type='int', required=False),
+    addr_from_start=dict(type='bool', required=False, default=False),
+    default_gateway=dict(type='str', required=False),
+    dns_server_address=dict(type='str', required=False),
+    enable_dhcp=dict(type='bool', required=False),
+    dns_nameservers=dict(type='list', required=False),
+    flood_unknown_unicast=dict(type='bool', required=False),
+    ip_fabric_forwarding=dict(type='bool', required=False),
+    fabric_snat=dict(type='bool', required=False),
+    display_name=dict(type='str', required=False),
+    igmp_enable=dict(type='bool', required=False),
+    mac_learning_enabled=dict(type='bool', required=False),
+    port_security_enabled=dict(type='bool', required=False),
+    allow_transit=dict(type='bool', required=False),
+    forwarding_mode=dict(type='str', required=False, choices=['default', 'l2_l3', 'l3', 'l2']),
+    max_flows=dict(type='int', required=False),
+    rpf=dict(type='str', required=False, choices=['enable', 'disable']),
+    vxlan_network_identifier=dict(type='int', required=False),
+    route_target_list=dict(type='list', required=False),
+    import_route_target_list=dict(type='list', required=False),
+    export_route_target_list=dict(type='list', required=False),
+    virtual_network_category=dict(type='str', required=False, choices=['routed']),
+    network_policy_refs=dict(type='list', required=False),
+    provider_network=dict(type='bool', required=False, default=False),
+    provider_network_physical_network=dict(type='str', required=False),
+    provider_network_segmentation_id=dict(type='int', required=False),
+    tag_refs=dict(type='list', required=False)
+)
+
+required_if_args = [
+  ["global_object", True, ["domain", "project", "name", "route_target_list", "vxlan_network_identifier"]],
+  ["provider_network", True, ["provider_network_physical_network", "provider_network_segmentation_id"]]
+]
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        global_object=dict(type='bool', required=False),
-        uuid=dict(type='str', required=False),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='default-project'),
-        subnet=dict(type='str', required=False),
-        subnet_prefix=dict(type='int', required=False),
-        addr_from_start=dict(type='bool', required=False, default=False),
-        default_gateway=dict(type='str', required=False),
-        dns_server_address=dict(type='str', required=False),
-        enable_dhcp=dict(type='bool', required=False),
-        dns_nameservers=dict(type='list', required=False),
-        flood_unknown_unicast=dict(type='bool', required=False),
-        ip_fabric_forwarding=dict(type='bool', required=False),
-        fabric_snat=dict(type='bool', required=False),
-        display_name=dict(type='str', required=False),
-        igmp_enable=dict(type='bool', required=False),
-        mac_learning_enabled=dict(type='bool', required=False),
-        port_security_enabled=dict(type='bool', required=False),
-        allow_transit=dict(type='bool', required=False),
-        forwarding_mode=dict(type='str', required=False, choices=['default', 'l2_l3', 'l3', 'l2']),
-        max_flows=dict(type='int', required=False),
-        rpf=dict(type='str', required=False, choices=['enable', 'disable']),
-        vxlan_network_identifier=dict(type='int', required=False),
-        route_target_list=dict(type='list', required=False),
-        import_route_target_list=dict(type='list', required=False),
-        export_route_target_list=dict(type='list', required=False),
-        virtual_network_category=dict(type='str', required=False, choices=['routed']),
-        network_policy_refs=dict(type='list', required=False),
-        provider_network=dict(type='bool', required=False, default=False),
-        provider_network_physical_network=dict(type='str', required=False),
-        provider_network_segmentation_id=dict(type='int', required=False),
-        tag_refs=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args, required_if=required_if_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    required_if_args = [
-      ["global_object", True, ["domain", "project", "name", "route_target_list", "vxlan_network_identifier"]],
-      ["provider_network", True, ["provider_network_physical_network", "provider_network_segmentation_id"]]
-    ]
-
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-        required_if=required_if_args
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -290,8 +307,6 @@ def run_module():
         module.exit_json(**result)
 
     ## begin: virtual-network
-    config_api_url = 'http://' + controller_ip + ':8082/'
-
     obj_type='virtual-network'
 
     (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
@@ -324,7 +339,7 @@ def run_module():
             }
           }
         ]
-        subnet_uuid=str(uuid_module.uuid4())
+        subnet_uuid=str(module_uuid.uuid4())
         js ["virtual-network"]["network_ipam_refs"][0]["attr"]["ipam_subnets"][0]["subnet_uuid"]=subnet_uuid
         js ["virtual-network"]["network_ipam_refs"][0]["attr"]["ipam_subnets"][0]["subnet_name"]=subnet_uuid
 
@@ -352,10 +367,7 @@ def run_module():
       # ["default-domain:admin:network-policy1"], []]
       network_policy_refs_list=[]
       for np_fqname in network_policy_refs:
-        response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": "network-policy", "fq_name": np_fqname.split(":")}), headers=vnc_api_headers)
-        if not response.status_code == 200:
-          module.fail_json(msg="network-policy specified doesn't exist", **result)
-        np_uuid = json.loads(response.text).get("uuid")
+        np_uuid = fqname_to_id (module, np_fqname, 'network-policy', controller_ip)
         network_policy_refs_list.append ({"to": np_fqname.split(":"), "uuid": np_uuid, "attr": {"sequence": {"major": 0, "minor": 0}}})
       js ["virtual-network"]["network_policy_refs"]=network_policy_refs_list
     if provider_network:
@@ -403,7 +415,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'virtual_network')
 
 if __name__ == '__main__':
     main()
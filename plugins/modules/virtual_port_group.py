@@ -25,10 +25,6 @@ options:
         description:
             - virtual-port-group name
         required: true
-    controller_ip:
-        description:
-            - tungstenfabric controller ip
-        required: true
     domain:
         description:
             - domain for this vpg
@@ -50,6 +46,10 @@ options:
             - share this virtual-port-group to specified tenant with specified permission
         required: false
 
+extends_documentation_fragment:
+    - tungstenfabric.networking.controller
+    - tungstenfabric.networking.bulk
+
 author:
     - Tatsuya Naganawa (@tnaganawa)
 '''
@@ -81,39 +81,50 @@ message:
     description: The output message that this module generates
     type: str
     returned: always
+items:
+    description: per-item result (index, name, changed, failed, msg), when items or src is given
+    type: list
+    returned: when items or src is given, and dest is not given
+summary:
+    description: number of total / changed / failed items, when items or src is given
+    type: dict
+    returned: when items or src is given
 '''
 
 
 
-import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, fqname_to_id, update_object, vnc_api_headers, run_with_profile, transport
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import object_cache
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import bulk_argument_spec, run_items
+
+module_args = dict(
+    name=dict(type='str', required=True),
+    controller_ip=dict(type='list', elements='str', required=True),
+    username=dict(type='str', required=False, default='admin'),
+    password=dict(type='str', required=False, default='contrail123'),
+    state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
+    domain=dict(type='str', required=False, default='default-domain'),
+    project=dict(type='str', required=False, default='admin'),
+    fabric=dict(type='str', required=True),
+    physical_interfaces=dict(type='list', required=False),
+    share=dict(type='list', required=False)
+)
 
 def run_module():
-    module_args = dict(
-        name=dict(type='str', required=True),
-        controller_ip=dict(type='str', required=True),
-        username=dict(type='str', required=False, default='admin'),
-        password=dict(type='str', required=False, default='contrail123'),
-        state=dict(type='str', required=False, default='present', choices=['absent', 'present']),
-        domain=dict(type='str', required=False, default='default-domain'),
-        project=dict(type='str', required=False, default='admin'),
-        fabric=dict(type='str', required=True),
-        physical_interfaces=dict(type='list', required=False),
-        share=dict(type='list', required=False)
+    module = AnsibleModule(
+        argument_spec=bulk_argument_spec(module_args),
+        supports_check_mode=True
     )
+    run_items(module, run_item, module_args)
+
+def run_item(module):
     result = dict(
         changed=False,
         message=''
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
-
     name = module.params.get("name")
     controller_ip = module.params.get("controller_ip")
     username = module.params.get("username")
@@ -144,34 +155,30 @@ def run_module():
         for device, physical_interface in physical_interfaces:
 
           # get uuid of physical-interface
-          response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "physical_interface", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (device, physical_interface), headers=vnc_api_headers)
-          if not response.status_code == 200:
-            failed = True
-            result["message"] = response.text
-            module.fail_json(msg="physical-interface doesn't exist", **result)
-          pi_uuid = json.loads(response.text).get("uuid")
+          pi_uuid = fqname_to_id (module, ["default-global-system-config", device, physical_interface], 'physical_interface', controller_ip)
 
           physical_interface_refs.append({"uuid": pi_uuid, "to": ["default-global-config", device, physical_interface], "attr": None})
 
     if update:
       if state == 'present':
-        # add physical-interfaces
-        js["virtual-port-group"]["physical_interface_refs"]=physical_interface_refs
-
-        if not share == None:
-          tmp_share_list=[]
-          for tenant_name, tenant_permission in share:
-            response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "project", "fq_name": ["%s", "%s"]}' % (domain, tenant_name), headers=vnc_api_headers)
-            if not response.status_code == 200:
-              failed = True
-              result["message"] = response.text
-              module.fail_json(msg="uuid of specified shared project cannot be obtained", **result)
-            project_uuid = json.loads(response.text).get("uuid")
-            tmp_share_list.append({"tenant": project_uuid, "tenant_access": tenant_permission})
-          js["virtual-port-group"]["perms2"]["share"]=tmp_share_list
-
-
-        response = requests.put(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        def modify(js):
+          # add physical-interfaces
+          js["virtual-port-group"]["physical_interface_refs"]=physical_interface_refs
+
+          if not share == None:
+            tmp_share_list=[]
+            for tenant_name, tenant_permission in share:
+              project_uuid = fqname_to_id (module, [domain, tenant_name], 'project', controller_ip)
+              tmp_share_list.append({"tenant": project_uuid, "tenant_access": tenant_permission})
+            js["virtual-port-group"]["perms2"]["share"]=tmp_share_list
+          return js
+
+        def write(js):
+          response = transport.put(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+          object_cache.evict(uuid)
+          return response
+
+        response = update_object(module, web_api, controller_ip, obj_type, uuid, js, modify, write)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -180,7 +187,8 @@ def run_module():
 
       elif state == 'absent':
         # delete virtual-port-group
-        response = requests.delete(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        response = transport.delete(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        object_cache.evict(uuid)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -197,7 +205,7 @@ def run_module():
         }
         ''' % (fabric, name)
         )
-        response = requests.post(config_api_url + 'virtual-port-groups', data=json.dumps(js), headers=vnc_api_headers)
+        response = transport.post(config_api_url + 'virtual-port-groups', data=json.dumps(js), headers=vnc_api_headers)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -208,7 +216,8 @@ def run_module():
 
         js["virtual-port-group"]["physical_interface_refs"]=physical_interface_refs
 
-        response = requests.put(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        response = transport.put(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        object_cache.evict(uuid)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
@@ -227,7 +236,7 @@ def run_module():
     module.exit_json(**result)
 
 def main():
-    run_module()
+    run_with_profile(run_module, 'virtual_port_group')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,122 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# module_utils used by plugins which run on the ansible controller node (inventory, lookup)
+#
+# module = PluginModule({"controller_ip": ["x.x.x.x"]})
+# controller_ip = connect(module)
+# for obj in list_objects(module, controller_ip, 'physical-router', ...): ...
+# uuids = resolve_uuids(module, controller_ip, 'virtual-network', ['default-domain:admin:vn1', ...], memo=UuidMemo(ttl))
+##
+
+import os
+import json
+import time
+from multiprocessing.pool import ThreadPool
+from ansible.errors import AnsibleError
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import keystone_login, set_controller_nodes, fqname_to_id, list_objects
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.governor import FileLock, state_dir
+
+
+class PluginModule(object):
+  ##
+  # stands in for AnsibleModule: fail_json raises AnsibleError
+  ##
+  check_mode = False
+
+  def __init__(self, params):
+    self.params = dict(params)
+
+  def fail_json(self, msg=None, **kwargs):
+    raise AnsibleError(msg)
+
+
+def connect(module):
+  ## controller nodes and keystone token, as a module does at its start
+  set_controller_nodes(module)
+  controller_ip = module.params.get("controller_ip")
+  keystone_login(module, controller_ip)
+  return controller_ip
+
+
+class UuidMemo(object):
+  ##
+  # fq_name -> uuid results of lookups, shared by the tasks and forks (and plays) through <TF_GOVERNOR_DIR>/lookup-memo.json
+  # entries older than ttl seconds are not used. since an object can be deleted and created again with another uuid,
+  # resolve_uuids checks memoized uuids with the controller before they are used
+  ##
+  def __init__(self, ttl):
+    self.ttl = ttl
+    self.path = os.path.join(state_dir(), 'lookup-memo.json')
+    self.memo = {}
+    if self.ttl > 0:
+      try:
+        with open(self.path) as f:
+          self.memo = json.load(f)
+      except (IOError, OSError, ValueError):
+        pass
+
+  def get(self, key):
+    entry = self.memo.get(key)
+    if entry and time.time() - entry[1] < self.ttl:
+      return entry[0]
+    return None
+
+  def update(self, uuids):
+    ## uuids: {key: uuid}, merged into the file under its lock
+    if self.ttl <= 0 or not uuids:
+      return
+    now = time.time()
+    with FileLock(self.path + '.lock'):
+      try:
+        with open(self.path) as f:
+          memo = json.load(f)
+      except (IOError, OSError, ValueError):
+        memo = {}
+      memo = dict((k, v) for k, v in memo.items() if now - v[1] < self.ttl)
+      for k, v in uuids.items():
+        memo[k] = [v, now]
+      tmp_path = self.path + '.tmp'
+      with open(tmp_path, 'w') as f:
+        f.write(json.dumps(memo))
+      os.rename(tmp_path, self.path)
+    self.memo = memo
+
+
+def fq_name_list(term):
+  ## 'default-domain:admin:vn1' or [default-domain, admin, vn1]
+  if isinstance(term, (list, tuple)):
+    return [str(name) for name in term]
+  return str(term).split(':')
+
+
+def resolve_uuids(module, controller_ip, obj_type, terms, workers=8, memo=None):
+  ##
+  # uuids of fq_names, in the order of terms
+  # memoized uuids are used only when the objects still have those fq_names, which is checked by list api (200 uuids per request)
+  # fq_names not in memo (or whose objects are changed) are resolved by fqname-to-id concurrently, by workers threads
+  ##
+  fq_names = [fq_name_list(term) for term in terms]
+  keys = ['{}|{}|{}'.format(controller_ip, obj_type, ':'.join(fq_name)) for fq_name in fq_names]
+  uuids = dict((key, memo.get(key)) for key in keys) if memo else {}
+  memoized = sorted(set(uuid for uuid in uuids.values() if uuid))
+  current = {}
+  for i in range(0, len(memoized), 200):
+    for obj in list_objects(module, controller_ip, obj_type, query={"obj_uuids": ','.join(memoized[i:i + 200])}, page_limit=200):
+      current[obj.get("uuid")] = obj.get("fq_name")
+  for key, fq_name in zip(keys, fq_names):
+    if uuids.get(key) and not current.get(uuids[key]) == fq_name:
+      uuids[key] = None
+  missing = [(key, fq_name) for key, fq_name in zip(keys, fq_names) if not uuids.get(key)]
+  if missing:
+    pool = ThreadPool(max(1, min(workers, len(missing))))
+    try:
+      resolved = pool.map(lambda args: (args[0], fqname_to_id(module, args[1], obj_type, controller_ip)), missing)
+    finally:
+      pool.close()
+      pool.join()
+    uuids.update(resolved)
+    if memo:
+      memo.update(dict(resolved))
+  return [uuids[key] for key in keys]
@@ -0,0 +1,8 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+## sub-tasks of tf_batch are replayed from the cassettes of the modules
+from ansible_collections.tungstenfabric.networking.tests.unit.plugins.modules.conftest import replay
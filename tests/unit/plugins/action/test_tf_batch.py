@@ -0,0 +1,73 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from unittest import mock
+
+from ansible.playbook.play_context import PlayContext
+from ansible_collections.tungstenfabric.networking.plugins.action.tf_batch import ActionModule, load_module
+
+
+class UnsafeText(str):
+  ## args of sub-tasks are str subclasses, as ansible's templated text
+  pass
+
+
+def run_batch(args, check_mode=False):
+  task = mock.MagicMock(args=args, async_val=0, check_mode=check_mode)
+  play_context = PlayContext()
+  play_context.check_mode = check_mode
+  action = ActionModule(task, mock.MagicMock(), play_context, loader=None, templar=None, shared_loader_obj=None)
+  return action.run(task_vars={})
+
+
+def test_load_module():
+  assert load_module('virtual_network').__name__.endswith('.virtual_network')
+  assert load_module('tungstenfabric.networking.virtual_network') is load_module('virtual_network')
+  ## modules without run_item, and names which are not module names
+  assert load_module('config_snapshot') is None
+  assert load_module('../virtual_network') is None
+
+
+def test_create_and_delete_in_one_batch(replay):
+  ## the delete reads the uuid of the network created by the former sub-task, not the cached fqname-to-id result
+  cassette = replay('tf_batch_create_delete.jsonl')
+  result = run_batch({"controller_ip": "10.0.0.1", "tasks": [
+    {"virtual_network": {"name": UnsafeText("batch1"), "project": UnsafeText("admin")}},
+    {"tungstenfabric.networking.virtual_network": {"name": "batch1", "project": "admin", "state": "absent"}}
+  ]})
+  assert result["summary"] == {"total": 2, "changed": 2, "failed": 0, "skipped": 0}
+  assert [(r["module"], r["operation"]) for r in result["results"]] == [('virtual_network', 'create'), ('tungstenfabric.networking.virtual_network', 'delete')]
+  assert result["results"][0]["uuid"] == result["results"][1]["uuid"]
+  ## one webui login for the batch
+  assert [endpoint for (method, endpoint, data) in cassette.requests].count(':8143/authenticate') == 1
+
+
+def test_failed_subtask_stops_batch(replay):
+  cassette = replay('tf_batch_create_delete.jsonl')
+  result = run_batch({"controller_ip": "10.0.0.1", "tasks": [
+    {"virtual_network": {"name": "batch1", "project": "admin", "unknown_option": 1}},
+    {"config_snapshot": {"dest": "/tmp/x"}},
+    {"virtual_network": {"name": "batch1", "project": "admin", "state": "absent"}}
+  ]})
+  assert result["failed"] and result["msg"] == '1 of 3 tasks failed'
+  assert 'unknown_option' in result["results"][0]["msg"]
+  assert [r.get("skipped", False) for r in result["results"]] == [False, True, True]
+  assert cassette.requests == []
+
+
+def test_continue_on_error(replay):
+  replay('tf_batch_create_delete.jsonl')
+  result = run_batch({"controller_ip": "10.0.0.1", "stop_on_error": False, "tasks": [
+    {"config_snapshot": {"dest": "/tmp/x"}},
+    {"virtual_network": {"name": "batch1", "project": "admin"}, "tag": {}}
+  ]})
+  assert result["summary"] == {"total": 2, "changed": 0, "failed": 2, "skipped": 0}
+  assert 'cannot be run by tf_batch' in result["results"][0]["msg"]
+  assert 'one module name' in result["results"][1]["msg"]
+
+
+def test_controller_ip_is_required():
+  assert run_batch({"tasks": []})["msg"] == 'controller_ip is required'
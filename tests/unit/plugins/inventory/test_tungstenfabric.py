@@ -0,0 +1,81 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+from ansible_collections.tungstenfabric.networking.plugins.inventory import tungstenfabric
+from ansible_collections.tungstenfabric.networking.plugins.inventory.tungstenfabric import InventoryModule, group_name, host_name
+
+try:
+  ## options read from the inventory source are trusted templates
+  from ansible.template import trust_as_template
+except ImportError:
+  trust_as_template = str
+
+objects = {
+  'physical-router': [
+    {"uuid": "pr1", "fq_name": ["default-global-system-config", "leaf1"], "physical_router_management_ip": "192.168.0.11", "physical_router_vendor_name": "juniper",
+     "fabric_refs": [{"to": ["default-global-system-config", "fab1"]}], "physical_role_refs": [{"to": ["default-global-system-config", "leaf"]}],
+     "overlay_role_refs": [{"to": ["default-global-system-config", "crb-access"]}], "tag_refs": [{"to": ["site=tokyo"]}]}
+  ],
+  'virtual-router': [
+    {"uuid": "vr1", "fq_name": ["default-global-system-config", "compute1"], "virtual_router_ip": "192.168.0.21"},
+    {"uuid": "vr2", "fq_name": ["default-global-system-config", "leaf1"], "virtual_router_ip": "192.168.0.22"}
+  ],
+  'node': []
+}
+
+
+def test_group_name():
+  assert group_name('tag', 'site', 'tokyo-1') == 'tag_site_tokyo_1'
+
+
+def test_host_name_is_unique():
+  names = set()
+  assert host_name({"uuid": "u1", "fq_name": ["a", "node1"]}, 'physical_router', names) == 'node1'
+  assert host_name({"uuid": "u2", "fq_name": ["a", "node1"]}, 'virtual_router', names) == 'virtual_router_node1'
+  assert host_name({"uuid": "u3", "fq_name": ["a", "node1"]}, 'virtual_router', names) == 'node1_u3'
+
+
+@pytest.fixture
+def plugin(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  monkeypatch.delenv('OS_AUTH_URL', raising=False)
+  queries = []
+  def list_objects(module, controller_ip, obj_type, query=None, page_limit=1000):
+    queries.append((obj_type, query["fields"]))
+    return iter(objects[obj_type])
+  monkeypatch.setattr(tungstenfabric, 'list_objects', list_objects)
+  plugin = InventoryModule()
+  options = {"controller_ip": ["10.0.0.1"], "obj_types": ['physical-router', 'virtual-router', 'node'], "page_limit": 1000,
+             "strict": False, "compose": {}, "groups": {}, "keyed_groups": [{"key": trust_as_template('tf_vendor'), "prefix": "vendor"}]}
+  monkeypatch.setattr(plugin, 'get_option', lambda name: options[name])
+  plugin.inventory = InventoryData()
+  plugin.templar = Templar(loader=DataLoader())
+  plugin.queries = queries
+  return plugin
+
+
+def test_read_hosts(plugin):
+  hosts = plugin.read_hosts()
+  assert [host["name"] for host in hosts] == ['leaf1', 'compute1', 'virtual_router_leaf1']
+  assert sorted(hosts[0]["groups"]) == ['fabric_fab1', 'physical_role_leaf', 'physical_router', 'rb_role_crb_access', 'tag_site_tokyo']
+  assert hosts[0]["vars"]["ansible_host"] == '192.168.0.11'
+  assert hosts[0]["vars"]["tf_tags"] == ['site=tokyo']
+  ## one list per type, with field projection
+  assert [obj_type for (obj_type, fields) in plugin.queries] == ['physical-router', 'virtual-router', 'node']
+  assert 'virtual_router_ip' in plugin.queries[1][1].split(',')
+
+
+def test_populate(plugin):
+  plugin.populate(plugin.read_hosts())
+  inventory = plugin.inventory
+  assert sorted(h.name for h in inventory.groups['virtual_router'].get_hosts()) == ['compute1', 'virtual_router_leaf1']
+  assert [h.name for h in inventory.groups['vendor_juniper'].get_hosts()] == ['leaf1']
+  assert inventory.get_host('compute1').get_vars()["ansible_host"] == '192.168.0.21'
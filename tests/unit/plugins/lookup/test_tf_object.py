@@ -0,0 +1,47 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleError
+from ansible_collections.tungstenfabric.networking.plugins.lookup import tf_object
+from ansible_collections.tungstenfabric.networking.plugins.lookup.tf_object import LookupModule
+
+objects = {
+  "uuid-1": {"uuid": "uuid-1", "fq_name": ["default-domain", "admin", "vn1"], "virtual_network_network_id": 5},
+  "uuid-2": {"uuid": "uuid-2", "fq_name": ["default-domain", "admin", "vn2"], "virtual_network_network_id": 6}
+}
+
+
+@pytest.fixture
+def lookup(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  queries = []
+  def resolve_uuids(module, controller_ip, obj_type, terms, workers=8, memo=None):
+    return ['uuid-{}'.format(term[-1]) for term in terms]
+  def list_objects(module, controller_ip, obj_type, query=None, page_limit=1000):
+    queries.append(dict(query))
+    return iter([objects[uuid] for uuid in query["obj_uuids"].split(',') if uuid in objects])
+  monkeypatch.setattr(tf_object, 'connect', lambda module: module.params["controller_ip"])
+  monkeypatch.setattr(tf_object, 'resolve_uuids', resolve_uuids)
+  monkeypatch.setattr(tf_object, 'list_objects', list_objects)
+  lookup = LookupModule()
+  options = {"controller_ip": ["10.0.0.1"], "obj_type": 'virtual-network', "fields": ['virtual_network_network_id'], "workers": 8, "memo_ttl": 0}
+  monkeypatch.setattr(lookup, 'set_options', lambda var_options=None, direct=None: None)
+  monkeypatch.setattr(lookup, 'get_option', lambda name: options[name])
+  lookup.queries = queries
+  return lookup
+
+
+def test_objects_in_order_by_one_list(lookup):
+  objs = lookup.run(['default-domain:admin:vn2', 'default-domain:admin:vn1', 'default-domain:admin:vn2'])
+  assert [obj["uuid"] for obj in objs] == ['uuid-2', 'uuid-1', 'uuid-2']
+  assert lookup.queries == [{"detail": "true", "fields": 'virtual_network_network_id', "obj_uuids": 'uuid-1,uuid-2'}]
+
+
+def test_missing_object_fails(lookup):
+  with pytest.raises(AnsibleError, match="virtual-network uuid-3 doesn't exist"):
+    lookup.run(['default-domain:admin:vn3'])
@@ -0,0 +1,159 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import io
+import gzip
+import pytest
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import read_rows, item_key, run_one, Journal, ItemExit, ItemModule, item_params, check_required, bulk_argument_spec
+
+module_args = dict(
+  controller_ip=dict(type='str', required=True),
+  username=dict(type='str', required=False, default='admin'),
+  password=dict(type='str', required=False, default='contrail123'),
+  name=dict(type='str', required=True),
+  state=dict(type='str', required=False, default='present', choices=['absent', 'present'])
+)
+
+
+class FakeModule(object):
+  check_mode = False
+
+  def __init__(self, **params):
+    self.params = dict(controller_ip='127.0.0.1', username='admin', password='contrail123', name=None, state='present')
+    self.params.update(params)
+
+
+def test_bulk_argument_spec():
+  spec = bulk_argument_spec(module_args)
+  ## required per item, not for the task
+  assert not spec['name']['required'] and module_args['name']['required']
+  assert spec['controller_ip']['required']
+  assert spec['bulk_workers']['default'] == 8
+
+
+def test_item_params_checks_types_and_choices():
+  module = FakeModule(state='absent')
+  assert item_params(module, module_args, {"name": "vn1"}) == {"controller_ip": "127.0.0.1", "username": "admin", "password": "contrail123", "name": "vn1", "state": "absent"}
+  assert item_params(module, module_args, {"name": 1})["name"] == '1'
+  for item in [{"name": "vn1", "state": "deleted"}, {"name": "vn1", "controller_ip": "10.0.0.2"}, {"name": "vn1", "subnet": "10.0.0.0/24"}, "vn1"]:
+    with pytest.raises(ItemExit):
+      item_params(module, module_args, item)
+
+
+def test_check_required():
+  required_if = [['state', 'present', ['subnet']]]
+  assert check_required({"controller_ip": "x", "name": "vn1"}, module_args, None) is None
+  assert check_required({}, module_args, None) == "missing required arguments: controller_ip, name"
+  assert check_required({"controller_ip": "x", "name": "vn1", "state": "present"}, module_args, required_if) == "state is present but all of the following are missing: subnet"
+
+
+def test_item_module_ends_only_the_item():
+  module = ItemModule(FakeModule(), {"name": "vn1"})
+  with pytest.raises(ItemExit) as e:
+    module.fail_json(msg="failure message", message="config-api error")
+  assert e.value.failed and e.value.result == {"msg": "failure message", "message": "config-api error"}
+  with pytest.raises(ItemExit) as e:
+    module.exit_json(changed=True)
+  assert not e.value.failed
+  ## others are of the task's module
+  assert module.check_mode is False and module.params == {"name": "vn1"}
+
+
+def test_run_one_reports_exceptions():
+  def run_item(module):
+    raise ValueError("no json object could be decoded")
+  summary = run_one(FakeModule(), run_item, module_args, None, None, 3, {"name": "vn1"})
+  assert summary == {"index": 3, "name": "vn1", "changed": False, "failed": True, "msg": "ValueError: no json object could be decoded"}
+
+
+def write_text(path, text):
+  if str(path).endswith('.gz'):
+    with gzip.open(str(path), 'wb') as f:
+      f.write(text.encode('utf-8'))
+  else:
+    with io.open(str(path), 'w', encoding='utf-8') as f:
+      f.write(text)
+  return str(path)
+
+
+def test_read_rows_csv_drops_empty_cells(tmp_path):
+  src = write_text(tmp_path / 'items.csv', u'name,subnet,state\nvn1,10.0.1.0/24,\nvn2,,absent\n')
+  assert list(read_rows(src)) == [
+    {"name": "vn1", "subnet": "10.0.1.0/24"},
+    {"name": "vn2", "state": "absent"}
+  ]
+
+
+def test_read_rows_json_lines_skips_blank_lines(tmp_path):
+  src = write_text(tmp_path / 'items.jsonl', u'{"name": "vn1", "subnet": ["10.0.1.0/24"]}\n\n{"name": "vn2"}\n')
+  assert list(read_rows(src)) == [{"name": "vn1", "subnet": ["10.0.1.0/24"]}, {"name": "vn2"}]
+
+
+def test_read_rows_gzipped(tmp_path):
+  csv_src = write_text(tmp_path / 'items.csv.gz', u'name,state\nvn1,present\n')
+  jsonl_src = write_text(tmp_path / 'items.jsonl.gz', u'{"name": "vn1"}\n')
+  assert list(read_rows(csv_src)) == [{"name": "vn1", "state": "present"}]
+  assert list(read_rows(jsonl_src)) == [{"name": "vn1"}]
+
+
+def test_read_rows_is_lazy(tmp_path):
+  src = write_text(tmp_path / 'items.jsonl', u'{"name": "vn1"}\nnot json\n')
+  rows = read_rows(src)
+  assert next(rows) == {"name": "vn1"}
+
+
+def test_item_key_ignores_connection_args():
+  assert item_key({"name": "vn1", "controller_ip": "10.0.0.1", "password": "a"}) == item_key({"password": "b", "name": "vn1"})
+  assert not item_key({"name": "vn1"}) == item_key({"name": "vn2"})
+
+
+def test_journal_resume_skips_done_items(tmp_path):
+  path = str(tmp_path / 'journal')
+  calls = []
+  def run_item(module):
+    calls.append(module.params["name"])
+    module.exit_json(changed=True, uuid='uuid-' + module.params["name"], type='virtual-network', fq_name=['default-domain', 'admin', module.params["name"]], operation='create')
+
+  journal = Journal(path)
+  summaries = [run_one(FakeModule(), run_item, module_args, None, journal, i, {"name": name}) for i, name in enumerate(["vn1", "vn2"])]
+  journal.close()
+  assert [s["changed"] for s in summaries] == [True, True]
+
+  journal = Journal(path)
+  summaries = [run_one(FakeModule(), run_item, module_args, None, journal, i, {"name": name}) for i, name in enumerate(["vn1", "vn2", "vn3"])]
+  journal.close()
+  assert [s.get("skipped", False) for s in summaries] == [True, True, False]
+  assert calls == ["vn1", "vn2", "vn3"]
+
+
+def test_journal_failed_items_are_not_recorded(tmp_path):
+  path = str(tmp_path / 'journal')
+  def run_item(module):
+    module.fail_json(msg="config-api error")
+
+  journal = Journal(path)
+  summary = run_one(FakeModule(), run_item, module_args, None, journal, 0, {"name": "vn1"})
+  journal.close()
+  assert summary["failed"] and summary["msg"] == "config-api error"
+  journal = Journal(path)
+  assert journal.done_keys == set()
+  journal.close()
+
+
+def test_journal_created_and_rollback(tmp_path):
+  path = str(tmp_path / 'journal')
+  journal = Journal(path)
+  journal.record({"key": "a", "uuid": "uuid-a", "type": "tag", "operation": 'create'})
+  journal.record({"key": "b", "uuid": "uuid-b", "type": "tag", "operation": 'update'})
+  journal.record({"key": "c", "uuid": "uuid-c", "type": "tag", "operation": 'create'})
+  journal.record({"key": "c", "uuid": "uuid-c", "type": "tag", "operation": 'rollback'})
+  journal.close()
+
+  journal = Journal(path)
+  assert journal.done_keys == set(["a", "b"])
+  assert [entry["uuid"] for entry in journal.created()] == ["uuid-a"]
+  journal.close()
@@ -0,0 +1,211 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import json
+import time
+import pstats
+import pytest
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils import common
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import run_with_profile, cached_object, revalidate_cache, update_cache, update_object, deterministic_uuid, create_first_enabled
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import ObjectCache
+
+
+def wait_in_worker(i):
+  time.sleep(0.05)
+  return i
+
+
+def run_module():
+  ## as a bulk run: work in ThreadPool workers, and exit by SystemExit (exit_json)
+  from multiprocessing.pool import ThreadPool
+  pool = ThreadPool(2)
+  try:
+    pool.map(wait_in_worker, range(4))
+  finally:
+    pool.close()
+    pool.join()
+  raise SystemExit(0)
+
+
+def test_profile_is_not_taken_by_default(monkeypatch):
+  monkeypatch.delenv('TF_PROFILE_DIR', raising=False)
+  assert run_with_profile(lambda: 'result', 'virtual_network') == 'result'
+
+
+def test_cprofile_includes_worker_threads(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_PROFILE_DIR', str(tmp_path / 'profile'))
+  monkeypatch.delenv('TF_PROFILE_MODE', raising=False)
+  with pytest.raises(SystemExit):
+    run_with_profile(run_module, 'virtual_network')
+  (path,) = os.listdir(str(tmp_path / 'profile'))
+  assert path.startswith('virtual_network-') and path.endswith('.prof')
+  stats = pstats.Stats(str(tmp_path / 'profile' / path))
+  assert [func for func in stats.stats if func[2] == 'wait_in_worker']
+
+
+def test_sampler_includes_worker_threads(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_PROFILE_DIR', str(tmp_path))
+  monkeypatch.setenv('TF_PROFILE_MODE', 'sample')
+  monkeypatch.setenv('TF_PROFILE_INTERVAL', '0.002')
+  with pytest.raises(SystemExit):
+    run_with_profile(run_module, 'virtual_network')
+  (path,) = os.listdir(str(tmp_path))
+  assert path.endswith('.folded')
+  with open(str(tmp_path / path)) as f:
+    lines = f.read().splitlines()
+  ## "<thread name>;<frame>;...;<frame> <count>"
+  assert any('wait_in_worker' in line and not line.startswith('MainThread') for line in lines)
+  assert not any(line.startswith('tf-profile-sampler') for line in lines)
+  assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in lines)
+
+
+class Controller(object):
+  ## last_modified of objects on the controller, read by list api with field projection
+  def __init__(self, objects):
+    self.objects = objects
+    self.calls = []
+
+  def list_last_modified(self, controller_ip, obj_type, uuids):
+    self.calls.append((obj_type, sorted(uuids)))
+    return dict((uuid, self.objects[uuid]) for uuid in uuids if uuid in self.objects)
+
+
+def vn(uuid, modified):
+  return {"virtual-network": {"uuid": uuid, "fq_name": ["default-domain", "admin", uuid], "id_perms": {"last_modified": modified}}}
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+  monkeypatch.delenv('OS_AUTH_URL', raising=False)
+  cache = ObjectCache(str(tmp_path))
+  monkeypatch.setattr(common, 'object_cache', cache)
+  return cache
+
+
+def controller(monkeypatch, objects):
+  controller = Controller(objects)
+  monkeypatch.setattr(common, 'list_last_modified', controller.list_last_modified)
+  return controller
+
+
+def test_cached_object_is_revalidated_once(cache, monkeypatch):
+  ObjectCache(cache.path).put('virtual-network', 'vn1', vn('vn1', 't1'), last_modified='t1')
+  c = controller(monkeypatch, {'vn1': 't1'})
+  assert cached_object('virtual-network', 'vn1', '10.0.0.1') == vn('vn1', 't1')
+  assert cached_object('virtual-network', 'vn1', '10.0.0.1') == vn('vn1', 't1')
+  assert c.calls == [('virtual-network', ['vn1'])]
+
+
+def test_changed_object_is_evicted(cache, monkeypatch):
+  ObjectCache(cache.path).put('virtual-network', 'vn1', vn('vn1', 't1'), last_modified='t1')
+  ObjectCache(cache.path).put('virtual-network', 'vn2', vn('vn2', 't1'), last_modified='t1')
+  controller(monkeypatch, {'vn1': 't2'})
+  assert cached_object('virtual-network', 'vn1', '10.0.0.1') is None
+  ## deleted on the controller
+  assert cached_object('virtual-network', 'vn2', '10.0.0.1') is None
+  assert cache.entries() == []
+
+
+def test_revalidate_cache_by_type(cache, monkeypatch):
+  for uuid in ['vn1', 'vn2', 'vn3']:
+    ObjectCache(cache.path).put('virtual-network', uuid, vn(uuid, 't1'), last_modified='t1')
+  ObjectCache(cache.path).put('tag', 'tag1', {"tag": {"uuid": "tag1"}}, last_modified='t1')
+  c = controller(monkeypatch, {'vn1': 't1', 'vn2': 't2', 'tag1': 't1'})
+  revalidate_cache(None, '10.0.0.1')
+  assert sorted(c.calls) == [('tag', ['tag1']), ('virtual-network', ['vn1', 'vn2', 'vn3'])]
+  assert sorted(entry["uuid"] for entry in cache.entries()) == ['tag1', 'vn1']
+  ## items of the bulk run use them without another check
+  assert cached_object('virtual-network', 'vn1', '10.0.0.1') == vn('vn1', 't1')
+  assert len(c.calls) == 2
+
+
+def test_update_cache(cache):
+  update_cache('virtual-network', 'vn1', json.dumps([vn('vn1', 't2')]))
+  assert cache.get('virtual-network', 'vn1') == vn('vn1', 't2') and cache.is_validated('vn1')
+  ## a response without the whole object
+  update_cache('virtual-network', 'vn1', '{"virtual-network": {"uuid": "vn1"}}')
+  assert cache.get('virtual-network', 'vn1') is None
+
+
+class FailJson(Exception):
+  pass
+
+
+class FakeModule(object):
+  def fail_json(self, msg=None, **kwargs):
+    raise FailJson(msg)
+
+
+@pytest.fixture
+def concurrent(monkeypatch, tmp_path, cache):
+  ## vn1 is modified by others at every read, until changes runs out
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path / 'governor'))
+  monkeypatch.setattr(common.time, 'sleep', lambda seconds: None)
+  state = {"modified": 't1', "changes": 0, "reads": 0}
+  def list_last_modified(controller_ip, obj_type, uuids):
+    if state["changes"] > 0:
+      state["changes"] -= 1
+      state["modified"] = 't{}'.format(int(state["modified"][1:]) + 1)
+    return {'vn1': state["modified"]}
+  def read_object(web_api, controller_ip, obj_type, uuid):
+    state["reads"] += 1
+    return vn(uuid, state["modified"])
+  monkeypatch.setattr(common, 'list_last_modified', list_last_modified)
+  monkeypatch.setattr(common, 'read_object', read_object)
+  return state
+
+
+def modify(js):
+  js["virtual-network"]["display_name"] = 'vn1 by this task'
+  return js
+
+
+def test_update_object_writes_unchanged_object(concurrent):
+  written = []
+  assert update_object(FakeModule(), None, '10.0.0.1', 'virtual-network', 'vn1', vn('vn1', 't1'), modify, lambda js: written.append(js) or 'response') == 'response'
+  assert len(written) == 1 and concurrent["reads"] == 0
+
+
+def test_update_object_reapplies_change_to_modified_object(concurrent):
+  concurrent["changes"] = 2
+  written = []
+  update_object(FakeModule(), None, '10.0.0.1', 'virtual-network', 'vn1', vn('vn1', 't1'), modify, written.append)
+  ## the change is applied to the object read last
+  assert written == [modify(vn('vn1', 't3'))]
+  assert concurrent["reads"] == 2
+
+
+def test_update_object_retries_are_exhausted(concurrent):
+  concurrent["changes"] = 100
+  written = []
+  with pytest.raises(FailJson, match='modified concurrently'):
+    update_object(FakeModule(), None, '10.0.0.1', 'virtual-network', 'vn1', vn('vn1', 't1'), modify, written.append, retries=3)
+  assert written == [] and concurrent["reads"] == 4
+
+
+def test_deterministic_uuid():
+  uuid = deterministic_uuid('virtual-network', ["default-domain", "admin", "vn1"])
+  assert uuid == deterministic_uuid('virtual-network', ["default-domain", "admin", "vn1"])
+  assert not uuid == deterministic_uuid('virtual-network', ["default-domain", "admin", "vn2"])
+  assert not uuid == deterministic_uuid('network-ipam', ["default-domain", "admin", "vn1"])
+
+
+class CreateFirstModule(object):
+  def __init__(self, create_first=True):
+    self.create_first = create_first
+
+
+def test_create_first_enabled(monkeypatch):
+  monkeypatch.delenv('TF_CREATE_FIRST', raising=False)
+  assert not create_first_enabled(CreateFirstModule(), 'virtual-network', 'present')
+  monkeypatch.setenv('TF_CREATE_FIRST', 'true')
+  assert create_first_enabled(CreateFirstModule(), 'virtual-network', 'present')
+  assert not create_first_enabled(CreateFirstModule(), 'virtual-network', 'absent')
+  assert not create_first_enabled(CreateFirstModule(), 'virtual-machine-interface', 'present')
+  ## run again with the lookup, after CreateConflict
+  assert not create_first_enabled(CreateFirstModule(create_first=False), 'virtual-network', 'present')
@@ -0,0 +1,92 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils import governor
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.governor import Governor, GovernorError, parse_limits, endpoint_class
+
+
+class FakeClock(object):
+  def __init__(self, now=1000.0):
+    self.now = now
+    self.sleeps = []
+
+  def time(self):
+    return self.now
+
+  def sleep(self, seconds):
+    self.sleeps.append(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  clock = FakeClock()
+  monkeypatch.setattr(governor, 'time', clock)
+  return clock
+
+
+def test_parse_limits():
+  assert parse_limits('read=50, write=10', 'TF_RATE_LIMIT') == {'read': 50.0, 'write': 10.0}
+  assert parse_limits('4', 'TF_MAX_INFLIGHT') == {'read': 4.0, 'write': 4.0, 'job': 4.0}
+  assert parse_limits(None, 'TF_RATE_LIMIT') == {}
+  with pytest.raises(GovernorError):
+    parse_limits('delete=1', 'TF_RATE_LIMIT')
+
+
+def test_endpoint_class():
+  assert endpoint_class('GET', 'http://10.0.0.1:8082/virtual-networks') == 'read'
+  assert endpoint_class('POST', 'http://10.0.0.1:8082/fqname-to-id') == 'read'
+  assert endpoint_class('POST', 'https://10.0.0.1:8143/api/tenants/config/get-config-objects') == 'read'
+  assert endpoint_class('POST', 'http://10.0.0.1:8082/execute-job') == 'job'
+  assert endpoint_class('POST', 'https://10.0.0.1:8143/api/tenants/config/create-config-object') == 'write'
+  assert endpoint_class('DELETE', 'http://10.0.0.1:8082/virtual-network/xxxx') == 'write'
+
+
+def test_token_bucket_burst_then_wait(clock):
+  g = Governor()
+  for i in range(2):
+    g.take_token('10.0.0.1', 'write', 2.0)
+  assert clock.sleeps == []
+  ## the bucket is empty: the third request reserves the next token, which is refilled in 1 / rate seconds
+  g.take_token('10.0.0.1', 'write', 2.0)
+  assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_token_bucket_refills_over_time(clock):
+  g = Governor()
+  for i in range(2):
+    g.take_token('10.0.0.1', 'write', 2.0)
+  clock.now += 1.0
+  for i in range(2):
+    g.take_token('10.0.0.1', 'write', 2.0)
+  assert clock.sleeps == []
+
+
+def test_token_bucket_is_per_host_and_class(clock):
+  g = Governor()
+  g.take_token('10.0.0.1', 'write', 1.0)
+  g.take_token('10.0.0.1', 'read', 1.0)
+  g.take_token('10.0.0.2', 'write', 1.0)
+  assert clock.sleeps == []
+  ## shared through the state file, so another Governor (another fork) sees the same bucket
+  Governor().take_token('10.0.0.1', 'write', 1.0)
+  assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_slots(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  g = Governor()
+  first = g.acquire_slot('10.0.0.1', 'write', 2)
+  second = g.acquire_slot('10.0.0.1', 'write', 2)
+  released = first.f.name
+  assert not released == second.f.name
+  first.release()
+  third = g.acquire_slot('10.0.0.1', 'write', 2)
+  assert third.f.name == released
+  second.release()
+  third.release()
@@ -0,0 +1,60 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.graph import ObjectGraph, graph_fields
+
+
+def project_graph():
+  ## project admin, vn1 / vn2 under it referring to ipam1, and vmi1 referring to vn1
+  graph = ObjectGraph()
+  graph.obj_types = ['network-ipam', 'project', 'virtual-machine-interface', 'virtual-network']
+  graph.add('project', {"uuid": "p", "fq_name": ["default-domain", "admin"], "parent_type": "domain", "parent_uuid": "d"})
+  for name in ['vn1', 'vn2']:
+    graph.add('virtual-network', {"uuid": name, "fq_name": ["default-domain", "admin", name], "parent_type": "project", "parent_uuid": "p",
+                                  "network_ipam_refs": [{"to": ["default-domain", "admin", "ipam1"], "uuid": "ipam1"}]})
+  graph.add('virtual-machine-interface', {"uuid": "vmi1", "fq_name": ["default-domain", "admin", "vmi1"], "parent_type": "project", "parent_uuid": "p",
+                                          "virtual_network_refs": [{"to": ["default-domain", "admin", "vn1"], "uuid": "vn1"}],
+                                          "virtual_machine_interface_back_refs": [{"to": ["x"], "uuid": "other"}]})
+  return graph.freeze()
+
+
+def test_direct_neighbors():
+  graph = project_graph()
+  assert sorted(graph.referenced_by('vn1')) == [('vmi1', 'ref')]
+  assert sorted(graph.references('vn1')) == [('ipam1', 'ref'), ('p', 'parent')]
+  assert sorted(graph.referenced_by('p')) == [('vmi1', 'child'), ('vn1', 'child'), ('vn2', 'child')]
+  ## back_refs are not edges, and objects not read are numbered from the refs to them
+  assert not 'other' in graph.ids
+  assert graph.node(graph.ids['ipam1']) == {"type": "network-ipam", "uuid": "ipam1", "fq_name": ["default-domain", "admin", "ipam1"]}
+  assert graph.node(graph.ids['d']) == {"type": "domain", "uuid": "d", "fq_name": ["default-domain"]}
+
+
+def test_closure():
+  graph = project_graph()
+  assert sorted(graph.closure('ipam1', 'referenced_by')) == [('vmi1', 2, 'ref', 'vn1'), ('vn1', 1, 'ref', 'ipam1'), ('vn2', 1, 'ref', 'ipam1')]
+  assert sorted(graph.closure('ipam1', 'referenced_by', max_depth=1)) == [('vn1', 1, 'ref', 'ipam1'), ('vn2', 1, 'ref', 'ipam1')]
+  ## each object once, at its shortest depth
+  assert sorted(graph.closure('vmi1', 'references')) == [('d', 2, 'parent', 'p'), ('ipam1', 2, 'ref', 'vn1'), ('p', 1, 'parent', 'vmi1'), ('vn1', 1, 'ref', 'vmi1')]
+
+
+def test_save_and_load(tmp_path):
+  path = str(tmp_path / 'graph.json.gz')
+  graph = project_graph()
+  graph.save(path)
+  loaded = ObjectGraph.load(path)
+  assert loaded.obj_types == graph.obj_types
+  assert loaded.uuids == graph.uuids
+  assert sorted(loaded.closure('ipam1', 'referenced_by')) == sorted(graph.closure('ipam1', 'referenced_by'))
+
+
+def test_index_without_obj_types(tmp_path):
+  path = tmp_path / 'graph.json'
+  path.write_text(u'{"uuids": [], "types": [], "node_types": [], "fq_names": [], "edges": []}')
+  assert ObjectGraph.load(str(path)).obj_types is False
+
+
+def test_graph_fields():
+  assert graph_fields(['virtual-network', 'network-ipam']) == 'fq_name,parent_type,parent_uuid,network_ipam_refs,virtual_network_refs'
@@ -0,0 +1,110 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+import pytest
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.nodes import Nodes
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.transport import Transport, Response, ConnectError
+
+
+@pytest.fixture(autouse=True)
+def governor_dir(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  for name in ['TF_CASSETTE', 'TF_RATE_LIMIT', 'TF_MAX_INFLIGHT']:
+    monkeypatch.delenv(name, raising=False)
+
+
+def nodes(*hosts):
+  n = Nodes()
+  n.set(hosts)
+  return n
+
+
+def test_writes_keep_controller_ip_order():
+  n = nodes('10.0.0.1', '10.0.0.2', '10.0.0.3')
+  n.health = {'10.0.0.1': {"latency": 0.5}, '10.0.0.2': {"latency": 0.1}}
+  assert n.candidates('write') == ['10.0.0.1', '10.0.0.2', '10.0.0.3']
+
+
+def test_reads_prefer_least_inflight_then_latency():
+  n = nodes('10.0.0.1', '10.0.0.2', '10.0.0.3')
+  n.health = {'10.0.0.1': {"latency": 0.5}, '10.0.0.2': {"latency": 0.1}, '10.0.0.3': {"latency": 0.2}}
+  assert n.candidates('read') == ['10.0.0.2', '10.0.0.3', '10.0.0.1']
+  n.start('10.0.0.2')
+  assert n.candidates('read') == ['10.0.0.3', '10.0.0.1', '10.0.0.2']
+
+
+def test_down_nodes_are_tried_last():
+  n = nodes('10.0.0.1', '10.0.0.2', '10.0.0.3')
+  n.health = {'10.0.0.1': {"down_until": time.time() + 20}, '10.0.0.2': {"down_until": time.time() + 10}}
+  ## 10.0.0.2 will be up sooner
+  assert n.candidates('write') == ['10.0.0.3', '10.0.0.2', '10.0.0.1']
+  n.start('10.0.0.1')
+  n.done('10.0.0.1', elapsed=0.1)
+  assert n.candidates('write') == ['10.0.0.1', '10.0.0.3', '10.0.0.2']
+
+
+def test_sticky_node_first_while_healthy():
+  n = nodes('10.0.0.1', '10.0.0.2')
+  assert n.candidates('write', sticky='10.0.0.2') == ['10.0.0.2', '10.0.0.1']
+  n.start('10.0.0.2')
+  n.done('10.0.0.2', error=True)
+  assert n.candidates('write', sticky='10.0.0.2') == ['10.0.0.1', '10.0.0.2']
+
+
+def test_health_is_shared_through_state_file():
+  n = nodes('10.0.0.1', '10.0.0.2')
+  n.start('10.0.0.1')
+  n.done('10.0.0.1', error=True)
+  assert nodes('10.0.0.1', '10.0.0.2').candidates('write') == ['10.0.0.2', '10.0.0.1']
+
+
+class FakeTransport(Transport):
+  ##
+  # request_node answers by host: an exception is raised, or a status code is returned
+  ##
+  def __init__(self, answers):
+    Transport.__init__(self)
+    self.answers = answers
+    self.sent = []
+
+  def request_node(self, method, url, session, data, headers, verify):
+    host = url.split('/')[2].split(':')[0]
+    self.sent.append(host)
+    answer = self.answers[host]
+    if isinstance(answer, Exception):
+      raise answer
+    return Response(answer, '{}')
+
+
+def test_write_fails_over_on_connect_error():
+  t = FakeTransport({'10.0.0.1': ConnectError('connection refused'), '10.0.0.2': 200})
+  t.nodes.set(['10.0.0.1', '10.0.0.2'])
+  assert t.post('http://10.0.0.1:8082/virtual-networks', data='{}').status_code == 200
+  assert t.sent == ['10.0.0.1', '10.0.0.2']
+
+
+def test_write_is_not_sent_again_after_other_errors():
+  t = FakeTransport({'10.0.0.1': IOError('read timed out'), '10.0.0.2': 200})
+  t.nodes.set(['10.0.0.1', '10.0.0.2'])
+  with pytest.raises(IOError):
+    t.post('http://10.0.0.1:8082/virtual-networks', data='{}')
+  assert t.sent == ['10.0.0.1']
+
+
+def test_read_fails_over_on_503_and_errors():
+  t = FakeTransport({'10.0.0.1': 503, '10.0.0.2': IOError('read timed out'), '10.0.0.3': 200})
+  t.nodes.set(['10.0.0.1', '10.0.0.2', '10.0.0.3'])
+  assert t.get('http://10.0.0.1:8082/virtual-networks').status_code == 200
+  assert t.sent == ['10.0.0.1', '10.0.0.2', '10.0.0.3']
+
+
+def test_last_error_is_raised_when_all_nodes_fail():
+  t = FakeTransport({'10.0.0.1': ConnectError('connection refused'), '10.0.0.2': ConnectError('no route to host')})
+  t.nodes.set(['10.0.0.1', '10.0.0.2'])
+  with pytest.raises(ConnectError, match='no route to host'):
+    t.post('http://10.0.0.1:8082/virtual-networks', data='{}')
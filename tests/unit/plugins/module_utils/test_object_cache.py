@@ -0,0 +1,63 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.object_cache import ObjectCache, last_modified
+
+
+def vn(uuid, modified='2020-10-10T10:10:10.000000'):
+  return {"virtual-network": {"uuid": uuid, "fq_name": ["default-domain", "admin", "vn1"], "id_perms": {"last_modified": modified}}}
+
+
+def test_put_and_get_copies(tmp_path):
+  cache = ObjectCache(str(tmp_path / 'cache'))
+  js = vn('uuid-1')
+  cache.put('virtual-network', 'uuid-1', js, last_modified=last_modified(js, 'virtual-network'))
+  js["virtual-network"]["display_name"] = 'changed after put'
+  cached = cache.get('virtual-network', 'uuid-1')
+  assert cached == vn('uuid-1')
+  cached["virtual-network"]["display_name"] = 'changed after get'
+  assert cache.get('virtual-network', 'uuid-1') == vn('uuid-1')
+  assert cache.get('network-ipam', 'uuid-1') is None
+  assert cache.is_validated('uuid-1')
+
+
+def test_shared_by_processes_through_files(tmp_path):
+  path = str(tmp_path / 'cache')
+  ObjectCache(path).put('virtual-network', 'uuid-1', vn('uuid-1'), last_modified='2020-10-10T10:10:10.000000')
+  ## another task (process) reads it from the file, and checks it with the controller before using it
+  cache = ObjectCache(path)
+  assert cache.get('virtual-network', 'uuid-1') == vn('uuid-1')
+  assert not cache.is_validated('uuid-1')
+  assert [entry["uuid"] for entry in cache.entries()] == ['uuid-1']
+
+
+def test_put_without_last_modified_is_not_validated(tmp_path):
+  cache = ObjectCache(str(tmp_path))
+  cache.put('virtual-network', 'uuid-1', vn('uuid-1'), last_modified='2020-10-10T10:10:10.000000')
+  cache.put('virtual-network', 'uuid-1', {"virtual-network": {"uuid": "uuid-1"}})
+  assert not cache.is_validated('uuid-1')
+
+
+def test_evict(tmp_path):
+  path = str(tmp_path / 'cache')
+  cache = ObjectCache(path)
+  cache.put('virtual-network', 'uuid-1', vn('uuid-1'), last_modified='2020-10-10T10:10:10.000000')
+  cache.evict('uuid-1')
+  assert cache.get('virtual-network', 'uuid-1') is None
+  assert ObjectCache(path).get('virtual-network', 'uuid-1') is None
+
+
+def test_disabled_without_path():
+  cache = ObjectCache(None)
+  cache.put('virtual-network', 'uuid-1', vn('uuid-1'), last_modified='2020-10-10T10:10:10.000000')
+  assert cache.get('virtual-network', 'uuid-1') is None
+  assert cache.entries() == []
+
+
+def test_last_modified():
+  assert last_modified(vn('uuid-1'), 'virtual-network') == '2020-10-10T10:10:10.000000'
+  assert last_modified({"virtual-network": {}}, 'virtual-network') is None
+  assert last_modified(None, 'virtual-network') is None
@@ -0,0 +1,72 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils import progress
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.progress import Progress, job_progress
+
+
+def read(path):
+  with open(str(path)) as f:
+    return json.load(f)
+
+
+def test_progress_file(tmp_path):
+  path = str(tmp_path / 'progress.json')
+  p = Progress(total=4, path=path, interval=3600)
+  p.add(changed=True)
+  ## the first record is written at once, and the following ones at most once per interval
+  assert read(path)["done"] == 1
+  p.add(failed=True)
+  assert read(path)["done"] == 1
+  p.close()
+  record = read(path)
+  assert (record["done"], record["total"], record["changed"], record["failed"], record["status"]) == (2, 4, 1, 1, 'finished')
+  assert record["eta"] >= 0
+
+
+def test_record_without_total(tmp_path):
+  p = Progress(path=str(tmp_path / 'progress.json'))
+  p.add()
+  record = p.record()
+  assert record["total"] is None and record["eta"] is None
+
+
+def test_async_job_file(tmp_path, monkeypatch):
+  path = tmp_path / '123456.789'
+  path.write_text(u'{"started": 1, "finished": 0, "ansible_job_id": "123456.789"}')
+  monkeypatch.setattr(progress, 'async_job_path', lambda: str(path))
+  p = Progress(total=2)
+  p.add(changed=True)
+  job = read(path)
+  assert job["ansible_job_id"] == '123456.789' and job["progress"]["done"] == 1
+
+  ## once async_wrapper wrote the result, it is not overwritten
+  path.write_text(u'{"finished": 1, "changed": true}')
+  p.close()
+  assert read(path) == {"finished": 1, "changed": True}
+
+
+def test_no_progress_without_path(monkeypatch):
+  monkeypatch.setattr(progress, 'async_job_path', lambda: None)
+  p = Progress(total=1)
+  p.add()
+  p.close()
+  assert p.path is None
+
+
+class FakeModule(object):
+  def __init__(self, bulk_item=False):
+    self.params = {"progress_file": None}
+    if bulk_item:
+      self.bulk_item = True
+
+
+def test_job_progress_is_not_reported_by_items(monkeypatch):
+  monkeypatch.setattr(progress, 'async_job_path', lambda: None)
+  assert job_progress(FakeModule(bulk_item=True)) is None
+  assert isinstance(job_progress(FakeModule()), Progress)
@@ -0,0 +1,104 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import SnapshotWriter, Spool, dependency_levels, file_sha256, object_hash, read_manifest, read_snapshot, restore_payload, type_graph
+
+
+def graph(parents, refs):
+  types = set(parents) | set(refs)
+  return (types, dict((t, set(parents.get(t, []))) for t in types), dict((t, set(refs.get(t, []))) for t in types))
+
+
+def test_levels_follow_parents_and_refs():
+  (types, parents, refs) = graph(
+    {'project': ['domain'], 'domain': [], 'virtual-network': ['project'], 'network-ipam': ['project'], 'virtual-machine-interface': ['project']},
+    {'virtual-network': ['network-ipam'], 'virtual-machine-interface': ['virtual-network']}
+  )
+  (levels, deferred) = dependency_levels(types, parents, refs)
+  assert levels == [['domain'], ['project'], ['network-ipam'], ['virtual-network'], ['virtual-machine-interface']]
+  assert deferred == {}
+
+
+def test_types_outside_of_snapshot_are_ignored():
+  (types, parents, refs) = graph({'virtual-network': ['project']}, {'virtual-network': ['network-ipam', 'virtual-network']})
+  types = set(['virtual-network'])
+  parents = {'virtual-network': set(['project'])}
+  (levels, deferred) = dependency_levels(types, parents, refs)
+  assert levels == [['virtual-network']]
+  ## refs to the same type are written after all the objects are created
+  assert deferred == {'virtual-network': set(['virtual-network'])}
+
+
+def test_ref_cycle_is_deferred():
+  (types, parents, refs) = graph(
+    {'project': [], 'service-instance': ['project'], 'port-tuple': ['service-instance'], 'virtual-machine-interface': ['project']},
+    {'virtual-machine-interface': ['port-tuple'], 'service-instance': ['virtual-machine-interface']}
+  )
+  (levels, deferred) = dependency_levels(types, parents, refs)
+  ## the refs in the cycle are written later, so the types are created in the order of their parents
+  assert levels == [['project'], ['service-instance', 'virtual-machine-interface'], ['port-tuple']]
+  assert deferred == {'service-instance': set(['virtual-machine-interface']), 'virtual-machine-interface': set(['port-tuple'])}
+
+
+def test_restore_payload():
+  obj = {
+    "uuid": "uuid-vn", "fq_name": ["default-domain", "admin", "vn1"], "parent_type": "project", "parent_uuid": "uuid-project", "href": "http://x",
+    "id_perms": {"last_modified": "2020-10-10T10:10:10.000000"}, "perms2": {},
+    "network_ipam_refs": [{"to": ["default-domain", "admin", "ipam1"], "uuid": "uuid-ipam", "href": "http://x", "attr": {"ipam_subnets": []}}],
+    "virtual_machine_interface_back_refs": [{"to": ["default-domain", "admin", "vmi1"], "uuid": "uuid-vmi", "href": "http://x"}],
+    "floating_ip_pools": [{"to": ["default-domain", "admin", "vn1", "pool1"], "uuid": "uuid-pool", "href": "http://x"}]
+  }
+  assert restore_payload(obj) == {
+    "uuid": "uuid-vn", "fq_name": ["default-domain", "admin", "vn1"], "parent_type": "project",
+    "network_ipam_refs": [{"to": ["default-domain", "admin", "ipam1"], "attr": {"ipam_subnets": []}}]
+  }
+
+
+def vn(name, **fields):
+  obj = {"uuid": "uuid-" + name, "fq_name": ["default-domain", "admin", name], "parent_type": "project", "parent_uuid": "uuid-project"}
+  obj.update(fields)
+  return obj
+
+
+def test_snapshot_roundtrip(tmp_path):
+  path = str(tmp_path / 'snapshot.jsonl.gz')
+  writer = SnapshotWriter(path, fields=['display_name'])
+  writer.write('virtual-network', vn('vn1'))
+  writer.write('project', {"uuid": "uuid-project", "fq_name": ["default-domain", "admin"]})
+  writer.write('virtual-network', vn('vn2'))
+  manifest = writer.close()
+  assert list(read_snapshot(path)) == [('virtual-network', vn('vn1')), ('project', {"uuid": "uuid-project", "fq_name": ["default-domain", "admin"]}), ('virtual-network', vn('vn2'))]
+  assert read_manifest(path) == manifest
+  assert (manifest["count"], manifest["types"]["virtual-network"]["count"], manifest["fields"]) == (3, 2, ['display_name'])
+  assert manifest["sha256"] == file_sha256(path)
+  assert read_manifest(str(tmp_path / 'other.jsonl')) is None
+
+
+def test_object_hash_ignores_read_only_fields_and_ref_order():
+  refs = [{"to": ["default-domain", "admin", "ipam1"], "uuid": "u1"}, {"to": ["default-domain", "admin", "ipam2"], "uuid": "u2"}]
+  obj = vn('vn1', network_ipam_refs=refs, id_perms={"last_modified": "t1"})
+  assert object_hash(obj) == object_hash(vn('vn1', network_ipam_refs=list(reversed(refs)), id_perms={"last_modified": "t2"}, href='http://x'))
+  assert not object_hash(obj) == object_hash(vn('vn1', network_ipam_refs=refs[:1]))
+
+
+def test_type_graph_with_spool(tmp_path):
+  path = str(tmp_path / 'snapshot.jsonl')
+  writer = SnapshotWriter(path)
+  writer.write('project', {"uuid": "uuid-project", "fq_name": ["default-domain", "admin"], "parent_type": "domain"})
+  writer.write('virtual-network', vn('vn1', network_ipam_refs=[{"to": ["default-domain", "admin", "ipam1"]}], virtual_machine_interface_back_refs=[{"to": ["x"]}]))
+  writer.write('network-ipam', {"uuid": "uuid-ipam1", "fq_name": ["default-domain", "admin", "ipam1"], "parent_type": "project"})
+  writer.close()
+  spool = Spool()
+  try:
+    (types, parents, refs) = type_graph(path, obj_types=['project', 'virtual-network'], spool=spool)
+    assert types == set(['project', 'virtual-network'])
+    assert parents == {'project': set(['domain']), 'virtual-network': set(['project'])}
+    assert refs == {'project': set(), 'virtual-network': set(['network-ipam'])}
+    ## the rows of a type are read back from the spool
+    assert [obj["fq_name"][-1] for (obj_type, obj) in spool.read('virtual-network')] == ['vn1']
+    assert list(spool.read('network-ipam')) == []
+  finally:
+    spool.close()
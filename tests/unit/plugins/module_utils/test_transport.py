@@ -0,0 +1,178 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sys
+import json
+import socket
+import threading
+import subprocess
+import pytest
+
+from ansible.module_utils.six.moves.BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from ansible.module_utils.six.moves.socketserver import ThreadingMixIn
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.transport import Transport, Cassette, Response, TransportError, ConnectError, endpoint, scrub
+
+
+def test_scrub_hides_secrets_in_nested_json():
+  data = json.dumps({"auth": {"identity": {"password": {"user": {"name": "admin", "password": "contrail123"}}}}, "token": "abc"})
+  js = json.loads(scrub(data))
+  assert js["token"] == '***'
+  assert js["auth"]["identity"]["password"] == '***'
+  assert scrub('not json') == 'not json'
+  assert scrub(None) is None
+
+
+def test_endpoint_drops_host():
+  assert endpoint('http://10.0.0.1:8082/virtual-networks?detail=true') == ':8082/virtual-networks?detail=true'
+  assert endpoint('https://10.0.0.2:8143/authenticate') == ':8143/authenticate'
+
+
+def record(cassette, method, url, data, status, text, cookies=None):
+  cassette.record(method, url, data, Response(status, text, {"Content-Type": "application/json", "X-Subject-Token": "token"}, cookies), 0.01)
+
+
+def test_record_scrubs_and_replay_serves_responses(tmp_path):
+  path = str(tmp_path / 'cassette.jsonl')
+  recorder = Cassette(path, 'record', 1.0)
+  record(recorder, 'POST', 'https://10.0.0.1:8143/authenticate', '{"username": "admin", "password": "contrail123"}', 200, '{}', {"_csrf": "secret"})
+  record(recorder, 'GET', 'http://10.0.0.1:8082/tags', None, 200, '{"tags": []}')
+  with open(path) as f:
+    text = f.read()
+  assert not 'contrail123' in text and not 'secret' in text and not '"token"' in text
+
+  ## the host is not recorded, so the cassette can be replayed for another controller_ip
+  player = Cassette(path, 'replay', 0)
+  response = player.replay('POST', 'https://10.0.0.9:8143/authenticate', '{"username": "admin", "password": "other"}')
+  assert response.status_code == 200 and response.cookies == {"_csrf": "***"}
+  assert player.replay('GET', 'http://10.0.0.9:8082/tags', None).json() == {"tags": []}
+  with pytest.raises(TransportError):
+    player.replay('GET', 'http://10.0.0.9:8082/tags', None)
+
+
+def test_replay_prefers_the_same_request_body(tmp_path):
+  path = str(tmp_path / 'cassette.jsonl')
+  recorder = Cassette(path, 'record', 1.0)
+  record(recorder, 'POST', 'http://10.0.0.1:8082/fqname-to-id', '{"type": "tag", "fq_name": ["db"]}', 200, '{"uuid": "uuid-db"}')
+  record(recorder, 'POST', 'http://10.0.0.1:8082/fqname-to-id', '{"type": "tag", "fq_name": ["app"]}', 200, '{"uuid": "uuid-app"}')
+  player = Cassette(path, 'replay', 0)
+  assert player.replay('POST', 'http://10.0.0.1:8082/fqname-to-id', '{"fq_name": ["app"], "type": "tag"}').json() == {"uuid": "uuid-app"}
+  assert player.replay('POST', 'http://10.0.0.1:8082/fqname-to-id', '{"fq_name": ["web"], "type": "tag"}').json() == {"uuid": "uuid-db"}
+
+
+def test_replay_run_continues_across_module_runs(tmp_path):
+  path = str(tmp_path / 'cassette.jsonl')
+  recorder = Cassette(path, 'record', 1.0)
+  record(recorder, 'GET', 'http://10.0.0.1:8082/tags', None, 200, '{"tags": []}')
+  record(recorder, 'GET', 'http://10.0.0.1:8082/tags', None, 200, '{"tags": [{"uuid": "uuid-db"}]}')
+  assert Cassette(path, 'replay', 0, run='play1').replay('GET', 'http://10.0.0.1:8082/tags', None).json() == {"tags": []}
+  assert Cassette(path, 'replay', 0, run='play1').replay('GET', 'http://10.0.0.1:8082/tags', None).json() == {"tags": [{"uuid": "uuid-db"}]}
+  ## without the run (or with another one), each module run replays from the top
+  assert Cassette(path, 'replay', 0).replay('GET', 'http://10.0.0.1:8082/tags', None).json() == {"tags": []}
+  assert Cassette(path, 'replay', 0, run='play2').replay('GET', 'http://10.0.0.1:8082/tags', None).json() == {"tags": []}
+
+
+def test_cassette_options_are_checked(tmp_path):
+  with pytest.raises(TransportError):
+    Cassette(str(tmp_path / 'cassette.jsonl'), 'rewind', 1.0)
+  with pytest.raises(TransportError):
+    Cassette(str(tmp_path / 'cassette.jsonl'), 'replay', 1.0, run='../x')
+
+
+class Handler(BaseHTTPRequestHandler):
+  ## keep-alive server: /authenticate sets a cookie, and other paths echo the request
+  protocol_version = 'HTTP/1.1'
+  connections = []
+
+  def setup(self):
+    BaseHTTPRequestHandler.setup(self)
+    Handler.connections.append(self.client_address)
+
+  def reply(self, body, headers=None):
+    body = body.encode('utf-8')
+    self.send_response(200)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    for k, v in (headers or {}).items():
+      self.send_header(k, v)
+    self.end_headers()
+    self.wfile.write(body)
+
+  def do_GET(self):
+    self.reply(json.dumps({"method": "GET", "path": self.path, "cookie": self.headers.get('Cookie')}))
+
+  def do_POST(self):
+    data = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+    if self.path == '/authenticate':
+      self.reply('{}', {"Set-Cookie": "_csrf=token1; Path=/; HttpOnly"})
+    else:
+      self.reply(json.dumps({"method": "POST", "path": self.path, "data": data}))
+
+  def log_message(self, *args):
+    pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+  daemon_threads = True
+
+
+@pytest.fixture
+def server():
+  Handler.connections = []
+  httpd = Server(('127.0.0.1', 0), Handler)
+  thread = threading.Thread(target=httpd.serve_forever)
+  thread.daemon = True
+  thread.start()
+  yield 'http://127.0.0.1:{}'.format(httpd.server_address[1])
+  httpd.shutdown()
+  httpd.server_close()
+
+
+@pytest.fixture
+def http_transport(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_TRANSPORT', 'http')
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  for name in ['TF_CASSETTE', 'TF_RATE_LIMIT', 'TF_MAX_INFLIGHT']:
+    monkeypatch.delenv(name, raising=False)
+  transport = Transport()
+  yield transport
+  for conn in getattr(transport.connections, 'pool', {}).values():
+    conn.close()
+
+
+def test_http_backend_keeps_connections_alive(server, http_transport):
+  for i in range(3):
+    response = http_transport.get(server + '/virtual-networks?detail=true')
+    assert response.json()["path"] == '/virtual-networks?detail=true'
+  assert http_transport.post(server + '/fqname-to-id', data=u'{"type": "tag"}').json()["data"] == '{"type": "tag"}'
+  assert len(Handler.connections) == 1
+
+
+def test_http_backend_session_cookies(server, http_transport):
+  session = http_transport.session()
+  assert http_transport.get(server + '/echo').json()["cookie"] is None
+  session.post(server + '/authenticate', data='{}')
+  assert session.cookies == {"_csrf": "token1"}
+  assert session.get(server + '/echo').json()["cookie"] == '_csrf=token1'
+
+
+def test_http_backend_connect_error(http_transport):
+  sock = socket.socket()
+  sock.bind(('127.0.0.1', 0))
+  port = sock.getsockname()[1]
+  sock.close()
+  with pytest.raises(ConnectError):
+    http_transport.get('http://127.0.0.1:{}/virtual-networks'.format(port))
+
+
+def test_backend_is_imported_at_first_request():
+  code = 'import sys; from ansible_collections.tungstenfabric.networking.plugins.module_utils import common; print("requests" in sys.modules)'
+  assert subprocess.check_output([sys.executable, '-c', code]).strip() == b'False'
+
+
+def test_unknown_backend(monkeypatch):
+  monkeypatch.setenv('TF_TRANSPORT', 'urllib')
+  with pytest.raises(TransportError):
+    Transport()
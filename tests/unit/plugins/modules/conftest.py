@@ -0,0 +1,72 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# module runs replayed from cassettes (module_utils/transport.py), which were recorded against a controller,
+# so no controller is accessed
+#
+#  cassette = replay('tag_create.jsonl')
+#  result = run_module(tag, {"controller_ip": "10.0.0.1", ...})
+#  cassette.requests: [(method, endpoint, request body)] sent by the module
+##
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import json
+import pytest
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.tungstenfabric.networking.plugins.module_utils import common
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.transport import Cassette, endpoint
+
+try:
+  from ansible.module_utils.testing import patch_module_args
+except ImportError:
+  from contextlib import contextmanager
+  from unittest import mock
+
+  @contextmanager
+  def patch_module_args(args):
+    with mock.patch.object(basic, '_ANSIBLE_ARGS', to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': args}))):
+      yield
+
+fixtures = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class RequestLog(Cassette):
+  def __init__(self, path):
+    Cassette.__init__(self, path, 'replay', 0)
+    self.requests = []
+
+  def replay(self, method, url, data):
+    self.requests.append((method, endpoint(url), data))
+    return Cassette.replay(self, method, url, data)
+
+
+@pytest.fixture
+def replay(monkeypatch, tmp_path):
+  ## the cassette replaces the controller, and the state kept by module_utils/common.py is reset
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  for name in ['OS_AUTH_URL', 'TF_CREATE_FIRST', 'TF_PROFILE_DIR', 'TF_OBJECT_CACHE']:
+    monkeypatch.delenv(name, raising=False)
+  monkeypatch.setattr(common, 'web_api_sessions', {})
+  monkeypatch.setattr(common, 'fqname_cache', {})
+  def use(name):
+    cassette = RequestLog(os.path.join(fixtures, name))
+    monkeypatch.setattr(common.transport, 'cassette', cassette)
+    return cassette
+  return use
+
+
+@pytest.fixture
+def run_module(capsys):
+  ## result of main() of the module, which ends by exit_json / fail_json
+  def run(module, args):
+    with patch_module_args(args):
+      with pytest.raises(SystemExit):
+        module.main()
+    return json.loads(capsys.readouterr().out)
+  return run
@@ -0,0 +1,39 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible_collections.tungstenfabric.networking.plugins.modules import api_access_list
+
+entries = [
+  {"rule_object": "virtual-network", "rule_field": "", "role_crud_list": ["CRUD"], "role_name_list": ["admin"]},
+  {"rule_object": "network-ipam", "rule_field": "", "role_crud_list": ["R", "CRUD"], "role_name_list": ["member", "admin"]},
+  {"rule_object": "tag", "rule_field": "", "state": "absent"}
+]
+
+
+def writes(cassette):
+  return [json.loads(data) for (method, endpoint, data) in cassette.requests if endpoint == ':8143/api/tenants/config/update-config-object']
+
+
+def test_entries_are_written_at_once(replay, run_module):
+  cassette = replay('api_access_list_entries.jsonl')
+  result = run_module(api_access_list, {"controller_ip": "10.0.0.1", "entries": entries})
+  assert result["changed"]
+  ## deleting a rule which doesn't exist is a no-op in entries mode
+  assert result["entries"] == {"added": 2, "updated": 0, "deleted": 0}
+  (payload,) = writes(cassette)
+  assert payload["api-access-list"]["api_access_list_entries"]["rbac_rule"] == [
+    {"rule_object": "virtual-network", "rule_field": "", "rule_perms": [{"role_name": "admin", "role_crud": "CRUD"}]},
+    {"rule_object": "network-ipam", "rule_field": "", "rule_perms": [{"role_name": "member", "role_crud": "R"}, {"role_name": "admin", "role_crud": "CRUD"}]}
+  ]
+
+
+def test_entries_are_checked_before_access(replay, run_module):
+  cassette = replay('api_access_list_entries.jsonl')
+  result = run_module(api_access_list, {"controller_ip": "10.0.0.1", "entries": [{"rule_object": "tag", "rule_field": "", "role_crud_list": ["CRUD"]}]})
+  assert result["failed"] and 'role_crud_list / role_name_list' in result["msg"]
+  assert cassette.requests == []
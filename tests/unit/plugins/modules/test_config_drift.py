@@ -0,0 +1,62 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import object_hash
+from ansible_collections.tungstenfabric.networking.plugins.modules.config_drift import hash_tree, changed_projects, project_key
+
+
+def entry(fq_name, obj_hash):
+  return {"type": "virtual-network", "fq_name": fq_name, "hash": obj_hash}
+
+
+objects = {
+  "uuid-1": entry(["default-domain", "admin", "vn1"], "h1"),
+  "uuid-2": entry(["default-domain", "admin", "vn2"], "h2"),
+  "uuid-3": entry(["default-domain", "demo", "vn3"], "h3"),
+  "uuid-4": entry(["other-domain", "demo", "vn4"], "h4")
+}
+
+
+def test_object_hash_ignores_read_only_fields_and_ref_order():
+  obj = {"fq_name": ["default-domain", "admin", "vn1"], "id_perms": {"last_modified": "2020-10-10T10:10:10.000000"}, "href": "http://x",
+         "network_policy_refs": [{"to": ["default-domain", "admin", "p1"], "uuid": "u1"}, {"to": ["default-domain", "admin", "p2"], "uuid": "u2"}]}
+  same = {"fq_name": ["default-domain", "admin", "vn1"], "id_perms": {"last_modified": "2020-10-11T10:10:10.000000"},
+          "network_policy_refs": [{"to": ["default-domain", "admin", "p2"], "uuid": "u2"}, {"to": ["default-domain", "admin", "p1"], "uuid": "u1"}]}
+  changed = {"fq_name": ["default-domain", "admin", "vn1"], "network_policy_refs": [{"to": ["default-domain", "admin", "p1"], "uuid": "u1"}]}
+  assert object_hash(obj) == object_hash(same)
+  assert not object_hash(obj) == object_hash(changed)
+
+
+def test_project_key():
+  assert project_key(["default-domain", "admin", "vn1"]) == 'default-domain:admin'
+  assert project_key(["default-global-system-config", "default-global-vrouter-config"]) == 'default-global-system-config:default-global-vrouter-config'
+
+
+def test_hash_tree_does_not_depend_on_order():
+  tree = hash_tree(objects)
+  assert set(tree["projects"]) == set(['default-domain:admin', 'default-domain:demo', 'other-domain:demo'])
+  assert set(tree["domains"]) == set(['default-domain', 'other-domain'])
+  assert hash_tree(dict(reversed(list(objects.items())))) == tree
+
+
+def test_changed_projects():
+  baseline = hash_tree(objects)
+  assert changed_projects(baseline, hash_tree(dict(objects))) == set()
+
+  modified = dict(objects)
+  modified["uuid-3"] = entry(["default-domain", "demo", "vn3"], "h3-modified")
+  tree = hash_tree(modified)
+  assert not tree["root"] == baseline["root"]
+  assert tree["domains"]["other-domain"] == baseline["domains"]["other-domain"]
+  assert changed_projects(baseline, tree) == set(['default-domain:demo'])
+
+
+def test_changed_projects_added_and_deleted():
+  baseline = hash_tree(objects)
+  modified = dict(objects)
+  del modified["uuid-4"]
+  modified["uuid-5"] = entry(["default-domain", "new", "vn5"], "h5")
+  assert changed_projects(baseline, hash_tree(modified)) == set(['other-domain:demo', 'default-domain:new'])
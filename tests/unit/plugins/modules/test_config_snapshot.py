@@ -0,0 +1,28 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import read_manifest, read_snapshot
+from ansible_collections.tungstenfabric.networking.plugins.modules import config_snapshot
+
+
+def test_project_subtree(replay, run_module, tmp_path):
+  ## admin has vn1 and vn2 (one object per page), and vn3 of default-project is not exported
+  cassette = replay('config_snapshot_project.jsonl')
+  dest = str(tmp_path / 'snapshot.jsonl.gz')
+  result = run_module(config_snapshot, {"controller_ip": "10.0.0.1", "project": "admin", "exclude_types": ["api-access-list"], "dest": dest, "page_limit": 1})
+  assert result["changed"]
+  assert [(obj_type, obj["fq_name"][-1]) for (obj_type, obj) in read_snapshot(dest)] == [('project', 'admin'), ('virtual-network', 'vn1'), ('virtual-network', 'vn2')]
+  manifest = read_manifest(dest)
+  assert manifest == result["manifest"]
+  assert (manifest["count"], manifest["types"]["virtual-network"]["count"], manifest["fields"]) == (3, 2, None)
+  assert not [endpoint for (method, endpoint, data) in cassette.requests if endpoint.startswith(':8082/api-access-lists')]
+
+
+def test_check_mode_writes_nothing(replay, run_module, tmp_path):
+  replay('config_snapshot_project.jsonl')
+  dest = tmp_path / 'snapshot.jsonl.gz'
+  result = run_module(config_snapshot, {"controller_ip": "10.0.0.1", "project": "admin", "exclude_types": ["api-access-list"], "dest": str(dest), "page_limit": 1, "_ansible_check_mode": True})
+  assert not result["changed"] and not dest.exists()
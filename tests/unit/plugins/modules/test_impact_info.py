@@ -0,0 +1,49 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.graph import ObjectGraph
+from ansible_collections.tungstenfabric.networking.plugins.modules import impact_info
+
+obj_types = ['project', 'virtual-network', 'network-ipam']
+args = {"controller_ip": "10.0.0.1", "obj_type": "network-ipam", "fq_name": "default-domain:default-project:default-network-ipam", "obj_types": obj_types}
+
+
+def lists(cassette):
+  return [endpoint.split('?')[0] for (method, endpoint, data) in cassette.requests if method == 'GET']
+
+
+def test_referenced_by(replay, run_module):
+  ## vn1 and vn2 of admin refer to the ipam
+  cassette = replay('impact_info_ipam.jsonl')
+  result = run_module(impact_info, args)
+  assert sorted(entry["fq_name"][-1] for entry in result["impacted"]) == ['vn1', 'vn2']
+  assert result["blocking"] == result["impacted"]
+  assert result["summary"]["types"] == {"virtual-network": 2}
+  assert sorted(lists(cassette)) == [':8082/network-ipams', ':8082/projects', ':8082/virtual-networks']
+
+
+def test_index_file_is_reused_for_the_same_obj_types(replay, run_module, tmp_path):
+  index_file = str(tmp_path / 'graph.json.gz')
+  replay('impact_info_ipam.jsonl')
+  run_module(impact_info, dict(args, index_file=index_file))
+  assert ObjectGraph.load(index_file).obj_types == sorted(obj_types)
+
+  cassette = replay('impact_info_ipam.jsonl')
+  result = run_module(impact_info, dict(args, index_file=index_file, obj_types=list(reversed(obj_types))))
+  assert result["summary"]["impacted"] == 2
+  assert lists(cassette) == []
+
+
+def test_index_file_of_other_obj_types_is_not_used(replay, run_module, tmp_path):
+  index_file = str(tmp_path / 'graph.json.gz')
+  graph = ObjectGraph()
+  graph.obj_types = ['network-ipam']
+  graph.freeze().save(index_file)
+  cassette = replay('impact_info_ipam.jsonl')
+  result = run_module(impact_info, dict(args, index_file=index_file))
+  assert result["summary"]["impacted"] == 2
+  assert sorted(lists(cassette)) == [':8082/network-ipams', ':8082/projects', ':8082/virtual-networks']
+  assert ObjectGraph.load(index_file).obj_types == sorted(obj_types)
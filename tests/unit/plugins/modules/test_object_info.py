@@ -0,0 +1,52 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.bulk import read_rows
+from ansible_collections.tungstenfabric.networking.plugins.modules import object_info
+from ansible_collections.tungstenfabric.networking.plugins.modules.object_info import list_query, match
+
+args = {"controller_ip": ["10.0.0.1"], "obj_type": "virtual-network", "fields": ["display_name"], "fq_name_prefix": ["default-domain", "admin"], "page_limit": 2}
+
+
+class FakeModule(object):
+  def __init__(self, **params):
+    self.params = dict(fields=None, tags=None, parent_uuid=None, parent_type=None, parent_fq_name=None, filters=None)
+    self.params.update(params)
+
+
+def test_list_query():
+  assert list_query(FakeModule()) == {"detail": "true"}
+  assert list_query(FakeModule(fields=["display_name"], tags=["web"])) == {"detail": "true", "fields": "display_name,tag_refs"}
+  assert list_query(FakeModule(parent_uuid=["u1", "u2"]))["parent_id"] == 'u1,u2'
+  query = list_query(FakeModule(parent_type="project", parent_fq_name=["default-domain", "admin"]))
+  assert (query["parent_type"], query["parent_fq_name_str"]) == ("project", "default-domain:admin")
+  assert list_query(FakeModule(filters={"is_shared": True, "display_name": "vn1"}))["filters"] == 'display_name==vn1,is_shared==true'
+
+
+def test_match():
+  obj = {"fq_name": ["default-domain", "admin", "vn1"], "tag_refs": [{"to": ["application=web"]}, {"to": ["site=tokyo"]}]}
+  assert match(obj, ["default-domain", "admin"], ["application=web", "site=tokyo"])
+  assert not match(obj, ["default-domain", "demo"], None)
+  assert not match(obj, None, ["application=db"])
+
+
+def test_pages_are_followed(replay, run_module):
+  cassette = replay('object_info_pages.jsonl')
+  result = run_module(object_info, args)
+  assert result["count"] == 3
+  assert [obj["fq_name"][-1] for obj in result["objects"]] == ["vn2", "vn1", "web1"]
+  assert [endpoint for (method, endpoint, data) in cassette.requests] == [
+    ':8082/virtual-networks?detail=true&fields=display_name&page_limit=2',
+    ':8082/virtual-networks?detail=true&fields=display_name&page_limit=2&page_marker=a444cbbb-31b8-4f9f-a3ca-c33587f13def'
+  ]
+
+
+def test_dest(replay, run_module, tmp_path):
+  replay('object_info_pages.jsonl')
+  dest = str(tmp_path / 'vns.jsonl.gz')
+  result = run_module(object_info, dict(args, dest=dest))
+  assert result["count"] == 3 and not "objects" in result
+  assert [obj["fq_name"][-1] for obj in read_rows(dest)] == ["vn2", "vn1", "web1"]
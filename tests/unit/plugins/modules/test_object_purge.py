@@ -0,0 +1,82 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.graph import ObjectGraph, delete_plan
+from ansible_collections.tungstenfabric.networking.plugins.modules import object_purge
+
+##
+# admin has vn1, vn2 and port1 (on vn1). port2 of default-project is on vn1, and lr1 of default-project refers to port1
+##
+args = {"controller_ip": "10.0.0.1", "obj_type": "project", "fq_name": "default-domain:admin",
+        "obj_types": ["project", "virtual-network", "virtual-machine-interface", "logical-router", "routing-instance"], "workers": 1}
+
+
+def names(levels):
+  return [sorted(entry["fq_name"][-1] for entry in level) for level in levels]
+
+
+def test_purge_project(replay, run_module):
+  cassette = replay('object_purge_project.jsonl')
+  result = run_module(object_purge, args)
+  assert result["changed"]
+  ## port2 depends on vn1 and is deleted with it, and lr1 is kept without its ref to port1
+  assert names(result["levels"]) == [['port1', 'port2', 'vn2'], ['vn1'], ['admin']]
+  assert [(entry["fq_name"][-1], entry["ref_type"]) for entry in result["unlinks"]] == [('lr1', 'virtual-machine-interface')]
+  assert result["summary"] == {"deleted": 5, "unlinked": 1, "failed": 0}
+  writes = [(method, endpoint.split('/')[1]) for (method, endpoint, data) in cassette.requests if not method == 'GET']
+  assert writes[0] == ('POST', 'fqname-to-id') and writes[1] == ('POST', 'ref-update')
+  assert [endpoint for (method, endpoint) in writes[2:]] == ['virtual-network', 'virtual-machine-interface', 'virtual-machine-interface', 'virtual-network', 'project']
+
+
+def test_check_mode_plans_only(replay, run_module):
+  cassette = replay('object_purge_project.jsonl')
+  result = run_module(object_purge, dict(args, _ansible_check_mode=True))
+  assert not result["changed"]
+  assert names(result["levels"]) == [['port1', 'port2', 'vn2'], ['vn1'], ['admin']]
+  assert [method for (method, endpoint, data) in cassette.requests] == ['POST', 'GET', 'GET', 'GET', 'GET', 'GET']
+
+
+def graph(objects):
+  ## objects: [(type, uuid, fq_name, parent uuid, {ref field: [uuid]})]
+  graph = ObjectGraph()
+  for (obj_type, uuid, fq_name, parent_uuid, refs) in objects:
+    obj = {"uuid": uuid, "fq_name": fq_name.split(':'), "parent_uuid": parent_uuid, "parent_type": 'project' if parent_uuid else None}
+    for field, uuids in refs.items():
+      obj[field] = [{"uuid": ref_uuid} for ref_uuid in uuids]
+    graph.add(obj_type, obj)
+  return graph.freeze()
+
+
+def test_managed_children_are_left_to_the_controller():
+  g = graph([
+    ('project', 'p', 'd:admin', None, {}),
+    ('virtual-network', 'vn1', 'd:admin:vn1', 'p', {}),
+    ('routing-instance', 'ri1', 'd:admin:vn1:vn1', 'vn1', {})
+  ])
+  assert delete_plan(g, 'p') == ([['vn1'], ['p']], [])
+
+
+def test_ref_cycle_is_unlinked():
+  g = graph([
+    ('project', 'p', 'd:admin', None, {}),
+    ('service-instance', 'si1', 'd:admin:si1', 'p', {"virtual_machine_interface_refs": ['vmi1']}),
+    ('virtual-machine-interface', 'vmi1', 'd:admin:vmi1', 'p', {"service_instance_refs": ['si1']})
+  ])
+  (levels, unlinks) = delete_plan(g, 'p')
+  ## refs in the cycle are removed before the deletes
+  assert levels == [['si1', 'vmi1'], ['p']]
+  assert sorted(unlinks) == [('si1', 'vmi1'), ('vmi1', 'si1')]
+
+
+def test_children_cycle_cannot_be_deleted():
+  g = graph([
+    ('project', 'p1', 'd:p1', 'p2', {}),
+    ('project', 'p2', 'd:p2', 'p1', {})
+  ])
+  with pytest.raises(ValueError, match='cycle'):
+    delete_plan(g, 'p1')
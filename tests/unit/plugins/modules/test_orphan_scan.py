@@ -0,0 +1,97 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import calendar
+import time
+
+from ansible_collections.tungstenfabric.networking.plugins.modules.orphan_scan import find_orphans, created_at, list_fields
+
+now = calendar.timegm(time.strptime('2020-10-10T12:00:00', '%Y-%m-%dT%H:%M:%S'))
+checks = ['vmi', 'vpg_vmi', 'instance_ip', 'loadbalancer']
+
+
+def obj(uuid, fq_name, created='2020-10-10T10:00:00.123456', **fields):
+  js = {"uuid": uuid, "fq_name": fq_name, "id_perms": {"created": created}}
+  js.update(fields)
+  return js
+
+
+def vmi(uuid, **fields):
+  return obj(uuid, ["default-domain", "admin", uuid], parent_type='project', **fields)
+
+
+def found(orphans):
+  return sorted((check, obj_type, o["uuid"]) for (check, obj_type, o) in orphans)
+
+
+def test_created_at():
+  assert created_at(obj('u', ['x'])) == now - 7200
+  assert created_at({"id_perms": {"last_modified": "2020-10-10T11:00:00"}}) == now - 3600
+  assert created_at({}) is None
+
+
+def test_vmi_orphans():
+  objects = {
+    'virtual-machine-interface': [
+      vmi('orphan'),
+      vmi('with-vm', virtual_machine_refs=[{"uuid": "vm"}]),
+      vmi('with-lr'),
+      vmi('with-iip'),
+      vmi('bms', virtual_machine_interface_bindings={"key_value_pair": [{"key": "vpg", "value": "vpg1"}]}),
+      obj('vrouter-vmi', ["default-global-system-config", "vrouter", "vhost0"], parent_type='virtual-router')
+    ],
+    'logical-router': [obj('lr', ["default-domain", "admin", "lr"], virtual_machine_interface_refs=[{"uuid": "with-lr"}])],
+    'instance-ip': [obj('iip', ["iip"], virtual_machine_interface_refs=[{"uuid": "with-iip"}])]
+  }
+  assert found(find_orphans(objects, checks, 600, now)) == [
+    ('instance_ip', 'instance-ip', 'iip'),
+    ('vmi', 'virtual-machine-interface', 'orphan'),
+    ('vmi', 'virtual-machine-interface', 'with-iip'),
+    ('vpg_vmi', 'virtual-machine-interface', 'bms')
+  ]
+  assert found(find_orphans(objects, ['vmi'], 600, now)) == [('vmi', 'virtual-machine-interface', 'orphan'), ('vmi', 'virtual-machine-interface', 'with-iip')]
+
+
+def test_min_age():
+  objects = {
+    'virtual-machine-interface': [vmi('old'), vmi('new', created='2020-10-10T11:59:00.000000'), vmi('unknown', created=None)],
+    'instance-ip': [obj('iip-of-new', ["iip"], created='2020-10-10T11:59:00.000000', virtual_machine_interface_refs=[{"uuid": "deleted"}])]
+  }
+  ## objects which may be still being created by others (and the ones whose age is unknown) are not orphans
+  assert found(find_orphans(objects, checks, 600, now)) == [('vmi', 'virtual-machine-interface', 'old')]
+  assert found(find_orphans(objects, checks, 0, now)) == [
+    ('instance_ip', 'instance-ip', 'iip-of-new'),
+    ('vmi', 'virtual-machine-interface', 'new'),
+    ('vmi', 'virtual-machine-interface', 'old')
+  ]
+
+
+def test_instance_ip_without_vmi_refs_is_kept():
+  objects = {'instance-ip': [obj('gateway', ["gateway"])]}
+  assert find_orphans(objects, checks, 0, now) == []
+
+
+def test_loadbalancer_orphans():
+  objects = {
+    'loadbalancer': [obj('lb1', ["default-domain", "admin", "lb1"])],
+    'loadbalancer-listener': [obj('l1', ["default-domain", "admin", "lb1-listener"]), obj('l2', ["default-domain", "admin", "lb2-listener"])],
+    'loadbalancer-pool': [obj('p2', ["default-domain", "admin", "lb2-pool"]), obj('other', ["default-domain", "admin", "pool"])],
+    'loadbalancer-member': [obj('m2', ["default-domain", "admin", "lb2-pool", "m2"], parent_uuid='p2')]
+  }
+  assert found(find_orphans(objects, ['loadbalancer'], 600, now)) == [
+    ('loadbalancer', 'loadbalancer-listener', 'l2'),
+    ('loadbalancer', 'loadbalancer-member', 'm2'),
+    ('loadbalancer', 'loadbalancer-pool', 'p2')
+  ]
+
+
+def test_list_fields():
+  fields = list_fields(['loadbalancer'])
+  assert fields['loadbalancer-pool'] == 'id_perms'
+  assert not 'virtual-machine-interface' in fields
+  fields = list_fields(['vmi'])
+  assert 'virtual_machine_refs' in fields['virtual-machine-interface'].split(',')
+  assert fields['instance-ip'] == 'id_perms,virtual_machine_interface_refs'
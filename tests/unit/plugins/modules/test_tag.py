@@ -0,0 +1,61 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.tungstenfabric.networking.plugins.modules import tag
+
+
+def run_tag(run_module, args):
+  return run_module(tag, args)
+
+
+def test_create(replay, run_module):
+  cassette = replay('tag_create.jsonl')
+  result = run_tag(run_module, {"controller_ip": "10.0.0.1", "name": "web", "tag_type": "application", "project": "admin"})
+  assert result["changed"] and not result.get("failed")
+  assert result["operation"] == 'create'
+  assert result["fq_name"] == ["default-domain", "admin", "web"]
+  assert result["uuid"] == '44f4a69e-0b3b-4366-995b-0c9733133316'
+  assert len(cassette.consumed) == 3
+
+
+def test_items(replay, run_module):
+  replay('tag_items.jsonl')
+  result = run_tag(run_module, {"controller_ip": "10.0.0.1", "tag_type": "application", "project": "admin", "bulk_workers": 1,
+                                "items": [{"name": "db"}, {"name": "app"}]})
+  assert result["summary"] == {"total": 2, "changed": 2, "failed": 0, "skipped": 0}
+  assert [item["name"] for item in result["items"]] == ["db", "app"]
+
+
+def test_journal_resume_does_not_access_controller(replay, run_module, tmp_path):
+  cassette = replay('tag_items.jsonl')
+  args = {"controller_ip": "10.0.0.1", "tag_type": "application", "project": "admin", "bulk_workers": 1,
+          "items": [{"name": "db"}, {"name": "app"}], "journal": str(tmp_path / 'journal')}
+  run_tag(run_module, args)
+  consumed = len(cassette.consumed)
+  result = run_tag(run_module, args)
+  assert result["summary"]["skipped"] == 2 and not result["changed"]
+  assert len(cassette.consumed) == consumed
+
+
+def test_check_mode(replay, run_module):
+  cassette = replay('tag_create.jsonl')
+  result = run_tag(run_module, {"controller_ip": "10.0.0.1", "name": "web", "tag_type": "application", "project": "admin", "_ansible_check_mode": True})
+  assert not result["changed"]
+  assert len(cassette.consumed) == 0
+
+
+def test_webui_login_failure(replay, run_module):
+  replay('tag_login_failed.jsonl')
+  result = run_tag(run_module, {"controller_ip": "10.0.0.1", "name": "web", "tag_type": "application", "project": "admin"})
+  assert result["failed"] and not result["changed"]
+  assert result["message"] == 'webui login to https://10.0.0.1:8143/ failed: 401 Unauthorized'
+
+
+def test_no_webui_login_without_write(replay, run_module):
+  cassette = replay('tag_absent.jsonl')
+  result = run_tag(run_module, {"controller_ip": "10.0.0.1", "name": "web", "tag_type": "application", "project": "admin", "state": "absent"})
+  assert not result["changed"]
+  assert [endpoint for (method, endpoint, data) in cassette.requests] == [':8082/fqname-to-id']
@@ -0,0 +1,37 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import deterministic_uuid
+from ansible_collections.tungstenfabric.networking.plugins.modules import virtual_network
+
+args = {"controller_ip": ["10.0.0.1"], "name": "vn-cf", "project": "admin", "display_name": "vn-cf"}
+vn_uuid = deterministic_uuid('virtual-network', ["default-domain", "admin", "vn-cf"])
+
+
+def test_create_first(replay, run_module, monkeypatch):
+  monkeypatch.setenv('TF_CREATE_FIRST', 'true')
+  cassette = replay('virtual_network_create_first.jsonl')
+  result = run_module(virtual_network, args)
+  assert result["changed"] and result["operation"] == 'create' and result["uuid"] == vn_uuid
+  ## no fqname-to-id lookup, and the object is created with the uuid derived from its fq_name
+  assert [endpoint for (method, endpoint, data) in cassette.requests] == [':8143/authenticate', ':8143/api/tenants/config/create-config-object']
+  assert json.loads(cassette.requests[-1][2])["virtual-network"]["uuid"] == vn_uuid
+
+
+def test_create_first_conflict_updates_existing_object(replay, run_module, monkeypatch):
+  monkeypatch.setenv('TF_CREATE_FIRST', 'true')
+  cassette = replay('virtual_network_create_first_conflict.jsonl')
+  result = run_module(virtual_network, args)
+  assert result["changed"] and result["operation"] == 'update' and result["uuid"] == vn_uuid
+  assert [endpoint for (method, endpoint, data) in cassette.requests] == [
+    ':8143/authenticate',
+    ':8143/api/tenants/config/create-config-object',
+    ':8082/fqname-to-id',
+    ':8143/api/tenants/config/get-config-objects',
+    ':8143/api/tenants/config/update-config-object'
+  ]
@@ -0,0 +1,86 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleError
+from ansible_collections.tungstenfabric.networking.plugins.plugin_utils import controller
+from ansible_collections.tungstenfabric.networking.plugins.plugin_utils.controller import PluginModule, UuidMemo, fq_name_list, resolve_uuids
+
+
+class Controller(object):
+  ## virtual-networks on the controller: uuid -> fq_name
+  def __init__(self, objects):
+    self.objects = objects
+    self.lists = []
+    self.resolved = []
+
+  def list_objects(self, module, controller_ip, obj_type, query=None, page_limit=1000):
+    uuids = query["obj_uuids"].split(',')
+    self.lists.append(uuids)
+    return iter([{"uuid": uuid, "fq_name": self.objects[uuid]} for uuid in uuids if uuid in self.objects])
+
+  def fqname_to_id(self, module, fq_name, obj_type, controller_ip):
+    self.resolved.append(':'.join(fq_name))
+    for uuid, name in self.objects.items():
+      if name == fq_name:
+        return uuid
+    module.fail_json(msg="{} {} doesn't exist".format(obj_type, ':'.join(fq_name)))
+
+
+@pytest.fixture
+def tf(monkeypatch, tmp_path):
+  monkeypatch.setenv('TF_GOVERNOR_DIR', str(tmp_path))
+  tf = Controller({"uuid-1": ["default-domain", "admin", "vn1"], "uuid-2": ["default-domain", "admin", "vn2"]})
+  monkeypatch.setattr(controller, 'list_objects', tf.list_objects)
+  monkeypatch.setattr(controller, 'fqname_to_id', tf.fqname_to_id)
+  return tf
+
+
+def test_fq_name_list():
+  assert fq_name_list('default-domain:admin:vn1') == ['default-domain', 'admin', 'vn1']
+  assert fq_name_list(('default-domain', 'admin', 'vn1')) == ['default-domain', 'admin', 'vn1']
+
+
+def test_plugin_module_fails_by_ansible_error():
+  with pytest.raises(AnsibleError, match='not found'):
+    PluginModule({"controller_ip": ["10.0.0.1"]}).fail_json(msg='not found')
+
+
+def test_memo_is_shared_through_file(tf):
+  UuidMemo(300).update({"key": "uuid-1"})
+  assert UuidMemo(300).get("key") == 'uuid-1'
+  ## entries older than ttl, and memo disabled by ttl 0
+  assert UuidMemo(-1).get("key") is None
+  assert UuidMemo(0).get("key") is None
+
+
+def test_resolve_uuids_in_order(tf):
+  module = PluginModule({})
+  memo = UuidMemo(300)
+  assert resolve_uuids(module, '10.0.0.1', 'virtual-network', ['default-domain:admin:vn2', ['default-domain', 'admin', 'vn1']], memo=memo) == ['uuid-2', 'uuid-1']
+  assert tf.lists == [] and sorted(tf.resolved) == ['default-domain:admin:vn1', 'default-domain:admin:vn2']
+
+  ## the second lookup uses the memo, after one list call to check it
+  tf.resolved = []
+  assert resolve_uuids(module, '10.0.0.1', 'virtual-network', ['default-domain:admin:vn1', 'default-domain:admin:vn2'], memo=UuidMemo(300)) == ['uuid-1', 'uuid-2']
+  assert tf.lists == [['uuid-1', 'uuid-2']] and tf.resolved == []
+
+
+def test_memoized_uuid_of_recreated_object(tf):
+  module = PluginModule({})
+  resolve_uuids(module, '10.0.0.1', 'virtual-network', ['default-domain:admin:vn1'], memo=UuidMemo(300))
+  ## vn1 is deleted and created again with another uuid
+  tf.objects["uuid-3"] = tf.objects.pop("uuid-1")
+  tf.resolved = []
+  assert resolve_uuids(module, '10.0.0.1', 'virtual-network', ['default-domain:admin:vn1'], memo=UuidMemo(300)) == ['uuid-3']
+  assert tf.resolved == ['default-domain:admin:vn1']
+  assert UuidMemo(300).get('10.0.0.1|virtual-network|default-domain:admin:vn1') == 'uuid-3'
+
+
+def test_missing_object_fails(tf):
+  with pytest.raises(AnsibleError, match="default-domain:admin:vn3 doesn't exist"):
+    resolve_uuids(PluginModule({}), '10.0.0.1', 'virtual-network', ['default-domain:admin:vn3'])
@@ -0,0 +1,123 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+##
+# startup benchmark: per-module import time and ansiballz payload size
+#
+# python tools/bench_startup.py [-n 5] [module ...]
+#
+#  import: median time of 'import <module>' in a fresh interpreter
+#  modules: number of modules loaded by that import, requests: if python-requests is loaded
+#  payload: size of the base64 encoded zip of module + module_utils which ansiballz ships (approximation of module_common, ZIP_DEFLATED)
+##
+
+import os
+import sys
+import ast
+import json
+import base64
+import shutil
+import zipfile
+import tempfile
+import argparse
+import subprocess
+from io import BytesIO
+
+collection_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+collection_package = 'ansible_collections.tungstenfabric.networking'
+
+measure_script = '''
+import sys, time, json
+start = time.time()
+import {}
+elapsed = time.time() - start
+print(json.dumps({{"elapsed": elapsed, "modules": len(sys.modules), "requests": "requests" in sys.modules}}))
+'''
+
+
+def measure_import(module_fqn, pythonpath, count):
+  env = dict(os.environ)
+  env['PYTHONPATH'] = os.pathsep.join([pythonpath, env.get('PYTHONPATH', '')])
+  samples = []
+  for i in range(count):
+    out = subprocess.check_output([sys.executable, '-c', measure_script.format(module_fqn)], env=env)
+    samples.append(json.loads(out.decode('utf-8').strip().splitlines()[-1]))
+  samples.sort(key=lambda sample: sample["elapsed"])
+  return samples[len(samples) // 2]
+
+
+def module_path(name):
+  ## name: 'ansible.module_utils.basic' or 'ansible_collections.tungstenfabric.networking.plugins.module_utils.common'
+  if name.startswith(collection_package + '.'):
+    base = os.path.join(collection_root, *name[len(collection_package) + 1:].split('.'))
+  elif name.startswith('ansible.module_utils'):
+    import ansible
+    base = os.path.join(os.path.dirname(ansible.__file__), *name.split('.')[1:])
+  else:
+    return None
+  if os.path.isdir(base):
+    return os.path.join(base, '__init__.py')
+  if os.path.exists(base + '.py'):
+    return base + '.py'
+  return None
+
+
+def find_dependencies(path, package, found):
+  with open(path) as f:
+    tree = ast.parse(f.read())
+  for node in ast.walk(tree):
+    names = []
+    if isinstance(node, ast.Import):
+      names = [alias.name for alias in node.names]
+    elif isinstance(node, ast.ImportFrom):
+      base = node.module or ''
+      if node.level:
+        base = '.'.join(package.split('.')[:len(package.split('.')) - node.level + 1] + ([base] if base else []))
+      names = [base] + [base + '.' + alias.name for alias in node.names]
+    for name in names:
+      dependency = module_path(name)
+      if dependency and not dependency in found:
+        found[dependency] = name
+        dependency_package = name if dependency.endswith('__init__.py') else name.rsplit('.', 1)[0]
+        find_dependencies(dependency, dependency_package, found)
+
+
+def payload_size(path):
+  found = {}
+  find_dependencies(path, collection_package + '.plugins.modules', found)
+  buf = BytesIO()
+  with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as z:
+    z.write(path, 'module.py')
+    for dependency in sorted(found):
+      z.write(dependency, found[dependency].replace('.', '/') + '.py')
+  return len(base64.b64encode(buf.getvalue())), len(found)
+
+
+def main():
+  parser = argparse.ArgumentParser(description='per-module import time and ansiballz payload size')
+  parser.add_argument('-n', type=int, default=5, help='number of runs per module (median is reported)')
+  parser.add_argument('modules', nargs='*', help='module names (default: all)')
+  args = parser.parse_args()
+
+  modules = args.modules or sorted(f[:-3] for f in os.listdir(os.path.join(collection_root, 'plugins', 'modules')) if f.endswith('.py'))
+
+  ## collection loader expects <path>/ansible_collections/<namespace>/<name>
+  tmpdir = tempfile.mkdtemp()
+  try:
+    os.makedirs(os.path.join(tmpdir, 'ansible_collections', 'tungstenfabric'))
+    os.symlink(collection_root, os.path.join(tmpdir, 'ansible_collections', 'tungstenfabric', 'networking'))
+
+    print('{:32} {:>10} {:>8} {:>9} {:>12} {:>8}'.format('module', 'import(ms)', 'modules', 'requests', 'payload(B)', 'utils'))
+    for name in modules:
+      sample = measure_import('{}.plugins.modules.{}'.format(collection_package, name), tmpdir, args.n)
+      size, utils = payload_size(os.path.join(collection_root, 'plugins', 'modules', name + '.py'))
+      print('{:32} {:>10.1f} {:>8} {:>9} {:>12} {:>8}'.format(name, sample["elapsed"] * 1000, sample["modules"], str(sample["requests"]), size, utils))
+  finally:
+    ## removes the symlink, not the collection it points to
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+  main()